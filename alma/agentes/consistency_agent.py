@@ -8,18 +8,27 @@ e propõe resoluções para manter a base de conhecimento coerente.
 import re
 import logging
 from datetime import datetime
-from core.utils import calcular_similaridade_texto
+from core.utils import calcular_similaridade_texto, palavras_comparaveis
+from core.armazenamento.minhash import IndiceMinHash
 
 # Importação condicional do módulo de análise semântica
 try:
-    from core.nlp_enhancement import analisador_semantico
-    ANALISE_SEMANTICA_DISPONIVEL = True
+    from core.nlp.nlp_enhancement import analisador_semantico, BIBLIOTECAS_NLP_DISPONIVEIS
+    # O módulo importa mesmo sem spaCy/NLTK/sentence-transformers; sem elas
+    # a análise semântica fica desligada
+    ANALISE_SEMANTICA_DISPONIVEL = BIBLIOTECAS_NLP_DISPONIVEIS
 except ImportError:
     ANALISE_SEMANTICA_DISPONIVEL = False
 
 # Configuração de logging
 logger = logging.getLogger(__name__)
 
+# Nome sob o qual o agente guarda sua posição no feed de mudanças
+CONSUMIDOR_FEED = "agente_consistencia"
+
+# Memórias mais similares (pelo índice vetorial) conferidas na busca semântica
+LIMITE_SIMILARES_SEMANTICOS = 10
+
 class AgenteConsistencia:
     def __init__(self, persona):
         """Inicializa o agente de consistência.
@@ -32,6 +41,10 @@ class AgenteConsistencia:
         self.inconsistencias_detectadas = 0
         self.resolucoes_aplicadas = 0
         self.analise_semantica_ativa = ANALISE_SEMANTICA_DISPONIVEL
+        
+        # Assinaturas MinHash das palavras de cada memória, mantidas a partir
+        # do feed de mudanças, para achar memórias parecidas sem comparar com todas
+        self._indice_similares = IndiceMinHash()
     
     async def processar(self, memoria):
         """Processa uma memória verificando inconsistências com outras memórias.
@@ -76,9 +89,45 @@ class AgenteConsistencia:
         
         return memoria_atualizada
     
+    def _sincronizar_memorias(self):
+        """Aplica as mudanças pendentes do feed ao índice de memórias parecidas.
+        
+        No primeiro uso, ou quando o feed não cobre mais as mudanças desde a
+        última sincronização, as memórias são percorridas por inteiro.
+        """
+        mudancas, seq = self.persona.mudancas.pendentes(CONSUMIDOR_FEED)
+        if mudancas is None:
+            self._indice_similares = IndiceMinHash(
+                (m["id"], palavras_comparaveis(m.get("conteudo", "")))
+                for m in self.persona.iter_memorias(campos=("id", "conteudo"))
+            )
+        else:
+            for mudanca in mudancas:
+                if mudanca["memoria"] is None:
+                    self._indice_similares.remover(mudanca["id"])
+                else:
+                    self._indice_similares.adicionar(
+                        mudanca["id"], palavras_comparaveis(mudanca["memoria"].get("conteudo", ""))
+                    )
+        self.persona.mudancas.confirmar(CONSUMIDOR_FEED, seq)
+    
+    def _memorias_similares(self, memoria):
+        """Percorre as candidatas do índice MinHash em ordem de id (sem a própria memória)."""
+        self._sincronizar_memorias()
+        candidatos = self._indice_similares.candidatos(palavras_comparaveis(memoria["conteudo"]))
+        for memoria_id in sorted(candidatos):
+            if memoria_id == memoria["id"]:
+                continue
+            outra_memoria = self.persona.buscar_por_id(memoria_id)
+            if outra_memoria is not None:
+                yield outra_memoria
+    
     def _buscar_inconsistencias(self, memoria):
         """Busca memórias que podem ser inconsistentes com a memória atual.
         
+        Só as memórias apontadas pelo índice MinHash/LSH como parecidas têm
+        a similaridade conferida, em vez de todas as memórias armazenadas.
+        
         Args:
             memoria (dict): A memória a ser comparada
             
@@ -87,21 +136,12 @@ class AgenteConsistencia:
         """
         resultado = []
         
-        # Carrega todas as memórias
-        dados = self.persona._carregar_memorias()
-        if not dados["memorias"]:
-            return resultado
-        
         # Analisa o conteúdo da memória atual
         conteudo = memoria["conteudo"].lower()
         
         # Padrões de inconsistência (simplificados)
         # Buscando por "não", "nunca", "impossível" em conteúdos similares
-        for outra_memoria in dados["memorias"]:
-            # Não compara com ela mesma
-            if outra_memoria["id"] == memoria["id"]:
-                continue
-            
+        for outra_memoria in self._memorias_similares(memoria):
             # Verifica se são similares o suficiente para analisar
             similaridade = calcular_similaridade_texto(memoria["conteudo"], outra_memoria["conteudo"])
             
@@ -137,11 +177,6 @@ class AgenteConsistencia:
         """
         resultado = []
         
-        # Carrega todas as memórias
-        dados = self.persona._carregar_memorias()
-        if not dados["memorias"]:
-            return resultado
-        
         # Apenas inicializa o analisador se ainda não tiver sido feito
         if not analisador_semantico.inicializado:
             await analisador_semantico.inicializar_recursos()
@@ -149,33 +184,29 @@ class AgenteConsistencia:
                 logger.warning("Não foi possível inicializar análise semântica para busca de inconsistências")
                 return resultado
         
-        for outra_memoria in dados["memorias"]:
-            # Não compara com ela mesma
-            if outra_memoria["id"] == memoria["id"]:
-                continue
-            
-            # Primeiro verifica se são similares o suficiente para comparar
-            similaridade = await analisador_semantico.calcular_similaridade_semantica(
-                memoria["conteudo"], outra_memoria["conteudo"], metodo="embeddings"
+        # Só as mais similares (limiar mais alto para o método semântico), pelo
+        # índice vetorial; não compara com ela mesma
+        similares = await self.persona.buscar_memorias_similares(
+            memoria["conteudo"], LIMITE_SIMILARES_SEMANTICOS, limiar=0.5, excluir=memoria["id"]
+        )
+        
+        for outra_memoria, _ in similares:
+            # Analisa possíveis contradições com cada uma
+            resultado_contradicao = await analisador_semantico.encontrar_contradicoes(
+                memoria, outra_memoria
             )
             
-            # Se forem similares, analisa possíveis contradições
-            if similaridade > 0.5:  # Limiar mais alto para o método semântico
-                resultado_contradicao = await analisador_semantico.encontrar_contradicoes(
-                    memoria, outra_memoria
-                )
+            if resultado_contradicao["encontrou_contradicao"]:
+                # Adiciona dados de contradição à memória
+                outra_memoria_copia = outra_memoria.copy()
+                outra_memoria_copia["detalhes_contradicao"] = {
+                    "sentencas_contraditorias": resultado_contradicao.get("sentencas_contraditorias", []),
+                    "similaridade_geral": resultado_contradicao.get("similaridade_geral", 0.0)
+                }
+                resultado.append(outra_memoria_copia)
                 
-                if resultado_contradicao["encontrou_contradicao"]:
-                    # Adiciona dados de contradição à memória
-                    outra_memoria_copia = outra_memoria.copy()
-                    outra_memoria_copia["detalhes_contradicao"] = {
-                        "sentencas_contraditorias": resultado_contradicao.get("sentencas_contraditorias", []),
-                        "similaridade_geral": resultado_contradicao.get("similaridade_geral", 0.0)
-                    }
-                    resultado.append(outra_memoria_copia)
-                    
-                    logger.info(f"Contradição semântica detectada entre memórias #{memoria['id']} e #{outra_memoria['id']}")
-                    break  # Uma contradição é suficiente para este ciclo
+                logger.info(f"Contradição semântica detectada entre memórias #{memoria['id']} e #{outra_memoria['id']}")
+                break  # Uma contradição é suficiente para este ciclo
         
         return resultado
     
@@ -222,8 +253,11 @@ class AgenteConsistencia:
         if "consistencia" not in memoria_atualizada:
             memoria_atualizada["consistencia"] = resolucao_info
         else:
-            # Atualiza o campo existente
-            inconsistentes = memoria_atualizada["consistencia"].get("inconsistente_com", [])
+            # Atualiza o campo existente, descartando referências a memórias removidas
+            inconsistentes = [
+                memoria_id for memoria_id in memoria_atualizada["consistencia"].get("inconsistente_com", [])
+                if self.persona.buscar_por_id(memoria_id) is not None
+            ]
             if memoria_inconsistente["id"] not in inconsistentes:
                 inconsistentes.append(memoria_inconsistente["id"])
             
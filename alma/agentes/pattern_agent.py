@@ -9,6 +9,9 @@ import re
 from collections import Counter
 from datetime import datetime
 
+# Nome sob o qual o agente guarda sua posição no feed de mudanças
+CONSUMIDOR_FEED = "agente_padrao"
+
 class AgentePadrao:
     def __init__(self, persona):
         """Inicializa o agente de padrões.
@@ -19,6 +22,11 @@ class AgentePadrao:
         self.persona = persona
         self.processamentos = 0
         self.padroes_detectados = []
+        
+        # Palavras-chave de cada memória e em quantas memórias cada uma
+        # aparece, mantidas a partir do feed de mudanças
+        self._palavras_por_memoria = {}
+        self._frequencia = Counter()
     
     async def processar(self, memoria):
         """Processa uma memória buscando padrões relacionados.
@@ -80,38 +88,61 @@ class AgentePadrao:
         Returns:
             list: Lista de padrões detectados
         """
-        # Carrega todas as memórias
-        dados = self.persona._carregar_memorias()
-        if not dados["memorias"]:
-            return []
-        
         # Extrai palavras-chave da memória atual
-        palavras_chave = self._extrair_palavras_chave(memoria["conteudo"])
+        palavras_chave = set(self._extrair_palavras_chave(memoria["conteudo"]))
         
         if not palavras_chave:
             return []
         
-        # Busca essas palavras-chave em outras memórias
-        temas_recorrentes = Counter()
-        
-        for outra_memoria in dados["memorias"]:
-            # Não considera a própria memória
-            if outra_memoria["id"] == memoria["id"]:
-                continue
-            
-            outras_palavras = self._extrair_palavras_chave(outra_memoria["conteudo"])
-            
-            # Intersecção de palavras-chave
-            intersecao = set(palavras_chave).intersection(set(outras_palavras))
-            
-            for palavra in intersecao:
-                temas_recorrentes[palavra] += 1
+        # Conta em quantas outras memórias cada palavra-chave aparece, a
+        # partir das frequências mantidas pelo feed de mudanças
+        self._sincronizar_memorias()
+        propria = self._palavras_por_memoria.get(memoria["id"], ())
+        temas_recorrentes = Counter({
+            palavra: self._frequencia[palavra] - (palavra in propria) for palavra in palavras_chave
+        })
         
         # Seleciona os temas mais recorrentes (pelo menos 2 ocorrências)
-        padroes = [tema for tema, contagem in temas_recorrentes.items() if contagem >= 2]
+        padroes = [tema for tema, contagem in temas_recorrentes.most_common() if contagem >= 2]
         
         return padroes[:5]  # Limita a 5 padrões para não sobrecarregar
     
+    def _indexar(self, memoria_id, conteudo):
+        """Registra as palavras-chave de uma memória (substituindo as anteriores)."""
+        self._desindexar(memoria_id)
+        palavras = set(self._extrair_palavras_chave(conteudo))
+        self._palavras_por_memoria[memoria_id] = palavras
+        self._frequencia.update(palavras)
+    
+    def _desindexar(self, memoria_id):
+        """Retira as palavras-chave de uma memória das frequências."""
+        palavras = self._palavras_por_memoria.pop(memoria_id, None)
+        if palavras:
+            self._frequencia.subtract(palavras)
+            for palavra in palavras:
+                if self._frequencia[palavra] <= 0:
+                    del self._frequencia[palavra]
+    
+    def _sincronizar_memorias(self):
+        """Aplica as mudanças pendentes do feed às frequências de palavras-chave.
+        
+        No primeiro uso, ou quando o feed não cobre mais as mudanças desde a
+        última sincronização, as memórias são percorridas por inteiro.
+        """
+        mudancas, seq = self.persona.mudancas.pendentes(CONSUMIDOR_FEED)
+        if mudancas is None:
+            self._palavras_por_memoria = {}
+            self._frequencia = Counter()
+            for outra_memoria in self.persona.iter_memorias(campos=("id", "conteudo")):
+                self._indexar(outra_memoria["id"], outra_memoria.get("conteudo", ""))
+        else:
+            for mudanca in mudancas:
+                if mudanca["memoria"] is None:
+                    self._desindexar(mudanca["id"])
+                else:
+                    self._indexar(mudanca["id"], mudanca["memoria"].get("conteudo", ""))
+        self.persona.mudancas.confirmar(CONSUMIDOR_FEED, seq)
+    
     def _extrair_palavras_chave(self, texto):
         """Extrai palavras-chave de um texto.
         
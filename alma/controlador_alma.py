@@ -12,6 +12,14 @@ import random
 
 logger = logging.getLogger(__name__)
 
+# Nome sob o qual o ciclo de reflexão guarda sua posição no feed de mudanças
+CONSUMIDOR_FEED = "ciclo_reflexao"
+
+# Memórias geradas pelo próprio sistema (sínteses, consolidações, reflexões):
+# refletir sobre elas faria o ciclo reagir à própria saída
+ORIGENS_GERADAS = ("sintese_interna", "sintese_avancada", "consolidacao")
+TIPOS_GERADOS = ("reflexao", "sintese", "metacognicao")
+
 class Alma:
     """Classe principal do sistema Alma."""
     
@@ -249,13 +257,24 @@ class Alma:
         logger.info("[Alma] Iniciando ciclo de reflexão...")
         
         # Gera pensamentos reflexivos sobre memórias recentes
-        dados = self.persona._carregar_memorias()
-        if dados["memorias"]:
-            # Pega as últimas n memórias
-            if num_memorias is None:
-                num_memorias = 5  # Padrão
-            memorias_recentes = dados["memorias"][-num_memorias:]
-            
+        if num_memorias is None:
+            num_memorias = 5  # Padrão
+        # Reflete sobre as memórias criadas ou alteradas desde o último ciclo;
+        # sem posição válida no feed, pega as últimas n sem carregar o histórico
+        mudancas, seq = self.persona.mudancas.pendentes(CONSUMIDOR_FEED)
+        if mudancas is None:
+            memorias_recentes = [m for m in self.persona.listar_memorias(num_memorias)
+                                 if not self._gerada_internamente(m)]
+        else:
+            alteradas = {}
+            for mudanca in mudancas:
+                alteradas.pop(mudanca["id"], None)
+                if mudanca["memoria"] is not None:
+                    alteradas[mudanca["id"]] = mudanca["memoria"]
+            memorias_recentes = [m for m in alteradas.values() if not self._gerada_internamente(m)]
+            memorias_recentes = memorias_recentes[-num_memorias:]
+        self.persona.mudancas.confirmar(CONSUMIDOR_FEED, seq)
+        if memorias_recentes:
             for memoria in memorias_recentes:
                 # Gera reflexão com emoção e tags apropriadas
                 emocao = self._inferir_emocao(memoria["conteudo"])
@@ -275,6 +294,11 @@ class Alma:
             await self.ciclo_cognitivo()
             await asyncio.sleep(0.1)  # Pequena pausa entre processamentos
     
+    @staticmethod
+    def _gerada_internamente(memoria: Dict[str, Any]) -> bool:
+        """Indica se a memória foi produzida pelo próprio sistema, não recebida de fora."""
+        return memoria.get("origem") in ORIGENS_GERADAS or memoria.get("tipo") in TIPOS_GERADOS
+
     def _inferir_emocao(self, texto: str) -> Optional[str]:
         """
         Infere a emoção predominante de um texto.
@@ -452,8 +476,8 @@ class ControladorAlma:
         self.ciclo_ativo = True
         while self.ciclo_ativo:
             try:
-                # Escolhe uma memória aleatória para processar
-                memorias = self.memoria.buscar_memoria('longo_prazo')
+                # Escolhe uma memória aleatória de longo prazo, sem carregar a camada inteira
+                memorias = self.memoria.buscar_memoria('longo_prazo', limite=1)
                 if memorias:
                     memoria_escolhida = random.choice(memorias)
                     # Processa a memória através dos agentes
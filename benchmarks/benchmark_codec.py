@@ -0,0 +1,118 @@
+"""
+Benchmark dos codecs de serialização de memórias.
+
+Gera um corpus sintético de memórias (formato da persona) e compara, para
+cada codec disponível, o tempo de gravação, o tempo de leitura e o tamanho
+do arquivo, tendo como referência o JSON indentado usado anteriormente.
+
+Uso:
+    python benchmarks/benchmark_codec.py [--quantidade 100000] [--repeticoes 3]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.armazenamento.codec import Codec, carregar_arquivo, MSGPACK_DISPONIVEL, ZSTD_DISPONIVEL
+
+PALAVRAS = (
+    "memória consciência reflexão aprendizado emoção pensamento padrão conceito "
+    "síntese contexto experiência conhecimento curiosidade evolução relação tempo "
+    "linguagem significado intuição análise alma persona ciclo ideia"
+).split()
+
+
+def gerar_corpus(quantidade):
+    """Gera um documento de memórias com conteúdo e metadados variados."""
+    aleatorio = random.Random(42)
+    inicio = datetime(2024, 1, 1)
+    memorias = []
+    for memoria_id in range(1, quantidade + 1):
+        memoria = {
+            "id": memoria_id,
+            "conteudo": " ".join(aleatorio.choices(PALAVRAS, k=aleatorio.randint(8, 30))),
+            "criado_em": (inicio + timedelta(seconds=memoria_id * 37)).isoformat(),
+            "versao": 1,
+            "origem": aleatorio.choice(["externa", "sintese_interna", "reflexao"])
+        }
+        if memoria_id > 1 and aleatorio.random() < 0.3:
+            memoria["relacionado_a"] = aleatorio.randint(1, memoria_id - 1)
+            memoria["versao"] = aleatorio.randint(2, 5)
+            memoria["evolucao"] = "Refinamento de memória anterior"
+        memorias.append(memoria)
+    return {"memorias": memorias, "meta": {"criado_em": inicio.isoformat(), "versao": "1.0",
+                                          "total_memorias": quantidade}}
+
+
+def medir(funcao, repeticoes):
+    """Retorna o menor tempo (em segundos) entre as repetições."""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara os codecs de serialização de memórias")
+    parser.add_argument("--quantidade", type=int, default=100000, help="Número de memórias do corpus")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Repetições por medição")
+    args = parser.parse_args()
+
+    print(f"Gerando corpus com {args.quantidade} memórias...")
+    documento = gerar_corpus(args.quantidade)
+
+    nomes = ["json", "json+gzip"]
+    if ZSTD_DISPONIVEL:
+        nomes.append("json+zstd")
+    if MSGPACK_DISPONIVEL:
+        nomes.extend(["msgpack", "msgpack+gzip"])
+        if ZSTD_DISPONIVEL:
+            nomes.append("msgpack+zstd")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        resultados = []
+
+        # Referência: formato anterior (json.dump com indent=2)
+        caminho = os.path.join(diretorio, "referencia.json")
+
+        def salvar_referencia():
+            with open(caminho, "w", encoding="utf-8") as f:
+                json.dump(documento, f, ensure_ascii=False, indent=2)
+
+        def carregar_referencia():
+            with open(caminho, "r", encoding="utf-8") as f:
+                json.load(f)
+
+        resultados.append(("json indent=2 (anterior)", medir(salvar_referencia, args.repeticoes),
+                           medir(carregar_referencia, args.repeticoes), os.path.getsize(caminho)))
+
+        for nome in nomes:
+            codec = Codec(nome)
+            caminho_codec = os.path.join(diretorio, f"memorias.{nome}")
+            tempo_salvar = medir(lambda: codec.salvar(caminho_codec, documento), args.repeticoes)
+            tempo_carregar = medir(lambda: carregar_arquivo(caminho_codec), args.repeticoes)
+            assert carregar_arquivo(caminho_codec) == documento
+            resultados.append((nome, tempo_salvar, tempo_carregar, os.path.getsize(caminho_codec)))
+
+    tamanho_referencia = resultados[0][3]
+    print(f"\n{'codec':<26}{'salvar (s)':>12}{'carregar (s)':>14}{'tamanho (MB)':>14}{'relativo':>10}")
+    for nome, tempo_salvar, tempo_carregar, tamanho in resultados:
+        print(f"{nome:<26}{tempo_salvar:>12.3f}{tempo_carregar:>14.3f}"
+              f"{tamanho / 1024 / 1024:>14.2f}{tamanho / tamanho_referencia:>10.0%}")
+
+    if not MSGPACK_DISPONIVEL or not ZSTD_DISPONIVEL:
+        print("\nCodecs omitidos por falta de dependência: "
+              + ", ".join(n for n, ok in (("msgpack", MSGPACK_DISPONIVEL), ("zstandard", ZSTD_DISPONIVEL)) if not ok))
+
+
+if __name__ == "__main__":
+    main()
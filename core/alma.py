@@ -8,6 +8,7 @@ from typing import Dict, Any, List
 from datetime import datetime
 from core.persona import Persona
 from core.memoria import Memoria
+from core.consolidacao import ConsolidadorMemorias
 from core.processador_pensamento import ProcessadorPensamento
 from core.learning import GerenciadorAprendizado
 from core.adaptive_learning import AprendizadoAdaptativo
@@ -24,6 +25,9 @@ class Alma:
             self.memoria = Memoria()
             self.logger.info("Memória inicializada")
             
+            # Consolidação em segundo plano das memórias geradas
+            self.consolidador = ConsolidadorMemorias(self.memoria)
+            
             # Inicializa a persona com a memória
             self.persona = Persona(self.memoria)
             self.logger.info("Persona inicializada")
@@ -45,6 +49,7 @@ class Alma:
             self._ciclo_task = None
             self._ciclo_aprendizado_task = None
             self._ciclo_adaptativo_task = None
+            self._ciclo_consolidacao_task = None
             self.logger.info("Tasks inicializadas")
             
             # Executa reflexões iniciais para processar memórias existentes
@@ -64,6 +69,7 @@ class Alma:
         self._ciclo_task = asyncio.create_task(self.ciclo_reflexao_continuo())
         self._ciclo_aprendizado_task = asyncio.create_task(self.gerenciador_aprendizado.ciclo_aprendizado_continuo())
         self._ciclo_adaptativo_task = asyncio.create_task(self.aprendizado_adaptativo.iniciar_ciclo_adaptativo())
+        self._ciclo_consolidacao_task = asyncio.create_task(self.consolidador.ciclo_consolidacao())
         
         self.logger.info("Ciclo de reflexão iniciado")
 
@@ -94,14 +100,15 @@ class Alma:
     async def _obter_pensamentos_pendentes(self) -> List[Dict[str, Any]]:
         """Obtém pensamentos pendentes para processamento."""
         try:
-            # Obtém memórias recentes
-            todas_memorias = self.memoria.listar_todas_memorias()
-            if not todas_memorias:
+            # Amostra apenas a camada de curto prazo (em RAM), sem copiar ou
+            # ordenar o acervo: o custo não cresce com o histórico em disco
+            total_memorias = self.memoria.contar_memorias("curto_prazo")
+            if not total_memorias:
                 return []
             
             # Sempre seleciona algumas memórias para processar (garantindo que pelo menos reflexão ocorra)
-            quantidade = min(3, len(todas_memorias))  # No máximo 3 memórias por ciclo
-            memorias_selecionadas = random.sample(todas_memorias, quantidade) if len(todas_memorias) > quantidade else todas_memorias
+            quantidade = min(3, total_memorias)  # No máximo 3 memórias por ciclo
+            memorias_selecionadas = self.memoria.amostrar_memorias(quantidade)
             
             pensamentos = []
             
@@ -117,11 +124,11 @@ class Alma:
                 })
                 
                 # Chance de criar pensamento de síntese (combinando memórias)
-                if random.random() < 0.5 and len(todas_memorias) > 1:  # 50% de chance
+                if random.random() < 0.5 and total_memorias > 1:  # 50% de chance
                     # Pega outra memória aleatória diferente da atual
-                    outras_memorias = [m for m in todas_memorias if m['id'] != memoria['id']]
+                    outras_memorias = [m for m in self.memoria.amostrar_memorias(2) if m['id'] != memoria['id']]
                     if outras_memorias:
-                        outra_memoria = random.choice(outras_memorias)
+                        outra_memoria = outras_memorias[0]
                         
                         # Cria pensamento de síntese
                         pensamentos.append({
@@ -172,17 +179,23 @@ class Alma:
         """Encerra o ciclo de reflexão."""
         if self._ciclo_task is None:
             self.logger.warning("Ciclo de reflexão já está encerrado")
-            return
-
-        self._ciclo_task.cancel()
-        self._ciclo_aprendizado_task.cancel()
-        self._ciclo_adaptativo_task.cancel()
-        
-        self._ciclo_task = None
-        self._ciclo_aprendizado_task = None
-        self._ciclo_adaptativo_task = None
+        else:
+            tarefas = [self._ciclo_task, self._ciclo_aprendizado_task,
+                       self._ciclo_adaptativo_task, self._ciclo_consolidacao_task]
+            for tarefa in tarefas:
+                tarefa.cancel()
+            # Espera os ciclos saírem de fato, para que nenhum grave depois do flush
+            await asyncio.gather(*tarefas, return_exceptions=True)
+            
+            self._ciclo_task = None
+            self._ciclo_aprendizado_task = None
+            self._ciclo_adaptativo_task = None
+            self._ciclo_consolidacao_task = None
+            
+            self.logger.info("Ciclo de reflexão encerrado")
         
-        self.logger.info("Ciclo de reflexão encerrado")
+        # Garante que escritas agrupadas pendentes cheguem ao disco
+        await self.memoria.flush_async()
 
     def status(self) -> Dict[str, Any]:
         """Retorna o status atual do sistema."""
@@ -190,18 +203,19 @@ class Alma:
             'persona': self.persona.status(),
             'aprendizado': self.gerenciador_aprendizado.status_aprendizado(),
             'adaptacao': self.aprendizado_adaptativo.status_adaptacao(),
+            'consolidacao': self.consolidador.status(),
             'ciclo_ativo': self._ciclo_task is not None
         }
 
     async def _executar_reflexoes_iniciais(self):
         """Executa reflexões iniciais sobre as memórias existentes."""
         try:
-            todas_memorias = self.memoria.listar_todas_memorias()
-            if todas_memorias:
-                self.logger.info(f"Executando reflexões iniciais sobre {len(todas_memorias)} memórias existentes")
+            total_memorias = self.memoria.contar_memorias()
+            if total_memorias:
+                self.logger.info(f"Executando reflexões iniciais sobre {total_memorias} memórias existentes")
                 
                 # Seleciona algumas memórias para reflexão inicial
-                quantidade = min(5, len(todas_memorias))
+                quantidade = min(5, total_memorias)
                 for _ in range(quantidade):
                     await self._executar_ciclo_reflexao()
                     
@@ -0,0 +1,21 @@
+"""
+Módulo de Armazenamento - Mecanismos de persistência das memórias.
+"""
+
+from .codec import Codec, carregar_arquivo
+from .journal import JournalMemorias
+from .sqlite import ArmazenamentoSQLite
+from .particoes import ArmazenamentoParticionado
+from .escritor import EscritorAssincrono, escritor
+from .indice_secundario import IndiceSecundario
+from .enriquecimentos import ArmazenamentoEnriquecimentos
+from .mudancas import FeedMudancas
+from .linhagem import IndiceLinhagem
+from .indice_invertido import IndiceInvertido, ArmazenamentoTermos
+from .indice_trigramas import IndiceTrigramas
+from .minhash import IndiceMinHash
+
+__all__ = ['Codec', 'carregar_arquivo', 'JournalMemorias', 'ArmazenamentoSQLite', 'ArmazenamentoParticionado',
+           'EscritorAssincrono', 'escritor', 'IndiceSecundario', 'ArmazenamentoEnriquecimentos',
+           'FeedMudancas', 'IndiceLinhagem', 'IndiceInvertido', 'ArmazenamentoTermos',
+           'IndiceTrigramas', 'IndiceMinHash']
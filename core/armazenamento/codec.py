@@ -0,0 +1,167 @@
+"""
+Módulo Codec - Serialização compacta dos arquivos de memória e de estado.
+
+Um codec combina um formato ("json" ou "msgpack") com uma compressão
+opcional ("gzip" ou "zstd"), identificados por nomes como "json",
+"json+gzip" ou "msgpack+zstd". A leitura detecta o formato pelos bytes
+iniciais do arquivo, de modo que arquivos gravados com qualquer codec
+(inclusive o JSON indentado antigo) continuam legíveis após uma troca
+de configuração.
+"""
+
+import gzip
+import json
+import logging
+import os
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Dependências opcionais
+try:
+    import msgpack
+    MSGPACK_DISPONIVEL = True
+except ImportError:
+    MSGPACK_DISPONIVEL = False
+
+try:
+    import zstandard
+    ZSTD_DISPONIVEL = True
+except ImportError:
+    ZSTD_DISPONIVEL = False
+
+# Bytes iniciais que identificam cada compressão
+ASSINATURA_GZIP = b"\x1f\x8b"
+ASSINATURA_ZSTD = b"\x28\xb5\x2f\xfd"
+
+# Elementos de lista serializados por chamada ao encoder (cada chamada segura o GIL)
+ELEMENTOS_POR_PARTE = 1000
+
+_ENCODER_JSON = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+class Codec:
+    def __init__(self, nome: str = "json"):
+        """Cria o codec descrito pelo nome.
+
+        Formatos ou compressões cujas bibliotecas não estão instaladas são
+        substituídos por JSON e sem compressão, com um aviso no log.
+
+        Args:
+            nome (str): "formato" ou "formato+compressao", ex.: "msgpack+zstd"
+        """
+        formato, _, compressao = nome.partition("+")
+        compressao = compressao or None
+
+        if formato not in ("json", "msgpack"):
+            raise ValueError(f"Formato de serialização desconhecido: {formato}")
+        if compressao not in (None, "gzip", "zstd"):
+            raise ValueError(f"Compressão desconhecida: {compressao}")
+
+        if formato == "msgpack" and not MSGPACK_DISPONIVEL:
+            logger.warning("msgpack não está instalado; usando JSON compacto")
+            formato = "json"
+        if compressao == "zstd" and not ZSTD_DISPONIVEL:
+            logger.warning("zstandard não está instalado; gravando sem compressão")
+            compressao = None
+
+        self.formato = formato
+        self.compressao = compressao
+
+    @property
+    def nome(self) -> str:
+        """Nome efetivo do codec (após eventuais substituições)."""
+        return f"{self.formato}+{self.compressao}" if self.compressao else self.formato
+
+    def codificar(self, objeto: Any) -> bytes:
+        """Serializa e, se configurado, comprime o objeto.
+
+        Documentos (dicionários) são serializados campo a campo e listas em
+        fatias. O resultado é idêntico ao da serialização de uma só vez, mas
+        cada chamada ao encoder em C segura o GIL por pouco tempo: gravando
+        na thread do escritor, o event loop continua respondendo enquanto um
+        arquivo grande é serializado.
+        """
+        if self.formato == "msgpack":
+            dados = _msgpack_em_partes(objeto)
+        else:
+            dados = _json_em_partes(objeto).encode("utf-8")
+
+        if self.compressao == "gzip":
+            # Nível 6 equilibra tamanho e velocidade; mtime fixo torna a saída reprodutível
+            return gzip.compress(dados, compresslevel=6, mtime=0)
+        if self.compressao == "zstd":
+            return zstandard.ZstdCompressor(level=3).compress(dados)
+        return dados
+
+    def salvar(self, caminho: str, objeto: Any):
+        """Grava o objeto de forma atômica (arquivo temporário + rename)."""
+        caminho_temporario = caminho + ".tmp"
+        with open(caminho_temporario, "wb") as f:
+            f.write(self.codificar(objeto))
+        os.replace(caminho_temporario, caminho)
+
+
+def _json_em_partes(objeto: Any) -> str:
+    """Serializa em JSON compacto, listas em fatias de ELEMENTOS_POR_PARTE."""
+    if isinstance(objeto, list):
+        partes = (_ENCODER_JSON.encode(objeto[inicio:inicio + ELEMENTOS_POR_PARTE])[1:-1]
+                  for inicio in range(0, len(objeto), ELEMENTOS_POR_PARTE))
+        return "[" + ",".join(partes) + "]"
+    if isinstance(objeto, dict) and all(isinstance(chave, str) for chave in objeto):
+        return "{" + ",".join(f"{_ENCODER_JSON.encode(chave)}:{_json_em_partes(valor)}"
+                              for chave, valor in objeto.items()) + "}"
+    return _ENCODER_JSON.encode(objeto)
+
+
+def _msgpack_em_partes(objeto: Any) -> bytes:
+    """Serializa em msgpack, um elemento por chamada ao packer."""
+    packer = msgpack.Packer(use_bin_type=True)
+    if isinstance(objeto, list):
+        return packer.pack_array_header(len(objeto)) + b"".join(packer.pack(e) for e in objeto)
+    if isinstance(objeto, dict):
+        partes = [packer.pack_map_header(len(objeto))]
+        for chave, valor in objeto.items():
+            partes.append(packer.pack(chave))
+            partes.append(_msgpack_em_partes(valor) if isinstance(valor, list) else packer.pack(valor))
+        return b"".join(partes)
+    return packer.pack(objeto)
+
+
+def decodificar(dados: bytes) -> Any:
+    """Desserializa bytes gravados por qualquer codec, detectando o formato.
+
+    Args:
+        dados (bytes): Conteúdo do arquivo
+
+    Returns:
+        O objeto desserializado
+    """
+    if dados.startswith(ASSINATURA_GZIP):
+        dados = gzip.decompress(dados)
+    elif dados.startswith(ASSINATURA_ZSTD):
+        if not ZSTD_DISPONIVEL:
+            raise RuntimeError("Arquivo comprimido com zstd, mas zstandard não está instalado")
+        dados = zstandard.ZstdDecompressor().decompress(dados, max_output_size=2 ** 31)
+
+    # Os documentos gravados são sempre objetos ou listas JSON
+    inicio = dados.lstrip()[:1]
+    if dados.startswith(b"\xef\xbb\xbf") or inicio in (b"{", b"["):
+        return json.loads(dados.decode("utf-8-sig"))
+
+    if not MSGPACK_DISPONIVEL:
+        raise RuntimeError("Arquivo em msgpack, mas msgpack não está instalado")
+    return msgpack.unpackb(dados, raw=False, strict_map_key=False)
+
+
+def carregar_arquivo(caminho: str) -> Any:
+    """Lê um arquivo gravado por qualquer codec.
+
+    Args:
+        caminho (str): Caminho do arquivo
+
+    Returns:
+        O objeto desserializado
+    """
+    with open(caminho, "rb") as f:
+        return decodificar(f.read())
@@ -0,0 +1,115 @@
+"""
+Módulo Enriquecimentos - Armazenamento separado dos dados pesados de análise.
+
+A análise semântica (palavras-chave, sentimento, entidades com posições)
+e as sentenças contraditórias podem ser muitas vezes maiores que o
+conteúdo da memória. Guardá-las dentro do registro faz toda listagem,
+amostragem ou busca textual desserializar esses dados sem usá-los. Este
+armazenamento os mantém em um banco SQLite à parte, indexado pelo id da
+memória, e só é lido quando alguém pede o enriquecimento de uma memória.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+from typing import Dict, Any, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Campos retirados do registro principal e gravados no armazenamento separado
+CAMPOS_ENRIQUECIMENTO = ("analise_semantica", "sentencas_contraditorias")
+
+
+def separar_enriquecimento(memoria: Dict[str, Any]) -> Dict[str, Any]:
+    """Retira da memória os campos de enriquecimento.
+
+    O registro passa a listar em "enriquecimentos" os campos guardados à
+    parte, para que filtros por presença de campo continuem funcionando.
+
+    Args:
+        memoria (dict): Memória alterada no próprio dicionário
+
+    Returns:
+        dict: Os campos retirados (vazio se não havia nenhum)
+    """
+    carga = {campo: memoria.pop(campo) for campo in CAMPOS_ENRIQUECIMENTO if campo in memoria}
+    if carga:
+        memoria["enriquecimentos"] = sorted(set(memoria.get("enriquecimentos", ())) | set(carga))
+    return carga
+
+
+class ArmazenamentoEnriquecimentos:
+    def __init__(self, caminho: str):
+        """Abre (ou cria) o banco de enriquecimentos.
+
+        Args:
+            caminho (str): Caminho do arquivo SQLite
+        """
+        self.caminho = caminho
+        diretorio = os.path.dirname(caminho)
+        if diretorio and not os.path.exists(diretorio):
+            os.makedirs(diretorio)
+
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        with self.conexao:
+            self.conexao.execute("""
+                CREATE TABLE IF NOT EXISTS enriquecimentos (
+                    memoria_id INTEGER PRIMARY KEY,
+                    dados TEXT NOT NULL
+                )
+            """)
+            self.conexao.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    chave TEXT PRIMARY KEY,
+                    valor TEXT
+                )
+            """)
+
+    def obter(self, memoria_id: int) -> Dict[str, Any]:
+        """Retorna os campos de enriquecimento da memória (vazio se não houver)."""
+        linha = self.conexao.execute(
+            "SELECT dados FROM enriquecimentos WHERE memoria_id = ?", (memoria_id,)
+        ).fetchone()
+        return json.loads(linha[0]) if linha else {}
+
+    def gravar(self, memoria_id: int, carga: Dict[str, Any]):
+        """Grava os campos de enriquecimento, mesclando com os já existentes."""
+        self.gravar_lote([(memoria_id, carga)])
+
+    def gravar_lote(self, itens: Iterable[Tuple[int, Dict[str, Any]]]):
+        """Grava vários enriquecimentos em uma única transação.
+
+        Args:
+            itens (iterable): Pares (id da memória, campos de enriquecimento)
+        """
+        with self.conexao:
+            for memoria_id, carga in itens:
+                existente = self.obter(memoria_id)
+                self.conexao.execute(
+                    "INSERT OR REPLACE INTO enriquecimentos (memoria_id, dados) VALUES (?, ?)",
+                    (memoria_id, json.dumps({**existente, **carga}, ensure_ascii=False))
+                )
+
+    def remover(self, memoria_id: int):
+        """Descarta o enriquecimento de uma memória removida."""
+        with self.conexao:
+            self.conexao.execute("DELETE FROM enriquecimentos WHERE memoria_id = ?", (memoria_id,))
+
+    def total(self) -> int:
+        """Retorna o número de memórias com enriquecimento gravado."""
+        return self.conexao.execute("SELECT COUNT(*) FROM enriquecimentos").fetchone()[0]
+
+    def obter_meta(self, chave: str):
+        linha = self.conexao.execute("SELECT valor FROM meta WHERE chave = ?", (chave,)).fetchone()
+        return linha[0] if linha else None
+
+    def definir_meta(self, chave: str, valor: str):
+        with self.conexao:
+            self.conexao.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES (?, ?)", (chave, valor))
+
+    def fechar(self):
+        """Fecha a conexão com o banco."""
+        self.conexao.close()
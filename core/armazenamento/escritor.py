@@ -0,0 +1,102 @@
+"""
+Módulo Escritor - Thread dedicada à serialização e gravação em disco.
+
+Todo o sistema roda em um único event loop do asyncio; gravar um arquivo
+de vários megabytes diretamente em uma corrotina bloqueia o chat e todos
+os ciclos em andamento. O escritor executa essas tarefas em uma única
+thread, na ordem em que foram submetidas, de modo que gravações de um
+mesmo arquivo nunca se invertem e uma leitura submetida depois de uma
+gravação sempre enxerga o resultado dela.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class EscritorAssincrono:
+    def __init__(self, nome: str = "escritor-memorias"):
+        """Cria o escritor; a thread só é iniciada na primeira tarefa.
+
+        Args:
+            nome (str): Nome da thread (aparece nos logs e no depurador)
+        """
+        self.nome = nome
+        self._executor = None
+        self._thread = None
+        self._trava = threading.Lock()
+
+    def _obter_executor(self) -> ThreadPoolExecutor:
+        with self._trava:
+            if self._executor is None:
+                # Um único worker garante a execução em ordem de submissão
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=self.nome,
+                                                    initializer=self._registrar_thread)
+            return self._executor
+
+    def _registrar_thread(self):
+        self._thread = threading.current_thread()
+
+    def na_thread_escritora(self) -> bool:
+        """Indica se o código atual está rodando na thread do escritor."""
+        return threading.current_thread() is self._thread
+
+    def submeter(self, funcao: Callable, *args, **kwargs) -> Future:
+        """Enfileira uma tarefa e retorna seu Future (concurrent.futures).
+
+        Args:
+            funcao (callable): Função a executar na thread do escritor
+            *args, **kwargs: Argumentos da função
+
+        Returns:
+            Future: Concluído quando a tarefa terminar
+        """
+        return self._obter_executor().submit(funcao, *args, **kwargs)
+
+    async def executar(self, funcao: Callable, *args, **kwargs) -> Any:
+        """Executa a tarefa na thread do escritor e aguarda sem bloquear o loop.
+
+        Returns:
+            O valor retornado pela função (exceções são propagadas)
+        """
+        return await asyncio.wrap_future(self.submeter(funcao, *args, **kwargs))
+
+    def executar_sincrono(self, funcao: Callable, *args, **kwargs) -> Any:
+        """Executa a tarefa na fila do escritor e bloqueia até o fim.
+
+        Usado pelos caminhos síncronos, para que respeitem a ordem das
+        gravações assíncronas ainda pendentes. Chamado de dentro da própria
+        thread do escritor, executa diretamente (evita deadlock).
+
+        Returns:
+            O valor retornado pela função (exceções são propagadas)
+        """
+        if self.na_thread_escritora():
+            return funcao(*args, **kwargs)
+        return self.submeter(funcao, *args, **kwargs).result()
+
+    async def aguardar(self):
+        """Aguarda a conclusão de todas as tarefas submetidas até agora."""
+        if self._executor is not None:
+            await self.executar(lambda: None)
+
+    def aguardar_sincrono(self):
+        """Versão bloqueante de aguardar()."""
+        if self._executor is not None and not self.na_thread_escritora():
+            self.submeter(lambda: None).result()
+
+    def fechar(self):
+        """Conclui as tarefas pendentes e encerra a thread."""
+        with self._trava:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+                self._thread = None
+
+
+# Instância compartilhada: uma única fila ordena as gravações de todos os módulos
+escritor = EscritorAssincrono()
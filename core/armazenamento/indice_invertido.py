@@ -0,0 +1,406 @@
+"""
+Módulo Índice Invertido - Listas de ocorrência por termo para a busca textual.
+
+buscar_memorias comparava o termo com o conteúdo de cada memória, a cada
+mensagem do chat e a cada reflexão. O índice invertido guarda, para cada
+termo (palavra em minúsculas), os ids das memórias cujo conteúdo o
+contém, atualizado a cada inserção, atualização e remoção. Uma busca por
+um ou mais termos vira a interseção (operador "e") ou a união ("ou") das
+listas desses termos, com custo proporcional ao tamanho delas.
+
+Cada ocorrência guarda também a frequência do termo na memória, e o
+índice mantém o comprimento (em termos) de cada memória e os totais do
+acervo. Com isso ranquear() ordena as memórias por relevância BM25 sem
+ler seu conteúdo, mantendo só as k melhores em um heap.
+
+Três formas compartilham a mesma tokenização:
+    IndiceInvertido: em memória (camada de curto prazo da core.memoria)
+    tabela indice_invertido: no próprio banco do ArmazenamentoSQLite
+    ArmazenamentoTermos: banco SQLite à parte, ao lado de um armazenamento
+        em arquivos (JSON ou particionado), que guarda também o índice de
+        trigramas da busca por trecho (ver indice_trigramas.py)
+"""
+
+import heapq
+import math
+import os
+import re
+import sqlite3
+from collections import Counter
+from typing import Dict, Any, List, Iterable, Optional, Set, Tuple
+from . import indice_trigramas
+
+PADRAO_TERMO = re.compile(r"\w+")
+
+# Operadores aceitos na combinação dos termos da consulta
+OPERADORES = ("e", "ou")
+
+# Parâmetros do BM25: saturação da frequência do termo e normalização pelo comprimento
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenizar(texto: str) -> Set[str]:
+    """Retorna os termos distintos do texto, em minúsculas."""
+    return set(PADRAO_TERMO.findall(texto.lower())) if texto else set()
+
+
+def contar_termos(texto: str) -> Counter:
+    """Retorna a frequência de cada termo do texto, em minúsculas."""
+    return Counter(PADRAO_TERMO.findall(texto.lower())) if texto else Counter()
+
+
+def pontuar_bm25(listas: Iterable[Tuple[int, Iterable[Tuple[Any, int, int]]]], total_memorias: int,
+                 comprimento_medio: float, limite: int) -> List[Tuple[float, Any]]:
+    """Soma as contribuições BM25 de cada termo e seleciona as k maiores.
+
+    Args:
+        listas (iterable): Para cada termo, (número de memórias que o contêm,
+            ocorrências (id, frequência, comprimento da memória))
+        total_memorias (int): Memórias indexadas
+        comprimento_medio (float): Comprimento médio das memórias, em termos
+        limite (int): Quantas memórias manter
+
+    Returns:
+        list: Pares (pontuação, id), da maior pontuação para a menor
+    """
+    pontuacoes: Dict[Any, float] = {}
+    comprimento_medio = comprimento_medio or 1
+    for n_memorias, ocorrencias in listas:
+        if not n_memorias:
+            continue
+        idf = math.log(1 + (total_memorias - n_memorias + 0.5) / (n_memorias + 0.5))
+        for memoria_id, frequencia, comprimento in ocorrencias:
+            normalizacao = BM25_K1 * (1 - BM25_B + BM25_B * comprimento / comprimento_medio)
+            pontuacoes[memoria_id] = pontuacoes.get(memoria_id, 0.0) + (
+                idf * frequencia * (BM25_K1 + 1) / (frequencia + normalizacao)
+            )
+    return heapq.nlargest(limite, ((pontuacao, memoria_id) for memoria_id, pontuacao in pontuacoes.items()),
+                          key=lambda item: item[0])
+
+
+def termos_consulta(consulta: str, operador: str = "e") -> List[str]:
+    """Extrai os termos de uma consulta e valida o operador.
+
+    Args:
+        consulta (str): Texto buscado (uma ou mais palavras)
+        operador (str): "e" (todas as palavras) ou "ou" (qualquer uma)
+
+    Returns:
+        list: Termos distintos, na ordem em que aparecem
+    """
+    if operador not in OPERADORES:
+        raise ValueError(f"Operador de busca inválido: {operador}")
+    return list(dict.fromkeys(PADRAO_TERMO.findall(consulta.lower())))
+
+
+def criar_tabela(conexao: sqlite3.Connection) -> bool:
+    """Cria as tabelas de ocorrências por termo, se ainda não existirem.
+
+    Tabelas de ocorrência sem a coluna de frequência (anteriores ao BM25)
+    são descartadas para serem reconstruídas.
+
+    Returns:
+        bool: False se o índice existente foi descartado e precisa ser refeito
+    """
+    colunas = {linha[1] for linha in conexao.execute("PRAGMA table_info(indice_invertido)")}
+    valido = not colunas or "frequencia" in colunas
+    if not valido:
+        conexao.execute("DROP TABLE indice_invertido")
+    conexao.execute("""
+        CREATE TABLE IF NOT EXISTS indice_invertido (
+            termo TEXT NOT NULL,
+            memoria_id INTEGER NOT NULL,
+            frequencia INTEGER NOT NULL,
+            PRIMARY KEY (termo, memoria_id)
+        ) WITHOUT ROWID
+    """)
+    conexao.execute("CREATE INDEX IF NOT EXISTS idx_indice_invertido_memoria ON indice_invertido(memoria_id)")
+    conexao.execute("""
+        CREATE TABLE IF NOT EXISTS comprimentos_termos (
+            memoria_id INTEGER PRIMARY KEY,
+            comprimento INTEGER NOT NULL
+        )
+    """)
+    conexao.execute("""
+        CREATE TABLE IF NOT EXISTS estatisticas_termos (
+            chave TEXT PRIMARY KEY,
+            valor INTEGER NOT NULL
+        )
+    """)
+    conexao.execute(
+        "INSERT OR IGNORE INTO estatisticas_termos (chave, valor) VALUES ('memorias', 0), ('soma_comprimentos', 0)"
+    )
+    if not valido:
+        limpar(conexao)
+    return valido
+
+
+def _somar_estatisticas(conexao: sqlite3.Connection, memorias: int, comprimentos: int):
+    conexao.executemany(
+        "UPDATE estatisticas_termos SET valor = valor + ? WHERE chave = ?",
+        ((memorias, "memorias"), (comprimentos, "soma_comprimentos"))
+    )
+
+
+def indexar(conexao: sqlite3.Connection, memorias: Iterable[Dict[str, Any]], novas: bool = True):
+    """Grava os termos das memórias (deve ser chamado dentro de uma transação).
+
+    Args:
+        memorias (iterable): Memórias inseridas ou substituídas
+        novas (bool): False quando podem existir termos antigos a descartar
+    """
+    memorias = list(memorias)
+    if not novas:
+        desindexar(conexao, [m["id"] for m in memorias])
+    contagens = [(m["id"], contar_termos(m.get("conteudo", ""))) for m in memorias]
+    conexao.executemany(
+        "INSERT OR REPLACE INTO indice_invertido (termo, memoria_id, frequencia) VALUES (?, ?, ?)",
+        ((termo, memoria_id, frequencia) for memoria_id, contagem in contagens
+         for termo, frequencia in contagem.items())
+    )
+    conexao.executemany(
+        "INSERT OR REPLACE INTO comprimentos_termos (memoria_id, comprimento) VALUES (?, ?)",
+        ((memoria_id, sum(contagem.values())) for memoria_id, contagem in contagens)
+    )
+    _somar_estatisticas(conexao, len(contagens), sum(sum(c.values()) for _, c in contagens))
+
+
+def desindexar(conexao: sqlite3.Connection, ids: List[Any]):
+    """Descarta os termos das memórias (deve ser chamado dentro de uma transação)."""
+    removidas = soma = 0
+    for memoria_id in ids:
+        linha = conexao.execute(
+            "SELECT comprimento FROM comprimentos_termos WHERE memoria_id = ?", (memoria_id,)
+        ).fetchone()
+        if linha is None:
+            continue
+        removidas += 1
+        soma += linha[0]
+        conexao.execute("DELETE FROM indice_invertido WHERE memoria_id = ?", (memoria_id,))
+        conexao.execute("DELETE FROM comprimentos_termos WHERE memoria_id = ?", (memoria_id,))
+    _somar_estatisticas(conexao, -removidas, -soma)
+
+
+def limpar(conexao: sqlite3.Connection):
+    """Descarta todos os termos (deve ser chamado dentro de uma transação)."""
+    conexao.execute("DELETE FROM indice_invertido")
+    conexao.execute("DELETE FROM comprimentos_termos")
+    conexao.execute("UPDATE estatisticas_termos SET valor = 0")
+
+
+def consulta_ids(termos: List[str], operador: str = "e") -> Tuple[str, List[str]]:
+    """Monta a subconsulta dos ids que contêm todos (ou algum dos) termos."""
+    juncao = " INTERSECT " if operador == "e" else " UNION "
+    sql = juncao.join("SELECT memoria_id FROM indice_invertido WHERE termo = ?" for _ in termos)
+    return sql, list(termos)
+
+
+def ranquear(conexao: sqlite3.Connection, termos: List[str], limite: int) -> List[Tuple[float, int]]:
+    """Ranqueia por BM25 as memórias com algum dos termos, lendo só suas ocorrências.
+
+    Returns:
+        list: Pares (pontuação, id), da maior pontuação para a menor
+    """
+    estatisticas = dict(conexao.execute("SELECT chave, valor FROM estatisticas_termos"))
+    total = estatisticas.get("memorias", 0)
+    if not termos or not total:
+        return []
+    listas = []
+    for termo in termos:
+        ocorrencias = conexao.execute(
+            "SELECT p.memoria_id, p.frequencia, c.comprimento FROM indice_invertido p "
+            "JOIN comprimentos_termos c ON c.memoria_id = p.memoria_id WHERE p.termo = ?", (termo,)
+        ).fetchall()
+        listas.append((len(ocorrencias), ocorrencias))
+    return pontuar_bm25(listas, total, estatisticas["soma_comprimentos"] / total, limite)
+
+
+class IndiceInvertido:
+    def __init__(self, memorias: Iterable[Dict[str, Any]] = ()):
+        """Cria o índice em memória, opcionalmente já populado.
+
+        Args:
+            memorias (iterable): Memórias iniciais (precisam ter "id")
+        """
+        # termo -> {id: frequência do termo na memória}
+        self._ocorrencias: Dict[str, Dict[Any, int]] = {}
+        self._comprimentos: Dict[Any, int] = {}
+        self._soma_comprimentos = 0
+        for memoria in memorias:
+            self.adicionar(memoria)
+
+    def adicionar(self, memoria: Dict[str, Any]):
+        """Indexa uma memória nova."""
+        memoria_id = memoria["id"]
+        contagem = contar_termos(memoria.get("conteudo", ""))
+        for termo, frequencia in contagem.items():
+            self._ocorrencias.setdefault(termo, {})[memoria_id] = frequencia
+        comprimento = sum(contagem.values())
+        self._soma_comprimentos += comprimento - self._comprimentos.get(memoria_id, 0)
+        self._comprimentos[memoria_id] = comprimento
+
+    def remover(self, memoria: Dict[str, Any]):
+        """Retira uma memória do índice (usa o conteúdo como estava indexado)."""
+        memoria_id = memoria["id"]
+        for termo in tokenizar(memoria.get("conteudo", "")):
+            ocorrencias = self._ocorrencias.get(termo)
+            if ocorrencias is not None:
+                ocorrencias.pop(memoria_id, None)
+                if not ocorrencias:
+                    del self._ocorrencias[termo]
+        self._soma_comprimentos -= self._comprimentos.pop(memoria_id, 0)
+
+    def atualizar(self, anterior: Dict[str, Any], atual: Dict[str, Any]):
+        """Reindexa uma memória alterada (só quando o conteúdo mudou)."""
+        if anterior.get("conteudo") != atual.get("conteudo"):
+            self.remover(anterior)
+            self.adicionar(atual)
+
+    def consultar(self, termos: List[str], operador: str = "e") -> Set[Any]:
+        """Retorna os ids que contêm todos os termos ("e") ou algum deles ("ou").
+
+        A interseção começa pela menor lista de ocorrências.
+        """
+        listas = [self._ocorrencias.get(termo, {}) for termo in termos]
+        if not listas:
+            return set()
+        if operador == "ou":
+            return set().union(*listas)
+        listas.sort(key=len)
+        resultado = set(listas[0])
+        for ids in listas[1:]:
+            if not resultado:
+                break
+            resultado &= ids.keys()
+        return resultado
+
+    def ranquear(self, termos: List[str], limite: int) -> List[Tuple[float, Any]]:
+        """Ranqueia por BM25 as memórias com algum dos termos.
+
+        Returns:
+            list: Pares (pontuação, id), da maior pontuação para a menor
+        """
+        total = len(self._comprimentos)
+        if not termos or not total:
+            return []
+        listas = []
+        for termo in termos:
+            ocorrencias = self._ocorrencias.get(termo, {})
+            listas.append((len(ocorrencias), (
+                (memoria_id, frequencia, self._comprimentos[memoria_id])
+                for memoria_id, frequencia in ocorrencias.items()
+            )))
+        return pontuar_bm25(listas, total, self._soma_comprimentos / total, limite)
+
+
+class ArmazenamentoTermos:
+    def __init__(self, caminho: str):
+        """Abre (ou cria) o banco de termos ao lado de um armazenamento em arquivos.
+
+        Args:
+            caminho (str): Caminho do arquivo SQLite
+        """
+        self.caminho = caminho
+        diretorio = os.path.dirname(caminho)
+        if diretorio and not os.path.exists(diretorio):
+            os.makedirs(diretorio)
+
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        with self.conexao:
+            self.conexao.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    chave TEXT PRIMARY KEY,
+                    valor TEXT
+                )
+            """)
+            trigramas_existentes = self.conexao.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'indice_trigramas'"
+            ).fetchone()
+            indice_trigramas.criar_tabela(self.conexao)
+            # Índices anteriores ao BM25 ou aos trigramas são refeitos pelo dono
+            if not criar_tabela(self.conexao) or not trigramas_existentes:
+                self.conexao.execute("DELETE FROM meta WHERE chave = 'indexado'")
+
+    def indexar(self, memorias: Iterable[Dict[str, Any]], novas: bool = True):
+        """Grava os termos e trigramas de várias memórias em uma única transação.
+
+        Args:
+            memorias (iterable): Memórias inseridas ou substituídas
+            novas (bool): False quando podem existir termos antigos a descartar
+        """
+        memorias = list(memorias)
+        with self.conexao:
+            indexar(self.conexao, memorias, novas)
+            indice_trigramas.indexar(self.conexao, memorias, novas)
+
+    def remover(self, memoria_id: int):
+        """Descarta os termos e trigramas de uma memória removida."""
+        with self.conexao:
+            desindexar(self.conexao, [memoria_id])
+            self.conexao.execute("DELETE FROM indice_trigramas WHERE memoria_id = ?", (memoria_id,))
+
+    def limpar(self):
+        """Descarta todos os termos e trigramas (antes de reindexar o armazenamento inteiro)."""
+        with self.conexao:
+            limpar(self.conexao)
+            self.conexao.execute("DELETE FROM indice_trigramas")
+
+    def consultar(self, termos: List[str], operador: str = "e", limite: int = -1) -> List[int]:
+        """Retorna os ids que contêm todos os termos ("e") ou algum deles ("ou").
+
+        Args:
+            termos (list): Termos já extraídos com termos_consulta
+            operador (str): "e" ou "ou"
+            limite (int): Máximo de ids, dos menores em diante (-1 para todos)
+
+        Returns:
+            list: Ids em ordem crescente
+        """
+        if not termos:
+            return []
+        subconsulta, parametros = consulta_ids(termos, operador)
+        return [
+            linha[0] for linha in self.conexao.execute(
+                f"SELECT memoria_id FROM ({subconsulta}) ORDER BY memoria_id LIMIT ?", (*parametros, limite)
+            )
+        ]
+
+    def ranquear(self, termos: List[str], limite: int) -> List[Tuple[float, int]]:
+        """Ranqueia por BM25 as memórias com algum dos termos.
+
+        Returns:
+            list: Pares (pontuação, id), da maior pontuação para a menor
+        """
+        return ranquear(self.conexao, termos, limite)
+
+    def candidatos_trecho(self, trecho: str) -> Optional[List[int]]:
+        """Retorna os ids que contêm todos os trigramas do trecho, em ordem crescente.
+
+        Returns:
+            list: Candidatos a conferir com a comparação de substring, ou
+                None se o trecho for curto demais para o índice
+        """
+        consulta = indice_trigramas.consulta_candidatos(trecho)
+        if consulta is None:
+            return None
+        subconsulta, parametros = consulta
+        return [
+            linha[0] for linha in self.conexao.execute(
+                f"SELECT memoria_id FROM ({subconsulta}) ORDER BY memoria_id", parametros
+            )
+        ]
+
+    def obter_meta(self, chave: str):
+        linha = self.conexao.execute("SELECT valor FROM meta WHERE chave = ?", (chave,)).fetchone()
+        return linha[0] if linha else None
+
+    def definir_meta(self, chave: str, valor: str):
+        with self.conexao:
+            self.conexao.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES (?, ?)", (chave, valor))
+
+    def fechar(self):
+        """Fecha a conexão com o banco."""
+        self.conexao.close()
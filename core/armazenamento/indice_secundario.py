@@ -0,0 +1,124 @@
+"""
+Módulo Índice Secundário - Listas de ocorrência para filtros por campo.
+
+Consultas como "memórias com avaliação", "origem == sintese_interna" ou
+"memórias do tipo X" eram respondidas varrendo todo o armazenamento. O
+índice secundário mantém, para cada par (campo, valor), o conjunto de ids
+das memórias que o possuem, atualizado a cada inserção, atualização e
+remoção; um filtro vira a interseção de poucas listas.
+
+Pares indexados por memória:
+    ("tipo", valor), ("origem", valor), ("emocao", contexto_emocional.emocao),
+    ("tag", valor) para cada tag e ("campo", nome) para cada campo presente
+    além dos que toda memória possui (ver CAMPOS_SEMPRE_PRESENTES), incluindo
+    os guardados à parte listados em "enriquecimentos".
+"""
+
+from typing import Dict, Any, List, Optional, Iterable, Set, Tuple, Union
+
+# Campos presentes em praticamente toda memória: indexar sua presença só
+# aumentaria o índice, então tem_campo desses nomes é sempre verdadeiro
+CAMPOS_SEMPRE_PRESENTES = frozenset({"id", "conteudo", "criado_em", "timestamp", "versao"})
+
+
+def chaves_indice(memoria: Dict[str, Any]) -> Set[Tuple[str, str]]:
+    """Retorna os pares (campo, valor) sob os quais a memória é indexada."""
+    chaves = {("campo", nome) for nome in memoria if nome not in CAMPOS_SEMPRE_PRESENTES}
+    # Campos guardados no armazenamento de enriquecimentos contam como presentes
+    chaves.update(("campo", nome) for nome in memoria.get("enriquecimentos", ()))
+    for campo in ("tipo", "origem"):
+        valor = memoria.get(campo)
+        if valor is not None:
+            chaves.add((campo, str(valor)))
+    contexto = memoria.get("contexto_emocional")
+    if isinstance(contexto, dict) and contexto.get("emocao") is not None:
+        chaves.add(("emocao", str(contexto["emocao"])))
+    tags = memoria.get("tags")
+    if isinstance(tags, (list, tuple, set)):
+        chaves.update(("tag", str(tag)) for tag in tags)
+    return chaves
+
+
+def condicoes_filtro(tipo: Optional[str] = None, origem: Optional[str] = None, emocao: Optional[str] = None,
+                     tag: Optional[str] = None,
+                     tem_campo: Union[str, Iterable[str], None] = None) -> List[Tuple[str, str]]:
+    """Converte os parâmetros de filtrar() nos pares (campo, valor) exigidos.
+
+    Args:
+        tipo, origem, emocao, tag: Valores exigidos (None para ignorar)
+        tem_campo: Nome (ou nomes) de campos que a memória deve possuir
+
+    Returns:
+        list: Pares a intersectar; vazia quando não há restrição
+    """
+    condicoes = [(campo, str(valor)) for campo, valor in
+                 (("tipo", tipo), ("origem", origem), ("emocao", emocao), ("tag", tag)) if valor is not None]
+    if isinstance(tem_campo, str):
+        tem_campo = [tem_campo]
+    for nome in tem_campo or ():
+        if nome not in CAMPOS_SEMPRE_PRESENTES:
+            condicoes.append(("campo", nome))
+    return condicoes
+
+
+class IndiceSecundario:
+    def __init__(self, memorias: Iterable[Dict[str, Any]] = ()):
+        """Cria o índice em memória, opcionalmente já populado.
+
+        Args:
+            memorias (iterable): Memórias iniciais (precisam ter "id")
+        """
+        self._ocorrencias: Dict[Tuple[str, str], Set[Any]] = {}
+        for memoria in memorias:
+            self.adicionar(memoria)
+
+    def adicionar(self, memoria: Dict[str, Any]):
+        """Indexa uma memória nova."""
+        memoria_id = memoria["id"]
+        for chave in chaves_indice(memoria):
+            self._ocorrencias.setdefault(chave, set()).add(memoria_id)
+
+    def remover(self, memoria: Dict[str, Any]):
+        """Retira uma memória do índice (usa o registro como estava indexado)."""
+        memoria_id = memoria["id"]
+        for chave in chaves_indice(memoria):
+            ids = self._ocorrencias.get(chave)
+            if ids is not None:
+                ids.discard(memoria_id)
+                if not ids:
+                    del self._ocorrencias[chave]
+
+    def atualizar(self, anterior: Dict[str, Any], atual: Dict[str, Any]):
+        """Reindexa uma memória alterada, tocando só os pares que mudaram."""
+        memoria_id = atual["id"]
+        chaves_anteriores, chaves_atuais = chaves_indice(anterior), chaves_indice(atual)
+        for chave in chaves_anteriores - chaves_atuais:
+            ids = self._ocorrencias.get(chave)
+            if ids is not None:
+                ids.discard(memoria_id)
+                if not ids:
+                    del self._ocorrencias[chave]
+        for chave in chaves_atuais - chaves_anteriores:
+            self._ocorrencias.setdefault(chave, set()).add(memoria_id)
+
+    def consultar(self, condicoes: List[Tuple[str, str]]) -> Optional[Set[Any]]:
+        """Retorna os ids que atendem a todas as condições.
+
+        A interseção começa pela menor lista de ocorrências.
+
+        Returns:
+            set: Ids encontrados, ou None se não houver condição (sem restrição)
+        """
+        if not condicoes:
+            return None
+        listas = sorted((self._ocorrencias.get(chave, set()) for chave in condicoes), key=len)
+        resultado = set(listas[0])
+        for ids in listas[1:]:
+            if not resultado:
+                break
+            resultado &= ids
+        return resultado
+
+    def valores(self, campo: str) -> Dict[str, int]:
+        """Retorna cada valor indexado do campo com seu número de memórias."""
+        return {valor: len(ids) for (nome, valor), ids in self._ocorrencias.items() if nome == campo}
@@ -0,0 +1,130 @@
+"""
+Módulo Índice de Trigramas - Busca por trecho do conteúdo sem varredura.
+
+O comando buscar procura trechos, inclusive partes de palavras ("aprend"
+encontra "aprendizado"), o que o índice de palavras não responde. Este
+índice guarda, para cada sequência de três caracteres (trigrama) do
+conteúdo em minúsculas, os ids das memórias que a contêm. Toda memória
+que contém o trecho contém todos os trigramas dele, então a interseção
+das listas desses trigramas dá um conjunto pequeno de candidatas, que só
+então é conferido com a comparação de substring de fato.
+
+Trechos com menos de três caracteres não têm trigrama e continuam sendo
+respondidos por varredura.
+
+Como o índice de termos, existe em memória (IndiceTrigramas) e como
+tabela SQLite, no banco do ArmazenamentoSQLite ou no banco de termos ao
+lado dos armazenamentos em arquivos.
+"""
+
+import sqlite3
+from typing import Dict, Any, List, Iterable, Optional, Set, Tuple
+
+TAMANHO_TRIGRAMA = 3
+
+
+def trigramas(texto: str) -> Set[str]:
+    """Retorna os trigramas distintos do texto, em minúsculas."""
+    if not texto:
+        return set()
+    texto = texto.lower()
+    return {texto[i:i + TAMANHO_TRIGRAMA] for i in range(len(texto) - TAMANHO_TRIGRAMA + 1)}
+
+
+def criar_tabela(conexao: sqlite3.Connection):
+    """Cria a tabela de ocorrências por trigrama, se ainda não existir."""
+    conexao.execute("""
+        CREATE TABLE IF NOT EXISTS indice_trigramas (
+            trigrama TEXT NOT NULL,
+            memoria_id INTEGER NOT NULL,
+            PRIMARY KEY (trigrama, memoria_id)
+        ) WITHOUT ROWID
+    """)
+    conexao.execute("CREATE INDEX IF NOT EXISTS idx_indice_trigramas_memoria ON indice_trigramas(memoria_id)")
+
+
+def indexar(conexao: sqlite3.Connection, memorias: Iterable[Dict[str, Any]], novas: bool = True):
+    """Grava os trigramas das memórias (deve ser chamado dentro de uma transação).
+
+    Args:
+        memorias (iterable): Memórias inseridas ou substituídas
+        novas (bool): False quando podem existir trigramas antigos a descartar
+    """
+    memorias = list(memorias)
+    if not novas:
+        conexao.executemany("DELETE FROM indice_trigramas WHERE memoria_id = ?", ((m["id"],) for m in memorias))
+    conexao.executemany(
+        "INSERT OR IGNORE INTO indice_trigramas (trigrama, memoria_id) VALUES (?, ?)",
+        ((trigrama, m["id"]) for m in memorias for trigrama in trigramas(m.get("conteudo", "")))
+    )
+
+
+def consulta_candidatos(trecho: str) -> Optional[Tuple[str, List[str]]]:
+    """Monta a subconsulta dos ids que contêm todos os trigramas do trecho.
+
+    Returns:
+        tuple: (sql, parâmetros), ou None se o trecho for curto demais para o índice
+    """
+    chaves = sorted(trigramas(trecho))
+    if not chaves:
+        return None
+    sql = " INTERSECT ".join("SELECT memoria_id FROM indice_trigramas WHERE trigrama = ?" for _ in chaves)
+    return sql, chaves
+
+
+class IndiceTrigramas:
+    def __init__(self, memorias: Iterable[Dict[str, Any]] = ()):
+        """Cria o índice em memória, opcionalmente já populado.
+
+        Args:
+            memorias (iterable): Memórias iniciais (precisam ter "id")
+        """
+        self._ocorrencias: Dict[str, Set[Any]] = {}
+        for memoria in memorias:
+            self.adicionar(memoria)
+
+    def adicionar(self, memoria: Dict[str, Any]):
+        """Indexa uma memória nova."""
+        memoria_id = memoria["id"]
+        for trigrama in trigramas(memoria.get("conteudo", "")):
+            self._ocorrencias.setdefault(trigrama, set()).add(memoria_id)
+
+    def remover(self, memoria: Dict[str, Any]):
+        """Retira uma memória do índice (usa o conteúdo como estava indexado)."""
+        self._descartar(memoria["id"], trigramas(memoria.get("conteudo", "")))
+
+    def atualizar(self, anterior: Dict[str, Any], atual: Dict[str, Any]):
+        """Reindexa uma memória alterada, tocando só os trigramas que mudaram."""
+        memoria_id = atual["id"]
+        anteriores, atuais = trigramas(anterior.get("conteudo", "")), trigramas(atual.get("conteudo", ""))
+        self._descartar(memoria_id, anteriores - atuais)
+        for trigrama in atuais - anteriores:
+            self._ocorrencias.setdefault(trigrama, set()).add(memoria_id)
+
+    def _descartar(self, memoria_id, chaves: Iterable[str]):
+        for trigrama in chaves:
+            ids = self._ocorrencias.get(trigrama)
+            if ids is not None:
+                ids.discard(memoria_id)
+                if not ids:
+                    del self._ocorrencias[trigrama]
+
+    def candidatos(self, trecho: str) -> Optional[Set[Any]]:
+        """Retorna os ids que contêm todos os trigramas do trecho.
+
+        A interseção começa pela menor lista de ocorrências. O resultado
+        ainda precisa ser conferido com a comparação de substring.
+
+        Returns:
+            set: Ids candidatos, ou None se o trecho for curto demais para o índice
+        """
+        chaves = trigramas(trecho)
+        if not chaves:
+            return None
+        listas = sorted((self._ocorrencias.get(trigrama, set()) for trigrama in chaves), key=len)
+        resultado = set(listas[0])
+        for ids in listas[1:]:
+            if not resultado:
+                break
+            resultado &= ids
+        return resultado
@@ -0,0 +1,151 @@
+"""
+Módulo Journal - Persistência append-only de memórias.
+
+Cada memória nova ou atualizada gera uma única linha JSON no journal.
+Periodicamente o estado completo é gravado em um snapshot e o journal
+é truncado (compactação). Na inicialização o estado é reconstruído
+lendo o snapshot e reaplicando as entradas do journal.
+"""
+
+import json
+import logging
+import os
+from typing import Dict, Any, List
+from .codec import Codec, carregar_arquivo
+
+logger = logging.getLogger(__name__)
+
+
+class JournalMemorias:
+    def __init__(self, diretorio: str, nome: str = "memorias",
+                 limite_journal: int = 1000, proporcao_compactacao: float = 0.5,
+                 codec: Codec = None):
+        """Inicializa o journal de memórias.
+
+        Args:
+            diretorio (str): Diretório onde snapshot e journal são gravados
+            nome (str): Nome base dos arquivos
+            limite_journal (int): Mínimo de entradas antes de compactar
+            proporcao_compactacao (float): Fração do total de memórias que
+                o journal pode atingir antes de ser compactado
+            codec (Codec, optional): Codec do snapshot (padrão: JSON compacto)
+        """
+        self.caminho_snapshot = os.path.join(diretorio, f"{nome}.json")
+        self.caminho_journal = os.path.join(diretorio, f"{nome}.journal")
+        self.limite_journal = limite_journal
+        self.proporcao_compactacao = proporcao_compactacao
+        self.codec = codec or Codec()
+        self.entradas_journal = 0
+        # Próximo id livre, nunca reutilizado mesmo após remoções
+        self.proximo_id = 1
+        self._arquivo = None
+
+    def carregar(self) -> List[Dict[str, Any]]:
+        """Reconstrói o estado a partir do snapshot e do journal.
+
+        Returns:
+            list: Memórias na ordem de inserção
+        """
+        memorias_por_id = {}
+        self.proximo_id = 1
+
+        if os.path.exists(self.caminho_snapshot):
+            snapshot = carregar_arquivo(self.caminho_snapshot)
+            if isinstance(snapshot, dict):
+                self.proximo_id = snapshot.get("proximo_id", 1)
+                snapshot = snapshot.get("memorias", [])
+            for memoria in snapshot:
+                memorias_por_id[memoria['id']] = memoria
+                self._reservar_id(memoria['id'])
+
+        self.entradas_journal = 0
+        if os.path.exists(self.caminho_journal):
+            with open(self.caminho_journal, 'r', encoding='utf-8') as f:
+                for numero_linha, linha in enumerate(f, 1):
+                    linha = linha.strip()
+                    if not linha:
+                        continue
+                    try:
+                        entrada = json.loads(linha)
+                    except json.JSONDecodeError:
+                        # Linha parcial (ex.: queda durante a escrita) - ignora
+                        logger.warning(f"Entrada inválida no journal (linha {numero_linha}) ignorada")
+                        continue
+                    self._aplicar(memorias_por_id, entrada)
+                    self.entradas_journal += 1
+
+        return list(memorias_por_id.values())
+
+    def _aplicar(self, memorias_por_id: Dict[Any, Dict[str, Any]], entrada: Dict[str, Any]):
+        """Aplica uma entrada do journal ao estado em reconstrução."""
+        operacao = entrada.get("op")
+        if operacao == "put":
+            memoria = entrada["memoria"]
+            memorias_por_id[memoria['id']] = memoria
+            self._reservar_id(memoria['id'])
+        elif operacao == "del":
+            memorias_por_id.pop(entrada["id"], None)
+            self._reservar_id(entrada["id"])
+        else:
+            logger.warning(f"Operação desconhecida no journal: {operacao}")
+
+    def _reservar_id(self, memoria_id: Any):
+        """Garante que o alocador nunca devolva um id já utilizado."""
+        if isinstance(memoria_id, int) and memoria_id >= self.proximo_id:
+            self.proximo_id = memoria_id + 1
+
+    def _escrever(self, entradas: List[Dict[str, Any]]):
+        """Acrescenta as entradas ao journal em uma única escrita."""
+        if not entradas:
+            return
+        if self._arquivo is None:
+            self._arquivo = open(self.caminho_journal, 'a', encoding='utf-8')
+        self._arquivo.write("".join(json.dumps(entrada, ensure_ascii=False) + "\n" for entrada in entradas))
+        self._arquivo.flush()
+        self.entradas_journal += len(entradas)
+
+    def registrar(self, memoria: Dict[str, Any]):
+        """Registra uma memória nova ou atualizada."""
+        self._escrever([{"op": "put", "memoria": memoria}])
+
+    def registrar_entradas(self, entradas: List[Dict[str, Any]]):
+        """Registra várias entradas ({"op": "put"|"del", ...}) em uma única escrita."""
+        self._escrever(entradas)
+
+    def registrar_remocao(self, memoria_id: Any):
+        """Registra a remoção de uma memória."""
+        self._escrever([{"op": "del", "id": memoria_id}])
+
+    def precisa_compactar(self, total_memorias: int, entradas_pendentes: int = 0) -> bool:
+        """Indica se o journal cresceu o suficiente para ser compactado.
+
+        Args:
+            total_memorias (int): Quantidade atual de memórias
+            entradas_pendentes (int): Entradas ainda não gravadas que serão
+                acrescentadas antes da compactação
+
+        Returns:
+            bool: True se deve compactar
+        """
+        limite = max(self.limite_journal, int(total_memorias * self.proporcao_compactacao))
+        return self.entradas_journal + entradas_pendentes >= limite
+
+    def compactar(self, memorias: List[Dict[str, Any]]):
+        """Grava um novo snapshot e trunca o journal.
+
+        Args:
+            memorias (list): Estado completo atual
+        """
+        self.codec.salvar(self.caminho_snapshot, {"memorias": memorias, "proximo_id": self.proximo_id})
+
+        # Só trunca o journal depois que o snapshot estiver no lugar
+        self.fechar()
+        open(self.caminho_journal, 'w', encoding='utf-8').close()
+        self.entradas_journal = 0
+        logger.info(f"Journal compactado em snapshot com {len(memorias)} memórias")
+
+    def fechar(self):
+        """Fecha o arquivo do journal, se aberto."""
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
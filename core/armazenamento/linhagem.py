@@ -0,0 +1,130 @@
+"""
+Módulo Linhagem - Índice de adjacência entre versões e sínteses de memórias.
+
+Memórias formam cadeias de versões (relacionado_a aponta a memória
+refinada, versao cresce a cada refinamento) e grafos de síntese
+(baseado_em lista as memórias combinadas). Responder "qual a versão mais
+recente de X" ou "o que foi derivado de X" exigia percorrer todas as
+memórias procurando referências. O índice de linhagem guarda, para cada
+memória, seus pais e seus filhos, de modo que essas consultas visitam
+apenas as memórias do resultado.
+"""
+
+from collections import deque
+from typing import Dict, Any, List, Optional, Iterable, Set, Tuple
+
+# Campos lidos de cada memória para montar o índice
+CAMPOS_LINHAGEM = ("id", "versao", "relacionado_a", "baseado_em")
+
+
+def pais_memoria(memoria: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Retorna os ids das memórias das quais esta deriva (versão anterior e bases da síntese)."""
+    pais = []
+    if memoria.get("relacionado_a") is not None:
+        pais.append(memoria["relacionado_a"])
+    baseado_em = memoria.get("baseado_em")
+    if isinstance(baseado_em, (list, tuple)):
+        pais.extend(pai for pai in baseado_em if pai is not None and pai not in pais)
+    return tuple(pais)
+
+
+class IndiceLinhagem:
+    def __init__(self, memorias: Iterable[Dict[str, Any]] = ()):
+        """Cria o índice em memória, opcionalmente já populado.
+
+        Args:
+            memorias (iterable): Memórias iniciais (bastam os CAMPOS_LINHAGEM)
+        """
+        self._pais: Dict[Any, Tuple[Any, ...]] = {}
+        self._filhos: Dict[Any, Set[Any]] = {}
+        # Refinamentos diretos (filhos por relacionado_a): as cadeias de versões
+        self._refinamentos: Dict[Any, Set[Any]] = {}
+        self._versoes: Dict[Any, int] = {}
+        self._anterior: Dict[Any, Any] = {}
+        for memoria in memorias:
+            self.adicionar(memoria)
+
+    def __contains__(self, memoria_id) -> bool:
+        return memoria_id in self._versoes
+
+    def adicionar(self, memoria: Dict[str, Any]):
+        """Indexa uma memória nova (ou substitui a entrada de uma existente)."""
+        memoria_id = memoria["id"]
+        if memoria_id in self._versoes:
+            self.remover(memoria_id)
+        pais = pais_memoria(memoria)
+        self._pais[memoria_id] = pais
+        self._versoes[memoria_id] = memoria.get("versao") or 1
+        for pai in pais:
+            self._filhos.setdefault(pai, set()).add(memoria_id)
+        anterior = memoria.get("relacionado_a")
+        if anterior is not None:
+            self._anterior[memoria_id] = anterior
+            self._refinamentos.setdefault(anterior, set()).add(memoria_id)
+
+    def remover(self, memoria_id):
+        """Retira uma memória do índice.
+
+        As arestas que apontam para ela a partir de memórias derivadas são
+        mantidas: a linhagem dessas memórias não muda com a remoção.
+        """
+        for pai in self._pais.pop(memoria_id, ()):
+            filhos = self._filhos.get(pai)
+            if filhos is not None:
+                filhos.discard(memoria_id)
+                if not filhos:
+                    del self._filhos[pai]
+        anterior = self._anterior.pop(memoria_id, None)
+        if anterior is not None:
+            refinamentos = self._refinamentos.get(anterior)
+            if refinamentos is not None:
+                refinamentos.discard(memoria_id)
+                if not refinamentos:
+                    del self._refinamentos[anterior]
+        self._versoes.pop(memoria_id, None)
+
+    def versao(self, memoria_id) -> Optional[int]:
+        """Retorna o número de versão indexado da memória (None se não indexada)."""
+        return self._versoes.get(memoria_id)
+
+    @staticmethod
+    def _percorrer(inicio, vizinhos: Dict[Any, Iterable[Any]]) -> List[Any]:
+        """Busca em largura a partir de inicio (excluído), sem repetir memórias."""
+        vistos = {inicio}
+        fila = deque([inicio])
+        resultado = []
+        while fila:
+            for proximo in vizinhos.get(fila.popleft(), ()):
+                if proximo not in vistos:
+                    vistos.add(proximo)
+                    resultado.append(proximo)
+                    fila.append(proximo)
+        return resultado
+
+    def ancestrais(self, memoria_id) -> List[Any]:
+        """Retorna as memórias das quais esta deriva, das mais próximas às mais distantes.
+
+        Inclui versões anteriores (relacionado_a) e bases de sínteses
+        (baseado_em), transitivamente. Memórias já removidas interrompem o
+        caminho e não aparecem no resultado.
+        """
+        return [i for i in self._percorrer(memoria_id, self._pais) if i in self._versoes]
+
+    def descendentes(self, memoria_id) -> List[Any]:
+        """Retorna as memórias derivadas desta, das mais próximas às mais distantes."""
+        return self._percorrer(memoria_id, self._filhos)
+
+    def versao_atual(self, memoria_id) -> Any:
+        """Retorna a versão mais recente da cadeia de refinamentos da memória.
+
+        Segue os refinamentos (memórias com relacionado_a apontando para a
+        anterior) e escolhe a de maior versão; em empate, a de maior id. Se
+        a memória não foi refinada, retorna o próprio id.
+        """
+        atual = memoria_id
+        maior = (self._versoes.get(memoria_id, 0), memoria_id)
+        for refinamento in self._percorrer(memoria_id, self._refinamentos):
+            chave = (self._versoes.get(refinamento, 0), refinamento)
+            if chave > maior:
+                atual, maior = refinamento, chave
+        return atual
@@ -0,0 +1,112 @@
+"""
+Módulo MinHash - Índice LSH para encontrar memórias quase duplicadas.
+
+A busca de memórias parecidas com um texto novo comparava o conjunto de
+palavras dele com o de cada memória armazenada: O(N) por inserção e
+O(N²) no total. Aqui cada memória recebe uma assinatura MinHash (o menor
+hash do seu conjunto de palavras sob cada uma de NUM_PERMUTACOES funções
+de hash), que preserva a similaridade de Jaccard: a chance de duas
+assinaturas coincidirem numa posição é a própria similaridade.
+
+As assinaturas são cortadas em BANDAS faixas de LINHAS_POR_BANDA
+posições, e cada faixa vira uma chave de bucket. São candidatas as
+memórias que coincidem com o texto em pelo menos uma faixa; com 32
+faixas de 2 linhas, pares com Jaccard 0,3 viram candidatos com
+probabilidade ~95% e pares sem relação quase nunca. Como o índice é
+aproximado, o chamador confere a similaridade exata só nas candidatas.
+"""
+
+import hashlib
+import random
+from typing import Dict, Any, Iterable, Optional, Set, Tuple
+
+NUM_PERMUTACOES = 64
+LINHAS_POR_BANDA = 2
+BANDAS = NUM_PERMUTACOES // LINHAS_POR_BANDA
+
+# Primo de Mersenne 2^61 - 1: módulo das funções de hash (a * x + b) mod p
+_PRIMO = (1 << 61) - 1
+
+# Coeficientes fixos para que as assinaturas sejam comparáveis entre execuções
+_gerador = random.Random(0x4D696E48)
+_COEFICIENTES = tuple(
+    (_gerador.randrange(1, _PRIMO), _gerador.randrange(0, _PRIMO)) for _ in range(NUM_PERMUTACOES)
+)
+
+
+def _hash_base(elemento: str) -> int:
+    """Hash estável de 64 bits do elemento (hash() de str muda a cada processo)."""
+    return int.from_bytes(hashlib.blake2b(elemento.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def assinatura(elementos: Iterable[str]) -> Optional[Tuple[int, ...]]:
+    """Calcula a assinatura MinHash de um conjunto de elementos.
+
+    Returns:
+        tuple: NUM_PERMUTACOES mínimos, ou None se o conjunto for vazio
+    """
+    bases = [_hash_base(elemento) for elemento in set(elementos)]
+    if not bases:
+        return None
+    return tuple(min((a * x + b) % _PRIMO for x in bases) for a, b in _COEFICIENTES)
+
+
+def _faixas(assinatura_memoria: Tuple[int, ...]):
+    """Gera (número da faixa, chave) para cada faixa da assinatura."""
+    for banda in range(BANDAS):
+        inicio = banda * LINHAS_POR_BANDA
+        yield banda, assinatura_memoria[inicio:inicio + LINHAS_POR_BANDA]
+
+
+class IndiceMinHash:
+    def __init__(self, itens: Iterable[Tuple[Any, Iterable[str]]] = ()):
+        """Cria o índice em memória, opcionalmente já populado.
+
+        Args:
+            itens (iterable): Pares (id da memória, elementos do seu conteúdo)
+        """
+        self._buckets: Tuple[Dict[Tuple[int, ...], Set[Any]], ...] = tuple({} for _ in range(BANDAS))
+        self._assinaturas: Dict[Any, Tuple[int, ...]] = {}
+        for memoria_id, elementos in itens:
+            self.adicionar(memoria_id, elementos)
+
+    def __len__(self) -> int:
+        return len(self._assinaturas)
+
+    def adicionar(self, memoria_id, elementos: Iterable[str]):
+        """Indexa uma memória (ou substitui a entrada de uma existente).
+
+        Memórias sem elementos não são indexadas: não têm similaridade com nada.
+        """
+        self.remover(memoria_id)
+        assinatura_memoria = assinatura(elementos)
+        if assinatura_memoria is None:
+            return
+        self._assinaturas[memoria_id] = assinatura_memoria
+        for banda, chave in _faixas(assinatura_memoria):
+            self._buckets[banda].setdefault(chave, set()).add(memoria_id)
+
+    def remover(self, memoria_id):
+        """Retira uma memória do índice."""
+        assinatura_memoria = self._assinaturas.pop(memoria_id, None)
+        if assinatura_memoria is None:
+            return
+        for banda, chave in _faixas(assinatura_memoria):
+            ids = self._buckets[banda].get(chave)
+            if ids is not None:
+                ids.discard(memoria_id)
+                if not ids:
+                    del self._buckets[banda][chave]
+
+    def candidatos(self, elementos: Iterable[str]) -> Set[Any]:
+        """Retorna os ids que coincidem com os elementos em pelo menos uma faixa.
+
+        O resultado ainda precisa ser conferido com a similaridade exata.
+        """
+        assinatura_consulta = assinatura(elementos)
+        if assinatura_consulta is None:
+            return set()
+        resultado = set()
+        for banda, chave in _faixas(assinatura_consulta):
+            resultado.update(self._buckets[banda].get(chave, ()))
+        return resultado
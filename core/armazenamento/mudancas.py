@@ -0,0 +1,154 @@
+"""
+Módulo Mudanças - Feed das alterações feitas no armazenamento de memórias.
+
+Cada inserção, atualização ou remoção recebe um número de sequência
+crescente. Os ciclos em segundo plano (aprendizado, métricas adaptativas,
+agentes) guardam a última sequência que processaram e, no ciclo seguinte,
+pedem apenas as mudanças posteriores, em vez de percorrer todo o acervo.
+
+O feed retém as últimas mudanças em memória. Se um consumidor ficou para
+trás além dessa janela (ou depois de uma importação em lote, que não
+registra as memórias uma a uma), mudancas_desde() retorna None e o
+consumidor deve refazer sua varredura completa.
+"""
+
+import asyncio
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
+
+# Operações registradas no feed
+INSERCAO = "insercao"
+ATUALIZACAO = "atualizacao"
+REMOCAO = "remocao"
+
+
+class FeedMudancas:
+    def __init__(self, capacidade: int = 10000):
+        """Cria o feed vazio.
+
+        Args:
+            capacidade (int): Mudanças mais recentes mantidas para consulta
+        """
+        self._mudancas = deque(maxlen=capacidade)
+        self._seq = 0
+        # Maior sequência a partir da qual todas as mudanças seguintes estão retidas
+        self._base = 0
+        self._checkpoints: Dict[str, int] = {}
+        self._evento = None
+
+    @property
+    def seq(self) -> int:
+        """Sequência da mudança mais recente (0 se nenhuma)."""
+        return self._seq
+
+    def registrar(self, operacao: str, memoria_id: Any, memoria: Optional[Dict[str, Any]] = None,
+                  anterior: Optional[Dict[str, Any]] = None) -> int:
+        """Registra uma mudança e acorda os assinantes.
+
+        Args:
+            operacao (str): INSERCAO, ATUALIZACAO ou REMOCAO
+            memoria_id: Id da memória alterada
+            memoria (dict, optional): Estado novo (None na remoção)
+            anterior (dict, optional): Estado anterior (atualização e remoção)
+
+        Returns:
+            int: A sequência atribuída
+        """
+        self._seq += 1
+        if len(self._mudancas) == self._mudancas.maxlen:
+            self._base = self._mudancas[0]["seq"]
+        self._mudancas.append({
+            "seq": self._seq,
+            "operacao": operacao,
+            "id": memoria_id,
+            "memoria": memoria,
+            "anterior": anterior,
+            "em": datetime.now().isoformat()
+        })
+        self._notificar()
+        return self._seq
+
+    def invalidar(self):
+        """Descarta as mudanças retidas, obrigando todos os consumidores a ressincronizar.
+
+        Usado quando muitas memórias mudam de uma vez (importação em lote).
+        """
+        self._mudancas.clear()
+        self._seq += 1
+        self._base = self._seq
+        self._notificar()
+
+    def _notificar(self):
+        if self._evento is not None:
+            self._evento.set()
+            self._evento = None
+
+    def mudancas_desde(self, seq: Optional[int]) -> Optional[List[Dict[str, Any]]]:
+        """Retorna as mudanças com sequência maior que seq, em ordem.
+
+        Args:
+            seq (int): Última sequência já processada (None se nunca processou)
+
+        Returns:
+            list: As mudanças, ou None se não estiverem mais disponíveis e o
+                consumidor precisar refazer a varredura completa
+        """
+        if seq is None or seq < self._base or seq > self._seq:
+            return None
+        return list(islice(self._mudancas, seq - self._base, None))
+
+    def checkpoint(self, consumidor: str) -> Optional[int]:
+        """Retorna a última sequência confirmada pelo consumidor."""
+        return self._checkpoints.get(consumidor)
+
+    def confirmar(self, consumidor: str, seq: int):
+        """Registra que o consumidor processou todas as mudanças até seq."""
+        self._checkpoints[consumidor] = seq
+
+    def pendentes(self, consumidor: str) -> Tuple[Optional[List[Dict[str, Any]]], int]:
+        """Mudanças ainda não processadas pelo consumidor.
+
+        Returns:
+            tuple: (mudanças ou None para ressincronizar, sequência a confirmar
+                depois de processá-las)
+        """
+        return self.mudancas_desde(self.checkpoint(consumidor)), self._seq
+
+    async def aguardar(self, seq: int, timeout: Optional[float] = None) -> bool:
+        """Aguarda até existir uma mudança posterior a seq.
+
+        Returns:
+            bool: True se houve mudança, False se o tempo esgotou
+        """
+        while self._seq <= seq:
+            if self._evento is None:
+                self._evento = asyncio.Event()
+            try:
+                await asyncio.wait_for(self._evento.wait(), timeout)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    async def assinar(self, desde: Optional[int] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Entrega as mudanças à medida que acontecem.
+
+        Args:
+            desde (int, optional): Última sequência já vista (padrão: a atual)
+
+        Yields:
+            dict: Cada mudança; None quando houve perda (o assinante deve
+                ressincronizar e continua recebendo a partir da sequência atual)
+        """
+        seq = self._seq if desde is None else desde
+        while True:
+            await self.aguardar(seq)
+            mudancas = self.mudancas_desde(seq)
+            if mudancas is None:
+                yield None
+                seq = self._seq
+                continue
+            for mudanca in mudancas:
+                yield mudanca
+            seq = mudancas[-1]["seq"] if mudancas else self._seq
@@ -0,0 +1,493 @@
+"""
+Módulo Partições - Backend de memórias particionado por período.
+
+As memórias são distribuídas em arquivos JSONL por dia ou por mês,
+descritos por um pequeno manifesto com o intervalo de datas e de ids de
+cada partição. Consultas pelas memórias mais recentes ou por intervalo
+de tempo leem apenas as partições relevantes, e varreduras completas
+percorrem uma partição por vez com memória limitada. Os índices de
+termos e de trigramas da busca textual ficam em um banco SQLite no mesmo
+diretório (termos.db).
+"""
+
+import json
+import logging
+import os
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Any, List, Optional, Iterator, Iterable
+from .codec import carregar_arquivo
+from .indice_secundario import IndiceSecundario, condicoes_filtro
+from .indice_invertido import ArmazenamentoTermos
+from core.utils import hash_conteudo, em_lotes
+
+logger = logging.getLogger(__name__)
+
+# Tamanho do prefixo ISO usado como chave de partição
+TAMANHO_CHAVE = {"dia": 10, "mes": 7}
+
+
+class ArmazenamentoParticionado:
+    def __init__(self, diretorio: str, granularidade: str = "mes", caminho_legado: str = None):
+        """Abre (ou cria) o diretório de partições.
+
+        Args:
+            diretorio (str): Diretório das partições e do manifesto
+            granularidade (str): "dia" ou "mes"
+            caminho_legado (str, optional): Arquivo JSON de memórias a importar
+                quando o diretório ainda não tiver manifesto
+        """
+        if granularidade not in TAMANHO_CHAVE:
+            raise ValueError(f"Granularidade de partição inválida: {granularidade}")
+
+        self.diretorio = diretorio
+        self.caminho_manifesto = os.path.join(diretorio, "manifesto.json")
+        # Índice hash do conteúdo -> id, construído na primeira consulta
+        self._hashes = None
+        # Listas de ocorrência de tipo/origem/emoção/tags/campos, idem
+        self._secundario = None
+        os.makedirs(diretorio, exist_ok=True)
+        self.termos = ArmazenamentoTermos(os.path.join(diretorio, "termos.db"))
+
+        if os.path.exists(self.caminho_manifesto):
+            with open(self.caminho_manifesto, 'r', encoding='utf-8') as f:
+                self.manifesto = json.load(f)
+            # A granularidade de um diretório existente prevalece sobre o parâmetro
+            self.granularidade = self.manifesto["granularidade"]
+        else:
+            self.granularidade = granularidade
+            self.manifesto = {
+                "granularidade": granularidade,
+                "proximo_id": 1,
+                "particoes": [],
+                "meta": {"criado_em": datetime.now().isoformat(), "versao": "1.0"}
+            }
+            memorias_legadas = self._ler_legado(caminho_legado)
+            if memorias_legadas:
+                self.salvar({"memorias": memorias_legadas})
+                logger.info(f"{len(memorias_legadas)} memórias migradas para {diretorio}")
+            else:
+                self._salvar_manifesto()
+
+        # Termos do conteúdo -> ids, persistidos e mantidos a cada escrita
+        if self.termos.obter_meta("indexado") is None:
+            self._reindexar_termos()
+
+    def _reindexar_termos(self):
+        """Reconstrói o índice de termos a partir de todas as partições."""
+        self.termos.limpar()
+        for lote in em_lotes(self.iterar(), 5000):
+            self.termos.indexar(lote)
+        self.termos.definir_meta("indexado", "1")
+
+    @staticmethod
+    def _ler_legado(caminho_legado: Optional[str]) -> List[Dict[str, Any]]:
+        """Lê memórias de um arquivo JSON legado, se existir."""
+        if not caminho_legado or not os.path.exists(caminho_legado):
+            return []
+        try:
+            documento = carregar_arquivo(caminho_legado)
+            return documento.get("memorias", []) if isinstance(documento, dict) else list(documento)
+        except Exception as e:
+            logger.error(f"Erro ao importar memórias de {caminho_legado}: {e}")
+            return []
+
+    # Manifesto e partições
+
+    def _salvar_manifesto(self):
+        """Grava o manifesto de forma atômica."""
+        caminho_temporario = self.caminho_manifesto + ".tmp"
+        with open(caminho_temporario, 'w', encoding='utf-8') as f:
+            json.dump(self.manifesto, f, ensure_ascii=False)
+        os.replace(caminho_temporario, self.caminho_manifesto)
+
+    @staticmethod
+    def _data(memoria: Dict[str, Any]) -> str:
+        return memoria.get("criado_em") or memoria.get("timestamp") or datetime.now().isoformat()
+
+    def _chave(self, memoria: Dict[str, Any]) -> str:
+        return self._data(memoria)[:TAMANHO_CHAVE[self.granularidade]]
+
+    def _caminho(self, particao: Dict[str, Any]) -> str:
+        return os.path.join(self.diretorio, particao["arquivo"])
+
+    def _particao(self, chave: str) -> Dict[str, Any]:
+        """Retorna a entrada de manifesto da chave, criando-a se necessário."""
+        particoes = self.manifesto["particoes"]
+        for particao in reversed(particoes):
+            if particao["chave"] == chave:
+                return particao
+        particao = {"chave": chave, "arquivo": f"{chave}.jsonl", "total": 0,
+                    "min_id": None, "max_id": None, "inicio": None, "fim": None}
+        particoes.append(particao)
+        particoes.sort(key=lambda p: p["chave"])
+        return particao
+
+    @staticmethod
+    def _registrar_na_particao(particao: Dict[str, Any], memoria: Dict[str, Any], data: str):
+        """Atualiza os intervalos de id e de data de uma partição."""
+        particao["total"] += 1
+        memoria_id = memoria["id"]
+        particao["min_id"] = memoria_id if particao["min_id"] is None else min(particao["min_id"], memoria_id)
+        particao["max_id"] = memoria_id if particao["max_id"] is None else max(particao["max_id"], memoria_id)
+        particao["inicio"] = data if particao["inicio"] is None else min(particao["inicio"], data)
+        particao["fim"] = data if particao["fim"] is None else max(particao["fim"], data)
+
+    def _ler_particao(self, particao: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Lê as memórias de uma partição, uma linha por vez."""
+        caminho = self._caminho(particao)
+        if not os.path.exists(caminho):
+            return
+        with open(caminho, 'r', encoding='utf-8') as f:
+            for linha in f:
+                if linha.strip():
+                    yield json.loads(linha)
+
+    def _regravar_particao(self, particao: Dict[str, Any], memorias: List[Dict[str, Any]]):
+        """Regrava uma única partição e recalcula sua entrada no manifesto."""
+        caminho = self._caminho(particao)
+        caminho_temporario = caminho + ".tmp"
+        with open(caminho_temporario, 'w', encoding='utf-8') as f:
+            for memoria in memorias:
+                f.write(json.dumps(memoria, ensure_ascii=False) + "\n")
+        os.replace(caminho_temporario, caminho)
+
+        particao.update({"total": 0, "min_id": None, "max_id": None, "inicio": None, "fim": None})
+        for memoria in memorias:
+            self._registrar_na_particao(particao, memoria, self._data(memoria))
+
+    def _particoes_com_id(self, memoria_id: int) -> List[Dict[str, Any]]:
+        """Partições cujo intervalo de ids pode conter o id informado."""
+        return [
+            p for p in self.manifesto["particoes"]
+            if p["min_id"] is not None and p["min_id"] <= memoria_id <= p["max_id"]
+        ]
+
+    # Interface de armazenamento
+
+    def meta(self) -> Dict[str, Any]:
+        """Retorna os metadados do armazenamento."""
+        return dict(self.manifesto.get("meta", {}))
+
+    def assinatura(self) -> Optional[tuple]:
+        """Retorna um valor que muda sempre que o manifesto é regravado."""
+        try:
+            estado = os.stat(self.caminho_manifesto)
+            return (estado.st_mtime_ns, estado.st_size)
+        except OSError:
+            return None
+
+    def total(self) -> int:
+        """Retorna o número de memórias (lido do manifesto)."""
+        return sum(p["total"] for p in self.manifesto["particoes"])
+
+    def iterar(self, desde: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Percorre as memórias, uma partição por vez, da mais antiga à mais recente.
+
+        Args:
+            desde (str, optional): Só memórias criadas a partir desta data ISO;
+                partições inteiramente anteriores nem são abertas
+        """
+        for particao in list(self.manifesto["particoes"]):
+            if desde is None:
+                yield from self._ler_particao(particao)
+            elif particao["fim"] is not None and particao["fim"] >= desde:
+                for memoria in self._ler_particao(particao):
+                    if self._data(memoria) >= desde:
+                        yield memoria
+
+    def carregar(self) -> Dict[str, Any]:
+        """Carrega todas as memórias no formato de documento usado pela Memoria."""
+        memorias = list(self.iterar())
+        meta = self.meta()
+        meta["total_memorias"] = len(memorias)
+        return {"memorias": memorias, "meta": meta}
+
+    def salvar(self, dados: Dict[str, Any]):
+        """Substitui todo o conteúdo pelas memórias do documento."""
+        self._hashes = None
+        self._secundario = None
+        por_chave = {}
+        for memoria in dados.get("memorias", []):
+            por_chave.setdefault(self._chave(memoria), []).append(memoria)
+
+        for particao in self.manifesto["particoes"]:
+            if particao["chave"] not in por_chave and os.path.exists(self._caminho(particao)):
+                os.remove(self._caminho(particao))
+        self.manifesto["particoes"] = []
+
+        for chave in sorted(por_chave):
+            self._regravar_particao(self._particao(chave), por_chave[chave])
+            for memoria in por_chave[chave]:
+                if isinstance(memoria.get("id"), int):
+                    self.manifesto["proximo_id"] = max(self.manifesto["proximo_id"], memoria["id"] + 1)
+
+        self.manifesto.setdefault("meta", {})["ultima_atualizacao"] = datetime.now().isoformat()
+        self._salvar_manifesto()
+        self._reindexar_termos()
+
+    def inserir(self, memoria: Dict[str, Any]):
+        """Insere (ou substitui) uma memória.
+
+        Memórias novas são acrescentadas ao fim da partição do seu período;
+        substituições regravam apenas a partição que contém o registro.
+        """
+        memoria_id = memoria["id"]
+        for particao in self._particoes_com_id(memoria_id):
+            memorias = list(self._ler_particao(particao))
+            for posicao, existente in enumerate(memorias):
+                if existente["id"] == memoria_id:
+                    memorias[posicao] = memoria
+                    if self._hashes is not None and existente.get("conteudo") != memoria.get("conteudo"):
+                        self._hashes = None
+                    if self._secundario is not None:
+                        self._secundario.atualizar(existente, memoria)
+                    self._regravar_particao(particao, memorias)
+                    if existente.get("conteudo") != memoria.get("conteudo"):
+                        self.termos.indexar([memoria], novas=False)
+                    self._finalizar_escrita()
+                    return
+
+        data = self._data(memoria)
+        particao = self._particao(self._chave(memoria))
+        with open(self._caminho(particao), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(memoria, ensure_ascii=False) + "\n")
+        self._registrar_na_particao(particao, memoria, data)
+        if self._hashes is not None:
+            self._hashes.setdefault(hash_conteudo(memoria.get("conteudo", "")), memoria_id)
+        if self._secundario is not None:
+            self._secundario.adicionar(memoria)
+        self.termos.indexar([memoria])
+        if isinstance(memoria_id, int):
+            self.manifesto["proximo_id"] = max(self.manifesto["proximo_id"], memoria_id + 1)
+        self._finalizar_escrita()
+
+    def _finalizar_escrita(self):
+        self.manifesto.setdefault("meta", {})["ultima_atualizacao"] = datetime.now().isoformat()
+        self._salvar_manifesto()
+
+    def buscar_por_id(self, memoria_id: int) -> Optional[Dict[str, Any]]:
+        """Retorna a memória com o id informado, lendo só as partições candidatas."""
+        for particao in self._particoes_com_id(memoria_id):
+            for memoria in self._ler_particao(particao):
+                if memoria["id"] == memoria_id:
+                    return memoria
+        return None
+
+    def remover(self, memoria_id: int) -> bool:
+        """Remove a memória com o id informado, regravando apenas sua partição."""
+        for particao in self._particoes_com_id(memoria_id):
+            memorias = list(self._ler_particao(particao))
+            restantes = [m for m in memorias if m["id"] != memoria_id]
+            if len(restantes) != len(memorias):
+                self._hashes = None
+                if self._secundario is not None:
+                    for memoria in memorias:
+                        if memoria["id"] == memoria_id:
+                            self._secundario.remover(memoria)
+                self._regravar_particao(particao, restantes)
+                self.termos.remover(memoria_id)
+                self._finalizar_escrita()
+                return True
+        return False
+
+    def buscar_por_hash(self, hash_texto: str) -> Optional[Dict[str, Any]]:
+        """Retorna a memória com o hash de conteúdo informado, ou None.
+
+        O índice é montado percorrendo as partições uma única vez e mantido
+        nas inserções; remoções e mudanças de conteúdo apenas o descartam.
+        """
+        memoria_id = self._indice_hashes().get(hash_texto)
+        return self.buscar_por_id(memoria_id) if memoria_id is not None else None
+
+    def _indice_hashes(self) -> Dict[str, int]:
+        """Retorna o índice hash -> id, montando-o na primeira chamada."""
+        if self._hashes is None:
+            self._hashes = {}
+            for memoria in self.iterar():
+                self._hashes.setdefault(hash_conteudo(memoria.get("conteudo", "")), memoria["id"])
+        return self._hashes
+
+    def _indice_secundario(self) -> IndiceSecundario:
+        """Retorna o índice secundário, montando-o na primeira chamada."""
+        if self._secundario is None:
+            self._secundario = IndiceSecundario(self.iterar())
+        return self._secundario
+
+    def _buscar_por_ids(self, ids: set, limite: int = -1) -> List[Dict[str, Any]]:
+        """Lê as memórias dos ids informados, abrindo só as partições que podem contê-los."""
+        resultado = []
+        if not ids:
+            return resultado
+        ordenados = sorted(i for i in ids if isinstance(i, int))
+        for particao in self.manifesto["particoes"]:
+            if particao["min_id"] is None:
+                continue
+            posicao = bisect_left(ordenados, particao["min_id"])
+            if posicao == len(ordenados) or ordenados[posicao] > particao["max_id"]:
+                continue
+            for memoria in self._ler_particao(particao):
+                if memoria["id"] in ids:
+                    resultado.append(memoria)
+                    if len(resultado) == limite:
+                        return resultado
+        return resultado
+
+    def filtrar(self, tipo: Optional[str] = None, origem: Optional[str] = None, emocao: Optional[str] = None,
+                tag: Optional[str] = None, tem_campo=None, limite: int = -1) -> List[Dict[str, Any]]:
+        """Retorna as memórias que atendem aos filtros, pelo índice secundário.
+
+        Args:
+            tipo, origem, emocao, tag (str): Valores exigidos (None para ignorar)
+            tem_campo (str ou iterável): Campos que a memória deve possuir
+            limite (int): Máximo de memórias, das partições mais antigas em diante (-1 para todas)
+        """
+        ids = self._indice_secundario().consultar(condicoes_filtro(tipo, origem, emocao, tag, tem_campo))
+        if ids is None:
+            memorias = self.iterar()
+            return list(memorias if limite < 0 else islice(memorias, limite))
+        return self._buscar_por_ids(ids, limite)
+
+    def contar(self, tipo: Optional[str] = None, origem: Optional[str] = None, emocao: Optional[str] = None,
+               tag: Optional[str] = None, tem_campo=None) -> int:
+        """Conta as memórias que atendem aos filtros sem ler as partições."""
+        ids = self._indice_secundario().consultar(condicoes_filtro(tipo, origem, emocao, tag, tem_campo))
+        return self.total() if ids is None else len(ids)
+
+    def valores(self, campo: str) -> Dict[str, int]:
+        """Retorna cada valor indexado do campo (ex.: "tipo") com seu número de memórias."""
+        return self._indice_secundario().valores(campo)
+
+    def importar(self, memorias: Iterable[Dict[str, Any]], alocar_ids: bool = True,
+                 tamanho_lote: int = 5000) -> Dict[str, int]:
+        """Acrescenta um grande volume de memórias novas.
+
+        Cada lote é agrupado por partição e acrescentado com uma única
+        escrita por arquivo; o manifesto é gravado uma vez, no final.
+        Memórias com conteúdo já existente são ignoradas.
+
+        Args:
+            memorias (iterable): Memórias novas (sem id, se alocar_ids=True)
+            alocar_ids (bool): Atribui ids a partir do manifesto
+            tamanho_lote (int): Memórias agrupadas por rodada de escrita
+
+        Returns:
+            dict: {"inseridas": n, "duplicadas": n}
+        """
+        hashes = self._indice_hashes()
+        secundario = self._indice_secundario()
+        inseridas = duplicadas = 0
+        proximo_id = self.manifesto["proximo_id"]
+        try:
+            for lote in em_lotes(memorias, tamanho_lote):
+                por_particao = {}
+                for memoria in lote:
+                    hash_texto = hash_conteudo(memoria.get("conteudo", ""))
+                    if hash_texto in hashes:
+                        duplicadas += 1
+                        continue
+                    if alocar_ids:
+                        memoria["id"] = proximo_id
+                    if isinstance(memoria.get("id"), int):
+                        proximo_id = max(proximo_id, memoria["id"] + 1)
+                    hashes[hash_texto] = memoria["id"]
+                    por_particao.setdefault(self._chave(memoria), []).append(memoria)
+                
+                for chave, novas in por_particao.items():
+                    particao = self._particao(chave)
+                    with open(self._caminho(particao), 'a', encoding='utf-8') as f:
+                        f.write("".join(json.dumps(m, ensure_ascii=False) + "\n" for m in novas))
+                    # O manifesto só avança pelos ids de fato gravados
+                    ids = [m["id"] for m in novas if isinstance(m.get("id"), int)]
+                    if ids:
+                        self.manifesto["proximo_id"] = max(self.manifesto["proximo_id"], max(ids) + 1)
+                    for memoria in novas:
+                        self._registrar_na_particao(particao, memoria, self._data(memoria))
+                        secundario.adicionar(memoria)
+                    self.termos.indexar(novas, novas=alocar_ids)
+                    inseridas += len(novas)
+        finally:
+            # Grava o manifesto mesmo se a importação for interrompida, para
+            # que as linhas já acrescentadas continuem descritas
+            self._finalizar_escrita()
+        return {"inseridas": inseridas, "duplicadas": duplicadas}
+
+    def alocar_id(self) -> int:
+        """Reserva e retorna um novo id, nunca reutilizado."""
+        memoria_id = self.manifesto["proximo_id"]
+        self.manifesto["proximo_id"] = memoria_id + 1
+        self._salvar_manifesto()
+        return memoria_id
+
+    def ultimas(self, n: int) -> List[Dict[str, Any]]:
+        """Retorna as últimas n memórias, lendo apenas as partições mais recentes."""
+        resultado = deque()
+        for particao in reversed(self.manifesto["particoes"]):
+            faltam = n - len(resultado)
+            if faltam <= 0:
+                break
+            recentes = deque(self._ler_particao(particao), maxlen=faltam)
+            resultado.extendleft(reversed(recentes))
+        return list(resultado)
+
+    def intervalo(self, inicio: Optional[str], fim: Optional[str]) -> List[Dict[str, Any]]:
+        """Retorna as memórias criadas entre inicio e fim, ignorando partições fora do intervalo."""
+        resultado = []
+        for particao in self.manifesto["particoes"]:
+            if particao["inicio"] is None:
+                continue
+            if (fim is not None and particao["inicio"] > fim) or (inicio is not None and particao["fim"] < inicio):
+                continue
+            for memoria in self._ler_particao(particao):
+                data = self._data(memoria)
+                if (inicio is None or data >= inicio) and (fim is None or data <= fim):
+                    resultado.append(memoria)
+        return resultado
+
+    def buscar_termo(self, termo: str, limite: int) -> List[Dict[str, Any]]:
+        """Busca memórias cujo conteúdo contém o termo (qualquer trecho).
+
+        As candidatas vêm do índice de trigramas do banco de termos e só as
+        partições que as contêm são lidas; termos com menos de três
+        caracteres percorrem as partições uma a uma.
+        """
+        termo = termo.lower()
+        candidatos = self.termos.candidatos_trecho(termo)
+        memorias = self.iterar() if candidatos is None else self._buscar_por_ids(set(candidatos))
+        resultados = []
+        for memoria in memorias:
+            if termo in memoria.get("conteudo", "").lower():
+                resultados.append(memoria)
+                if len(resultados) >= limite:
+                    break
+        return resultados
+
+    def buscar_termos(self, termos: List[str], operador: str = "e", limite: int = -1) -> List[Dict[str, Any]]:
+        """Busca memórias pelo índice de termos, lendo só as partições com resultados.
+
+        Args:
+            termos (list): Termos já extraídos com indice_invertido.termos_consulta
+            operador (str): "e" (todos os termos) ou "ou" (qualquer um)
+            limite (int): Máximo de resultados (-1 para todos)
+        """
+        return self._buscar_por_ids(set(self.termos.consultar(termos, operador)), limite)
+
+    def ranquear_termos(self, termos: List[str], limite: int) -> List[Dict[str, Any]]:
+        """Retorna as memórias mais relevantes para os termos, pelo BM25 do banco de termos.
+
+        Args:
+            termos (list): Termos já extraídos com indice_invertido.termos_consulta
+            limite (int): Quantas memórias retornar
+
+        Returns:
+            list: Memórias da mais relevante para a menos relevante
+        """
+        ids = [memoria_id for _, memoria_id in self.termos.ranquear(termos, limite)]
+        documentos = {memoria["id"]: memoria for memoria in self._buscar_por_ids(set(ids))}
+        return [documentos[memoria_id] for memoria_id in ids if memoria_id in documentos]
+
+    def fechar(self):
+        """Fecha o banco de termos; as partições são abertas apenas durante cada operação."""
+        self.termos.fechar()
@@ -0,0 +1,619 @@
+"""
+Módulo SQLite - Backend de memórias em banco SQLite.
+
+As memórias são gravadas como documentos JSON em uma tabela com colunas
+indexadas para os campos consultados com frequência (id, criado_em,
+origem e relacionado_a), permitindo buscas e inserções sem reler ou
+regravar o conjunto completo. A tabela indice_secundario guarda as listas
+de ocorrência de tipo, origem, emoção, tags e campos presentes (ver
+indice_secundario.py) usadas por filtrar(), a tabela indice_invertido
+as listas por termo do conteúdo (ver indice_invertido.py) usadas por
+buscar_termos() e ranquear_termos(), e a tabela indice_trigramas as
+listas por trigrama (ver indice_trigramas.py) usadas por buscar_termo().
+"""
+
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional, Iterator, Iterable
+from .codec import carregar_arquivo
+from .indice_secundario import chaves_indice, condicoes_filtro
+from . import indice_invertido, indice_trigramas
+from core.utils import hash_conteudo, em_lotes
+
+logger = logging.getLogger(__name__)
+
+# Cabeçalho presente no início de todo arquivo SQLite válido
+CABECALHO_SQLITE = b"SQLite format 3\x00"
+
+
+class ArmazenamentoSQLite:
+    def __init__(self, caminho: str, caminho_legado: str = None):
+        """Abre (ou cria) o banco de memórias.
+
+        Args:
+            caminho (str): Caminho do arquivo SQLite
+            caminho_legado (str, optional): Arquivo JSON de memórias a importar
+                quando o banco estiver vazio
+        """
+        self.caminho = caminho
+        diretorio = os.path.dirname(caminho)
+        if diretorio and not os.path.exists(diretorio):
+            os.makedirs(diretorio)
+
+        # Arquivos antigos com extensão .db eram na verdade JSON
+        memorias_migradas = self._extrair_json_legado(caminho)
+
+        # O banco é usado pelo event loop e pela thread do escritor: cada
+        # thread recebe a sua conexão (um cursor nunca é compartilhado) e, com
+        # o WAL, as leituras não esperam a transação de outra thread; as
+        # transações de escrita são serializadas por _trava_escrita
+        self._local = threading.local()
+        self._conexoes = []
+        self._trava_conexoes = threading.Lock()
+        self._trava_escrita = threading.RLock()
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self._criar_esquema()
+
+        if memorias_migradas is None and caminho_legado and self.total() == 0 and os.path.exists(caminho_legado):
+            try:
+                memorias_migradas = self._memorias_do_documento(carregar_arquivo(caminho_legado))
+            except Exception as e:
+                logger.error(f"Erro ao importar memórias de {caminho_legado}: {e}")
+
+        if memorias_migradas:
+            with self._transacao():
+                self._inserir_varias(memorias_migradas)
+            logger.info(f"{len(memorias_migradas)} memórias migradas para {caminho}")
+
+    @property
+    def conexao(self) -> sqlite3.Connection:
+        """Conexão da thread atual, aberta no primeiro uso."""
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            # fechar() pode ser chamado de outra thread
+            conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+            conexao.row_factory = sqlite3.Row
+            # lower() do SQLite só trata ASCII; usa a versão do Python para acentos
+            conexao.create_function("py_lower", 1, lambda t: t.lower() if t else t, deterministic=True)
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexao = conexao
+            with self._trava_conexoes:
+                self._conexoes.append(conexao)
+        return conexao
+
+    @contextmanager
+    def _transacao(self):
+        """Transação de escrita na conexão da thread atual, uma thread por vez.
+
+        Sem a trava, duas conexões poderiam ler o mesmo próximo id antes de
+        gravá-lo, e a segunda a escrever receberia "database is locked".
+        """
+        with self._trava_escrita:
+            with self.conexao as conexao:
+                yield conexao
+
+    def _extrair_json_legado(self, caminho: str) -> Optional[List[Dict[str, Any]]]:
+        """Move um arquivo JSON com extensão de banco para um backup e retorna seu conteúdo."""
+        if not os.path.exists(caminho) or os.path.getsize(caminho) == 0:
+            return None
+
+        with open(caminho, 'rb') as f:
+            cabecalho = f.read(len(CABECALHO_SQLITE))
+        if cabecalho == CABECALHO_SQLITE:
+            return None
+
+        with open(caminho, 'r', encoding='utf-8') as f:
+            documento = json.load(f)
+        backup = caminho + ".json.bak"
+        os.replace(caminho, backup)
+        logger.info(f"Arquivo JSON legado movido para {backup}")
+        return self._memorias_do_documento(documento)
+
+    @staticmethod
+    def _memorias_do_documento(documento) -> List[Dict[str, Any]]:
+        """Aceita tanto uma lista de memórias quanto o formato {"memorias": [...]}."""
+        if isinstance(documento, dict):
+            return documento.get("memorias", [])
+        return list(documento)
+
+    def _criar_esquema(self):
+        """Cria tabelas e índices, se ainda não existirem."""
+        with self._transacao():
+            # id é INTEGER PRIMARY KEY (alias do rowid), logo já é indexado
+            self.conexao.execute("""
+                CREATE TABLE IF NOT EXISTS memorias (
+                    id INTEGER PRIMARY KEY,
+                    conteudo TEXT NOT NULL,
+                    criado_em TEXT,
+                    origem TEXT,
+                    relacionado_a INTEGER,
+                    dados TEXT NOT NULL,
+                    hash_conteudo TEXT
+                )
+            """)
+            self._migrar_coluna_hash()
+            self.conexao.execute("CREATE INDEX IF NOT EXISTS idx_memorias_criado_em ON memorias(criado_em)")
+            self.conexao.execute("CREATE INDEX IF NOT EXISTS idx_memorias_origem ON memorias(origem)")
+            self.conexao.execute("CREATE INDEX IF NOT EXISTS idx_memorias_relacionado_a ON memorias(relacionado_a)")
+            self.conexao.execute("CREATE INDEX IF NOT EXISTS idx_memorias_hash_conteudo ON memorias(hash_conteudo)")
+            self.conexao.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    chave TEXT PRIMARY KEY,
+                    valor TEXT
+                )
+            """)
+            self.conexao.execute(
+                "INSERT OR IGNORE INTO meta (chave, valor) VALUES ('criado_em', ?), ('versao', '1.0')",
+                (datetime.now().isoformat(),)
+            )
+            self.conexao.execute("""
+                CREATE TABLE IF NOT EXISTS indice_secundario (
+                    campo TEXT NOT NULL,
+                    valor TEXT NOT NULL,
+                    memoria_id INTEGER NOT NULL,
+                    PRIMARY KEY (campo, valor, memoria_id)
+                ) WITHOUT ROWID
+            """)
+            self.conexao.execute(
+                "CREATE INDEX IF NOT EXISTS idx_indice_secundario_memoria ON indice_secundario(memoria_id)"
+            )
+            self._migrar_indice_secundario()
+            if not indice_invertido.criar_tabela(self.conexao):
+                self.conexao.execute("DELETE FROM meta WHERE chave = 'indice_invertido'")
+            self._migrar_indice_invertido()
+            indice_trigramas.criar_tabela(self.conexao)
+            self._preencher_indice(
+                "indice_trigramas", lambda memorias: indice_trigramas.indexar(self.conexao, memorias)
+            )
+
+    def _migrar_coluna_hash(self):
+        """Adiciona e preenche a coluna hash_conteudo em bancos criados antes dela."""
+        colunas = {linha["name"] for linha in self.conexao.execute("PRAGMA table_info(memorias)")}
+        if "hash_conteudo" in colunas:
+            return
+        self.conexao.execute("ALTER TABLE memorias ADD COLUMN hash_conteudo TEXT")
+        linhas = self.conexao.execute("SELECT id, conteudo FROM memorias").fetchall()
+        self.conexao.executemany(
+            "UPDATE memorias SET hash_conteudo = ? WHERE id = ?",
+            ((hash_conteudo(linha["conteudo"]), linha["id"]) for linha in linhas)
+        )
+
+    def _migrar_indice_secundario(self):
+        """Preenche o índice secundário em bancos criados antes dele."""
+        self._preencher_indice("indice_secundario", self._indexar_secundario)
+
+    def _migrar_indice_invertido(self):
+        """Preenche o índice de termos em bancos criados antes dele."""
+        self._preencher_indice(
+            "indice_invertido", lambda memorias: indice_invertido.indexar(self.conexao, memorias)
+        )
+
+    def _preencher_indice(self, chave: str, indexador):
+        """Indexa todas as memórias uma única vez, em páginas, registrando chave em meta."""
+        if self.conexao.execute("SELECT 1 FROM meta WHERE chave = ?", (chave,)).fetchone():
+            return
+        ultimo_id = None
+        while True:
+            linhas = self.conexao.execute(
+                "SELECT id, dados FROM memorias WHERE (? IS NULL OR id > ?) ORDER BY id LIMIT 5000",
+                (ultimo_id, ultimo_id)
+            ).fetchall()
+            if not linhas:
+                break
+            indexador([json.loads(linha["dados"]) for linha in linhas])
+            ultimo_id = linhas[-1]["id"]
+        self._definir_meta(chave, "1")
+
+    def _indexar(self, memorias: List[Dict[str, Any]], novas: bool = True):
+        """Grava as listas de ocorrência, termos e trigramas das memórias (dentro de uma transação).
+
+        Args:
+            memorias (list): Memórias inseridas ou substituídas
+            novas (bool): False quando podem existir entradas antigas a descartar
+        """
+        self._indexar_secundario(memorias, novas)
+        indice_invertido.indexar(self.conexao, memorias, novas)
+        indice_trigramas.indexar(self.conexao, memorias, novas)
+
+    def _indexar_secundario(self, memorias: List[Dict[str, Any]], novas: bool = True):
+        """Grava as listas de ocorrência do índice secundário."""
+        if not novas:
+            self.conexao.executemany(
+                "DELETE FROM indice_secundario WHERE memoria_id = ?", ((m["id"],) for m in memorias)
+            )
+        self.conexao.executemany(
+            "INSERT OR IGNORE INTO indice_secundario (campo, valor, memoria_id) VALUES (?, ?, ?)",
+            ((campo, valor, m["id"]) for m in memorias for campo, valor in chaves_indice(m))
+        )
+
+    @staticmethod
+    def _linha(memoria: Dict[str, Any], hash_texto: Optional[str] = None) -> tuple:
+        """Converte uma memória nos valores das colunas da tabela."""
+        return (
+            memoria["id"],
+            memoria.get("conteudo", ""),
+            memoria.get("criado_em") or memoria.get("timestamp"),
+            memoria.get("origem"),
+            memoria.get("relacionado_a"),
+            json.dumps(memoria, ensure_ascii=False),
+            hash_texto or hash_conteudo(memoria.get("conteudo", ""))
+        )
+
+    def _inserir_varias(self, memorias: List[Dict[str, Any]], hashes: Optional[List[str]] = None,
+                        novas: bool = False):
+        """Insere várias memórias (deve ser chamado dentro de uma transação).
+
+        Args:
+            novas (bool): True quando os ids certamente não existem no banco,
+                dispensando a limpeza do índice secundário
+        """
+        self.conexao.executemany(
+            "INSERT OR REPLACE INTO memorias (id, conteudo, criado_em, origem, relacionado_a, dados, hash_conteudo) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self._linha(m, h) for m, h in zip(memorias, hashes or [None] * len(memorias)))
+        )
+        self._indexar(memorias, novas=novas)
+        self._definir_meta("ultima_atualizacao", datetime.now().isoformat())
+
+    def _definir_meta(self, chave: str, valor: str):
+        self.conexao.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES (?, ?)", (chave, valor))
+
+    def meta(self) -> Dict[str, Any]:
+        """Retorna os metadados do banco."""
+        return {linha["chave"]: linha["valor"] for linha in self.conexao.execute("SELECT chave, valor FROM meta")}
+
+    def carregar(self) -> Dict[str, Any]:
+        """Carrega todas as memórias no formato de documento usado pela Memoria.
+
+        Returns:
+            dict: {"memorias": [...], "meta": {...}}
+        """
+        memorias = [json.loads(linha["dados"]) for linha in self.conexao.execute("SELECT dados FROM memorias ORDER BY id")]
+        meta = self.meta()
+        meta["total_memorias"] = len(memorias)
+        return {"memorias": memorias, "meta": meta}
+
+    def salvar(self, dados: Dict[str, Any]):
+        """Substitui todo o conteúdo do banco pelo documento informado."""
+        with self._transacao():
+            self.conexao.execute("DELETE FROM memorias")
+            self.conexao.execute("DELETE FROM indice_secundario")
+            indice_invertido.limpar(self.conexao)
+            self.conexao.execute("DELETE FROM indice_trigramas")
+            self._inserir_varias(dados.get("memorias", []), novas=True)
+
+    def inserir(self, memoria: Dict[str, Any]):
+        """Insere (ou substitui) uma única memória."""
+        with self._transacao():
+            self._inserir_varias([memoria])
+
+    def inserir_lote(self, memorias: List[Dict[str, Any]]):
+        """Insere (ou substitui) várias memórias em uma única transação."""
+        with self._transacao():
+            self._inserir_varias(memorias)
+
+    def importar(self, memorias: Iterable[Dict[str, Any]], alocar_ids: bool = True,
+                 tamanho_lote: int = 5000, alocador: Optional[Callable[[], int]] = None) -> Dict[str, int]:
+        """Insere um grande volume de memórias novas em uma única transação.
+
+        O iterável é consumido em lotes: cada lote consulta os hashes já
+        gravados com uma única query, recebe ids sequenciais e é gravado com
+        executemany. Memórias com conteúdo já existente (no banco ou no
+        próprio lote) são ignoradas e não recebem id. Uma falha desfaz a
+        importação inteira, inclusive o avanço do alocador de ids.
+
+        Args:
+            memorias (iterable): Memórias novas (sem id, se alocar_ids=True)
+            alocar_ids (bool): Atribui ids a partir do alocador do banco
+            tamanho_lote (int): Memórias gravadas por executemany
+            alocador (callable, optional): Fornece os ids no lugar do alocador
+                do banco, para quem mantém ids fora dele (ex.: a camada de
+                curto prazo); só é chamado para as memórias de fato inseridas
+
+        Returns:
+            dict: {"inseridas": n, "duplicadas": n, "proximo_id": n}
+        """
+        inseridas = duplicadas = 0
+        with self._transacao():
+            proximo_id = self._proximo_id()
+            for lote in em_lotes(memorias, tamanho_lote):
+                hashes = [hash_conteudo(m.get("conteudo", "")) for m in lote]
+                vistos = self._hashes_existentes(set(hashes))
+                novas, hashes_novas = [], []
+                for memoria, hash_texto in zip(lote, hashes):
+                    if hash_texto in vistos:
+                        duplicadas += 1
+                        continue
+                    vistos.add(hash_texto)
+                    if alocar_ids and alocador is not None:
+                        memoria["id"] = alocador()
+                        proximo_id = max(proximo_id, memoria["id"] + 1)
+                    elif alocar_ids:
+                        memoria["id"] = proximo_id
+                        proximo_id += 1
+                    elif isinstance(memoria.get("id"), int):
+                        proximo_id = max(proximo_id, memoria["id"] + 1)
+                    novas.append(memoria)
+                    hashes_novas.append(hash_texto)
+                if novas:
+                    self._inserir_varias(novas, hashes_novas, novas=alocar_ids)
+                    inseridas += len(novas)
+            self._definir_meta("proximo_id", str(proximo_id))
+        return {"inseridas": inseridas, "duplicadas": duplicadas, "proximo_id": proximo_id}
+
+    def _hashes_existentes(self, hashes: set) -> set:
+        """Retorna quais dos hashes informados já estão gravados."""
+        existentes = set()
+        hashes = list(hashes)
+        # Fatias abaixo do limite de parâmetros por consulta do SQLite
+        for inicio in range(0, len(hashes), 500):
+            fatia = hashes[inicio:inicio + 500]
+            existentes.update(
+                linha[0] for linha in self.conexao.execute(
+                    f"SELECT hash_conteudo FROM memorias WHERE hash_conteudo IN ({','.join('?' * len(fatia))})",
+                    fatia
+                )
+            )
+        return existentes
+
+    def buscar_por_id(self, memoria_id: int) -> Optional[Dict[str, Any]]:
+        """Retorna a memória com o id informado, ou None."""
+        linha = self.conexao.execute("SELECT dados FROM memorias WHERE id = ?", (memoria_id,)).fetchone()
+        return json.loads(linha["dados"]) if linha else None
+
+    def buscar_por_hash(self, hash_texto: str) -> Optional[Dict[str, Any]]:
+        """Retorna a memória mais antiga com o hash de conteúdo informado, ou None."""
+        linha = self.conexao.execute(
+            "SELECT dados FROM memorias WHERE hash_conteudo = ? ORDER BY id LIMIT 1", (hash_texto,)
+        ).fetchone()
+        return json.loads(linha["dados"]) if linha else None
+
+    def ultimas(self, n: int) -> List[Dict[str, Any]]:
+        """Retorna as últimas n memórias em ordem cronológica."""
+        linhas = self.conexao.execute("SELECT dados FROM memorias ORDER BY id DESC LIMIT ?", (n,)).fetchall()
+        return [json.loads(linha["dados"]) for linha in reversed(linhas)]
+
+    def intervalo(self, inicio: Optional[str], fim: Optional[str], limite: int = -1) -> List[Dict[str, Any]]:
+        """Retorna as memórias criadas entre inicio e fim (pelo índice de criado_em).
+
+        Args:
+            inicio (str): Data ISO inicial (None para sem limite)
+            fim (str): Data ISO final (None para sem limite)
+            limite (int): Máximo de memórias, das mais antigas em diante (-1 para todas)
+        """
+        linhas = self.conexao.execute(
+            "SELECT dados FROM memorias WHERE (? IS NULL OR criado_em >= ?) AND (? IS NULL OR criado_em <= ?) "
+            "ORDER BY criado_em LIMIT ?",
+            (inicio, inicio, fim, fim, limite)
+        ).fetchall()
+        return [json.loads(linha["dados"]) for linha in linhas]
+
+    def iterar(self, desde: Optional[str] = None, tamanho_pagina: int = 500) -> Iterator[Dict[str, Any]]:
+        """Percorre as memórias em ordem de id sem carregá-las de uma vez.
+
+        A leitura é paginada pela chave primária: cada página é uma consulta
+        concluída, então o consumidor pode gravar no banco durante a iteração.
+
+        Args:
+            desde (str, optional): Só memórias com criado_em a partir desta data ISO
+            tamanho_pagina (int): Linhas lidas por consulta
+        """
+        ultimo_id = None
+        while True:
+            linhas = self.conexao.execute(
+                "SELECT id, dados FROM memorias WHERE (? IS NULL OR id > ?) AND (? IS NULL OR criado_em >= ?) "
+                "ORDER BY id LIMIT ?",
+                (ultimo_id, ultimo_id, desde, desde, tamanho_pagina)
+            ).fetchall()
+            for linha in linhas:
+                yield json.loads(linha["dados"])
+            if len(linhas) < tamanho_pagina:
+                return
+            ultimo_id = linhas[-1]["id"]
+
+    def _consulta_indice(self, condicoes: List[tuple]) -> tuple:
+        """Monta a subconsulta de ids que atendem a todas as condições do índice."""
+        sql = " INTERSECT ".join(
+            "SELECT memoria_id FROM indice_secundario WHERE campo = ? AND valor = ?" for _ in condicoes
+        )
+        return sql, [parte for condicao in condicoes for parte in condicao]
+
+    def filtrar(self, tipo: Optional[str] = None, origem: Optional[str] = None, emocao: Optional[str] = None,
+                tag: Optional[str] = None, tem_campo=None, limite: int = -1) -> List[Dict[str, Any]]:
+        """Retorna as memórias que atendem aos filtros, pelo índice secundário.
+
+        Args:
+            tipo, origem, emocao, tag (str): Valores exigidos (None para ignorar)
+            tem_campo (str ou iterável): Campos que a memória deve possuir
+            limite (int): Máximo de memórias, em ordem de id (-1 para todas)
+        """
+        condicoes = condicoes_filtro(tipo, origem, emocao, tag, tem_campo)
+        if not condicoes:
+            linhas = self.conexao.execute("SELECT dados FROM memorias ORDER BY id LIMIT ?", (limite,)).fetchall()
+        else:
+            subconsulta, parametros = self._consulta_indice(condicoes)
+            linhas = self.conexao.execute(
+                f"SELECT dados FROM memorias WHERE id IN ({subconsulta}) ORDER BY id LIMIT ?",
+                (*parametros, limite)
+            ).fetchall()
+        return [json.loads(linha["dados"]) for linha in linhas]
+
+    def contar(self, tipo: Optional[str] = None, origem: Optional[str] = None, emocao: Optional[str] = None,
+               tag: Optional[str] = None, tem_campo=None) -> int:
+        """Conta as memórias que atendem aos filtros sem ler os registros."""
+        condicoes = condicoes_filtro(tipo, origem, emocao, tag, tem_campo)
+        if not condicoes:
+            return self.total()
+        subconsulta, parametros = self._consulta_indice(condicoes)
+        return self.conexao.execute(f"SELECT COUNT(*) FROM ({subconsulta})", parametros).fetchone()[0]
+
+    def valores(self, campo: str) -> Dict[str, int]:
+        """Retorna cada valor indexado do campo (ex.: "tipo") com seu número de memórias."""
+        return {
+            linha[0]: linha[1] for linha in self.conexao.execute(
+                "SELECT valor, COUNT(*) FROM indice_secundario WHERE campo = ? GROUP BY valor", (campo,)
+            )
+        }
+
+    def buscar_termo(self, termo: str, limite: int = -1, recentes_primeiro: bool = False) -> List[Dict[str, Any]]:
+        """Busca memórias cujo conteúdo contém o termo (sem diferenciar maiúsculas).
+
+        O índice de trigramas reduz a busca às memórias que contêm todos os
+        trigramas do termo; só essas passam pela comparação de substring.
+        Termos com menos de três caracteres são comparados em todas.
+
+        Args:
+            termo (str): Termo buscado (qualquer trecho, inclusive parte de palavra)
+            limite (int): Máximo de resultados (-1 para todos)
+            recentes_primeiro (bool): Ordena dos ids mais novos para os mais antigos
+        """
+        ordem = "DESC" if recentes_primeiro else "ASC"
+        consulta = indice_trigramas.consulta_candidatos(termo)
+        filtro, parametros = "", []
+        if consulta is not None:
+            filtro = f"id IN ({consulta[0]}) AND "
+            parametros = consulta[1]
+        linhas = self.conexao.execute(
+            f"SELECT dados FROM memorias WHERE {filtro}instr(py_lower(conteudo), ?) > 0 ORDER BY id {ordem} LIMIT ?",
+            (*parametros, termo.lower(), limite)
+        ).fetchall()
+        return [json.loads(linha["dados"]) for linha in linhas]
+
+    def buscar_termos(self, termos: List[str], operador: str = "e", limite: int = -1,
+                      recentes_primeiro: bool = False) -> List[Dict[str, Any]]:
+        """Busca memórias pelo índice de termos, sem ler o conteúdo das demais.
+
+        Args:
+            termos (list): Termos já extraídos com indice_invertido.termos_consulta
+            operador (str): "e" (todos os termos) ou "ou" (qualquer um)
+            limite (int): Máximo de resultados (-1 para todos)
+            recentes_primeiro (bool): Ordena dos ids mais novos para os mais antigos
+        """
+        if not termos:
+            return []
+        subconsulta, parametros = indice_invertido.consulta_ids(termos, operador)
+        ordem = "DESC" if recentes_primeiro else "ASC"
+        linhas = self.conexao.execute(
+            f"SELECT dados FROM memorias WHERE id IN ({subconsulta}) ORDER BY id {ordem} LIMIT ?",
+            (*parametros, limite)
+        ).fetchall()
+        return [json.loads(linha["dados"]) for linha in linhas]
+
+    def ranquear_termos(self, termos: List[str], limite: int, com_pontuacao: bool = False) -> list:
+        """Retorna as memórias mais relevantes para os termos, pelo BM25.
+
+        Só as ocorrências dos termos são lidas; os documentos lidos são
+        apenas os das k memórias selecionadas.
+
+        Args:
+            termos (list): Termos já extraídos com indice_invertido.termos_consulta
+            limite (int): Quantas memórias retornar
+            com_pontuacao (bool): Retorna pares (pontuação, memória)
+
+        Returns:
+            list: Memórias da mais relevante para a menos relevante
+        """
+        ranking = indice_invertido.ranquear(self.conexao, termos, limite)
+        if not ranking:
+            return []
+        ids = [memoria_id for _, memoria_id in ranking]
+        documentos = {
+            linha["id"]: json.loads(linha["dados"]) for linha in self.conexao.execute(
+                f"SELECT id, dados FROM memorias WHERE id IN ({','.join('?' * len(ids))})", ids
+            )
+        }
+        if com_pontuacao:
+            return [(pontuacao, documentos[memoria_id]) for pontuacao, memoria_id in ranking
+                    if memoria_id in documentos]
+        return [documentos[memoria_id] for memoria_id in ids if memoria_id in documentos]
+
+    def assinatura(self) -> tuple:
+        """Retorna um valor que muda sempre que o banco é alterado.
+
+        Combina o data_version (alterações feitas por outras conexões) com o
+        total de alterações feitas por esta conexão.
+        """
+        data_version = self.conexao.execute("PRAGMA data_version").fetchone()[0]
+        return (data_version, self.conexao.total_changes)
+
+    def total(self) -> int:
+        """Retorna o número de memórias armazenadas."""
+        return self.conexao.execute("SELECT COUNT(*) FROM memorias").fetchone()[0]
+
+    def maior_id(self) -> int:
+        """Retorna o maior id armazenado (0 se vazio), pela chave primária."""
+        return self.conexao.execute("SELECT COALESCE(MAX(id), 0) FROM memorias").fetchone()[0]
+
+    def data_mais_recente(self) -> Optional[str]:
+        """Retorna o maior criado_em armazenado, pelo índice da coluna."""
+        return self.conexao.execute("SELECT MAX(criado_em) FROM memorias").fetchone()[0]
+
+    def amostrar(self, quantidade: int) -> List[Dict[str, Any]]:
+        """Retorna até `quantidade` memórias aleatórias sem varrer a tabela.
+
+        Sorteia ids entre o menor e o maior e busca o primeiro id existente a
+        partir de cada sorteio (O(log n) por memória). Lacunas deixadas por
+        remoções tornam a amostra levemente enviesada, o que é aceitável
+        para a escolha de memórias a refinar.
+        """
+        menor, maior = self.conexao.execute("SELECT MIN(id), MAX(id) FROM memorias").fetchone()
+        if menor is None:
+            return []
+
+        amostra = {}
+        tentativas = 0
+        while len(amostra) < quantidade and tentativas < quantidade * 4:
+            tentativas += 1
+            linha = self.conexao.execute(
+                "SELECT id, dados FROM memorias WHERE id >= ? ORDER BY id LIMIT 1",
+                (random.randint(menor, maior),)
+            ).fetchone()
+            if linha is not None:
+                amostra[linha["id"]] = json.loads(linha["dados"])
+        return list(amostra.values())
+
+    def remover(self, memoria_id: int) -> bool:
+        """Remove a memória com o id informado.
+
+        Returns:
+            bool: True se a memória existia
+        """
+        with self._transacao():
+            cursor = self.conexao.execute("DELETE FROM memorias WHERE id = ?", (memoria_id,))
+            if cursor.rowcount:
+                self.conexao.execute("DELETE FROM indice_secundario WHERE memoria_id = ?", (memoria_id,))
+                indice_invertido.desindexar(self.conexao, [memoria_id])
+                self.conexao.execute("DELETE FROM indice_trigramas WHERE memoria_id = ?", (memoria_id,))
+                self._definir_meta("ultima_atualizacao", datetime.now().isoformat())
+        return cursor.rowcount > 0
+
+    def alocar_id(self) -> int:
+        """Reserva e retorna um novo id, nunca reutilizado mesmo após remoções.
+
+        O próximo id fica registrado na tabela meta; MAX(id) (O(log n) pela
+        chave primária) cobre bancos criados antes do alocador.
+        """
+        with self._transacao():
+            memoria_id = self._proximo_id()
+            self._definir_meta("proximo_id", str(memoria_id + 1))
+        return memoria_id
+
+    def _proximo_id(self) -> int:
+        """Lê o próximo id livre (deve ser chamado dentro de uma transação)."""
+        linha = self.conexao.execute("SELECT valor FROM meta WHERE chave = 'proximo_id'").fetchone()
+        maior_id = self.conexao.execute("SELECT COALESCE(MAX(id), 0) FROM memorias").fetchone()[0]
+        return max(int(linha["valor"]) if linha else 1, maior_id + 1)
+
+    def fechar(self):
+        """Fecha as conexões com o banco (de todas as threads)."""
+        with self._trava_conexoes:
+            conexoes, self._conexoes = self._conexoes, []
+        for conexao in conexoes:
+            conexao.close()
+        self._local = threading.local()
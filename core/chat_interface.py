@@ -3,11 +3,14 @@ Módulo Chat Interface - Implementa a interface de chat do sistema.
 """
 
 import logging
+import os
+import time
 from typing import Dict, Any, Optional
 from datetime import datetime
 from rich.console import Console
 from rich.panel import Panel
 from rich.markdown import Markdown
+from core.utils import ler_jsonl
 
 class ChatInterface:
     def __init__(self, alma):
@@ -87,6 +90,7 @@ class ChatInterface:
 ║  MEMÓRIA:                                                                   ║
 ║  • memorias [n]       - Lista as últimas n memórias (padrão: 5)            ║
 ║  • buscar [termo]     - Busca memórias contendo o termo                     ║
+║  • importar [arquivo] - Importa memórias de um arquivo JSONL                ║
 ║                                                                             ║
 ║  SISTEMA:                                                                   ║
 ║  • status             - Mostra o status atual do sistema                    ║
@@ -110,6 +114,7 @@ class ChatInterface:
                 'agentes': 'agentes',
                 'ativar': 'ativar',
                 'desativar': 'desativar',
+                'importar': 'importar',
                 'ajuda': 'ajuda'
             }
             
@@ -268,6 +273,38 @@ class ChatInterface:
                         'timestamp': datetime.now()
                     }
 
+            elif cmd == 'importar' and len(partes) > 1:
+                # O caminho vem do comando original: nomes de arquivo diferenciam maiúsculas
+                caminho = comando.strip().split(maxsplit=1)[1]
+                if not os.path.isfile(caminho):
+                    return {
+                        'status': 'erro',
+                        'erro': f"Arquivo não encontrado: {caminho}",
+                        'timestamp': datetime.now()
+                    }
+
+                inicio = time.perf_counter()
+
+                def mostrar_progresso(processadas):
+                    decorrido = time.perf_counter() - inicio
+                    taxa = processadas / decorrido if decorrido > 0 else 0
+                    print(f"\rImportando: {processadas:,} linhas processadas ({taxa:,.0f}/s)", end="", flush=True)
+
+                with open(caminho, "r", encoding="utf-8") as arquivo:
+                    resumo = await self.alma.persona.adicionar_memorias_async(
+                        ler_jsonl(arquivo), progresso=mostrar_progresso
+                    )
+                print()
+
+                decorrido = time.perf_counter() - inicio
+                return {
+                    'status': 'sucesso',
+                    'resposta': (f"Importação de '{caminho}' concluída em {decorrido:.1f}s: "
+                                 f"{resumo['inseridas']} memórias inseridas, {resumo['duplicadas']} duplicadas, "
+                                 f"{resumo['invalidas']} linhas inválidas."),
+                    'timestamp': datetime.now()
+                }
+
             else:
                 return {
                     'status': 'erro',
@@ -9,6 +9,22 @@ PERSONA_CONFIG = {
     # Caminho para o arquivo de memórias
     "memoria_path": "core/memoria.json",
     
+    # Backend de armazenamento da persona: "json", "sqlite" ou "particionado"
+    "backend_memoria": "sqlite",
+    
+    # Caminho para o banco SQLite de memórias (backend "sqlite")
+    "memoria_db_path": "db/memoria.db",
+    
+    # Diretório das partições por período (backend "particionado")
+    "memoria_particoes_path": "data/memorias",
+    
+    # Período de cada partição: "dia" ou "mes"
+    "granularidade_particoes": "mes",
+    
+    # Codec do arquivo de memórias (backend "json"): "json", "msgpack",
+    # opcionalmente com "+gzip" ou "+zstd" (ex.: "msgpack+zstd")
+    "codec_memoria": "json",
+    
     # Limite de memórias de curto prazo antes de transferir para longo prazo
     "limite_memoria_curto_prazo": 5,
     
@@ -34,6 +50,78 @@ ALMA_CONFIG = {
     "max_ciclos_reflexao": 100
 }
 
+# Configurações de armazenamento da memória (core.memoria)
+MEMORIA_CONFIG = {
+    # Modo de persistência: "journal" (append-only + snapshot) ou "json" (reescrita completa)
+    "modo_persistencia": "journal",
+    
+    # Número mínimo de entradas no journal antes de compactar em um novo snapshot
+    "limite_journal": 1000,
+    
+    # Compacta quando o journal atingir esta fração do total de memórias
+    # (mantém o custo amortizado de escrita constante)
+    "proporcao_compactacao": 0.5,
+    
+    # Janela (em milissegundos) para agrupar escritas em um único flush
+    "janela_escrita_ms": 50,
+    
+    # Número de mutações pendentes que força um flush imediato
+    "max_escritas_pendentes": 100,
+    
+    # Codec do snapshot/arquivo de memórias (ver PERSONA_CONFIG["codec_memoria"])
+    "codec": "json",
+    
+    # Máximo de memórias mantidas em RAM (camada de curto prazo); as mais
+    # antigas e pouco acessadas migram para a camada de longo prazo em disco
+    "limite_curto_prazo": 1000,
+    
+    # Acessos a partir dos quais uma memória é mantida (ou promovida) em RAM
+    "acessos_memoria_frequente": 3,
+    
+    # Banco SQLite da camada de longo prazo
+    "caminho_longo_prazo": "memoria/longo_prazo.db",
+    
+    # Memórias mais relevantes (BM25) consideradas ao montar o conhecimento do chat
+    "limite_conhecimento_relevante": 10
+}
+
+# Política de consolidação das memórias geradas internamente (core.consolidacao)
+CONSOLIDACAO_CONFIG = {
+    # Intervalo entre execuções do job de consolidação (em segundos)
+    "intervalo": 300,
+    
+    # Memórias consideradas geradas: por tipo ou por origem
+    "tipos_gerados": ["reflexao", "sintese", "metacognicao"],
+    "origens_geradas": ["sintese_interna"],
+    
+    # Idade mínima (em horas) para uma memória gerada ser consolidada
+    "idade_minima_horas": 1,
+    
+    # Importância: memórias com prioridade acima deste valor são preservadas
+    "prioridade_maxima": 3,
+    
+    # Memórias acessadas pelo menos esse número de vezes são preservadas
+    "acessos_minimos": 3,
+    
+    # Similaridade (0-1) entre temas para agrupar memórias redundantes
+    "limiar_redundancia": 0.6,
+    
+    # Tamanho mínimo de um grupo para ser resumido
+    "min_grupo": 2,
+    
+    # Memórias geradas isoladas mais antigas que isto (em dias) são descartadas
+    "idade_descarte_dias": 30,
+    
+    # Máximo de memórias examinadas por execução (mantém cada execução limitada)
+    "tamanho_lote": 500
+}
+
+# Configurações do aprendizado adaptativo
+APRENDIZADO_CONFIG = {
+    # Codec do arquivo de estado do aprendizado (ver PERSONA_CONFIG["codec_memoria"])
+    "codec_estado": "json"
+}
+
 # Configurações de log
 LOG_CONFIG = {
     # Nível de log
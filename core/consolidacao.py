@@ -0,0 +1,231 @@
+"""
+Módulo Consolidação - Limita o crescimento das memórias geradas internamente.
+
+Os ciclos de reflexão e síntese gravam uma memória nova a cada pensamento,
+muitas vezes repetindo o mesmo tema ("Reflexão sobre 'Reflexão sobre ...'").
+Este módulo executa, em segundo plano, uma política configurável de idade,
+importância, número de acessos e redundância: memórias geradas de baixo
+valor sobre o mesmo tema são fundidas em um resumo compacto, e memórias
+geradas isoladas e antigas são descartadas.
+"""
+
+import asyncio
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+from core.config import CONSOLIDACAO_CONFIG, STOPWORDS
+from core.utils import normalizar_texto
+
+# Prefixos dos textos gerados pelos processadores de pensamento
+PREFIXOS_GERADOS = re.compile(
+    r"^\s*(Reflexão sobre:? '?|Refletindo sobre: |Combinando: '|Síntese: O conceito '|"
+    r"Síntese das memórias: |Avaliação do aprendizado recente: )"
+)
+
+# Número de palavras que identificam o tema de uma memória gerada
+PALAVRAS_TEMA = 12
+
+
+def extrair_tema(conteudo: str) -> str:
+    """Extrai o tema de uma memória gerada, removendo prefixos aninhados.
+
+    Args:
+        conteudo (str): Conteúdo da memória
+
+    Returns:
+        str: Tema normalizado (primeiras palavras do texto original)
+    """
+    texto = conteudo or ""
+    while True:
+        sem_prefixo = PREFIXOS_GERADOS.sub("", texto, count=1)
+        if sem_prefixo == texto:
+            break
+        texto = sem_prefixo
+
+    # O texto citado termina no primeiro "': " (ou na aspa final)
+    texto = texto.split("': ", 1)[0].split("' ", 1)[0].rstrip("'")
+    return " ".join(normalizar_texto(texto).split()[:PALAVRAS_TEMA])
+
+
+class ConsolidadorMemorias:
+    def __init__(self, memoria, config: Dict[str, Any] = None):
+        """Inicializa o consolidador.
+
+        Args:
+            memoria: Instância de core.memoria.Memoria
+            config (dict, optional): Política de consolidação (padrão: CONSOLIDACAO_CONFIG)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.memoria = memoria
+        self.config = {**CONSOLIDACAO_CONFIG, **(config or {})}
+        # Posição (timestamp) onde a próxima execução continua a varredura
+        self._cursor = None
+        self.estatisticas = {
+            'execucoes': 0,
+            'resumos_criados': 0,
+            'memorias_consolidadas': 0,
+            'memorias_descartadas': 0,
+            'ultima_execucao': None
+        }
+
+    async def ciclo_consolidacao(self, intervalo: Optional[int] = None):
+        """Executa a consolidação periodicamente, em segundo plano.
+
+        Args:
+            intervalo (int, optional): Segundos entre execuções (padrão: configuração)
+        """
+        intervalo = intervalo or self.config["intervalo"]
+        try:
+            while True:
+                await asyncio.sleep(intervalo)
+                await self.executar_async()
+        except asyncio.CancelledError:
+            self.logger.info("Ciclo de consolidação interrompido")
+        except Exception as e:
+            self.logger.error(f"Erro no ciclo de consolidação: {str(e)}")
+
+    def executar(self) -> Dict[str, int]:
+        """Executa uma rodada de consolidação sobre um lote de memórias.
+
+        Cada rodada examina no máximo `tamanho_lote` memórias, continuando de
+        onde a anterior parou e voltando ao início ao alcançar o corte de idade.
+
+        Returns:
+            dict: Quantidade de resumos criados e de memórias consolidadas/descartadas
+        """
+        resultado = {'resumos': 0, 'consolidadas': 0, 'descartadas': 0}
+        try:
+            agora = datetime.now()
+            lote = self.memoria.listar_intervalo(self._cursor, self._corte(agora), limite=self.config["tamanho_lote"])
+            for _ in self._consolidar_lote(lote, agora, resultado):
+                pass
+            self._registrar(resultado, agora)
+        except Exception as e:
+            self.logger.error(f"Erro ao consolidar memórias: {str(e)}")
+        return resultado
+
+    async def executar_async(self) -> Dict[str, int]:
+        """Versão de executar para o ciclo em segundo plano.
+
+        O lote é lido do longo prazo na thread do escritor e o event loop é
+        liberado depois de cada grupo resumido ou descartado, de modo que
+        uma rodada nunca o bloqueia por inteiro.
+
+        Returns:
+            dict: Quantidade de resumos criados e de memórias consolidadas/descartadas
+        """
+        resultado = {'resumos': 0, 'consolidadas': 0, 'descartadas': 0}
+        try:
+            agora = datetime.now()
+            lote = await self.memoria.listar_intervalo_async(
+                self._cursor, self._corte(agora), limite=self.config["tamanho_lote"]
+            )
+            for _ in self._consolidar_lote(lote, agora, resultado):
+                await asyncio.sleep(0)
+            self._registrar(resultado, agora)
+        except Exception as e:
+            self.logger.error(f"Erro ao consolidar memórias: {str(e)}")
+        return resultado
+
+    def _corte(self, agora: datetime) -> str:
+        """Timestamp a partir do qual as memórias ainda são novas demais para consolidar."""
+        return (agora - timedelta(hours=self.config["idade_minima_horas"])).isoformat()
+
+    def _consolidar_lote(self, lote: List[Dict[str, Any]], agora: datetime, resultado: Dict[str, int]):
+        """Resume ou descarta os grupos do lote, cedendo a vez depois de cada um.
+
+        Yields:
+            None: Após cada grupo processado
+        """
+        self._cursor = lote[-1].get('timestamp') if len(lote) >= self.config["tamanho_lote"] else None
+
+        candidatas = [m for m in lote if self._consolidavel(m)]
+        limite_descarte = (agora - timedelta(days=self.config["idade_descarte_dias"])).isoformat()
+
+        for grupo in self._agrupar(candidatas):
+            if len(grupo) >= self.config["min_grupo"]:
+                if self._resumir(grupo):
+                    resultado['resumos'] += 1
+                    resultado['consolidadas'] += len(grupo)
+                yield
+            elif grupo[0].get('timestamp', '') < limite_descarte:
+                if self.memoria.remover_memoria(grupo[0]['id']):
+                    resultado['descartadas'] += 1
+                yield
+
+    def _registrar(self, resultado: Dict[str, int], agora: datetime):
+        """Acumula o resultado da rodada nas estatísticas."""
+        self.estatisticas['execucoes'] += 1
+        self.estatisticas['resumos_criados'] += resultado['resumos']
+        self.estatisticas['memorias_consolidadas'] += resultado['consolidadas']
+        self.estatisticas['memorias_descartadas'] += resultado['descartadas']
+        self.estatisticas['ultima_execucao'] = agora.isoformat()
+
+        if resultado['resumos'] or resultado['descartadas']:
+            self.logger.info(
+                f"Consolidação: {resultado['consolidadas']} memórias em {resultado['resumos']} resumos, "
+                f"{resultado['descartadas']} descartadas"
+            )
+
+    def _consolidavel(self, memoria: Dict[str, Any]) -> bool:
+        """Aplica a política de tipo/origem, importância e acessos."""
+        gerada = (memoria.get('tipo') in self.config["tipos_gerados"]
+                  or memoria.get('origem') in self.config["origens_geradas"])
+        if not gerada:
+            return False
+        if memoria.get('prioridade', 1) > self.config["prioridade_maxima"]:
+            return False
+        return self.memoria.acessos(memoria['id']) < self.config["acessos_minimos"]
+
+    def _agrupar(self, memorias: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Agrupa memórias do mesmo tipo cujos temas são iguais ou redundantes.
+
+        Temas idênticos caem no mesmo grupo diretamente; os demais são
+        comparados pela similaridade de Jaccard com o representante de cada
+        grupo do mesmo tipo.
+        """
+        limiar = self.config["limiar_redundancia"]
+        grupos = {}
+        representantes = {}
+
+        for memoria in memorias:
+            tipo = memoria.get('tipo') or memoria.get('origem')
+            tema = extrair_tema(memoria.get('conteudo', ''))
+            chave = (tipo, tema)
+            if chave not in grupos:
+                palavras = set(tema.split()) - STOPWORDS
+                for chave_existente, palavras_existentes in representantes.get(tipo, []):
+                    uniao = palavras | palavras_existentes
+                    if uniao and len(palavras & palavras_existentes) / len(uniao) >= limiar:
+                        chave = chave_existente
+                        break
+                else:
+                    grupos[chave] = []
+                    representantes.setdefault(tipo, []).append((chave, palavras))
+            grupos[chave].append(memoria)
+
+        return list(grupos.values())
+
+    def _resumir(self, grupo: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Substitui um grupo de memórias por um resumo."""
+        tipo = grupo[0].get('tipo') or grupo[0].get('origem')
+        tema = extrair_tema(grupo[0].get('conteudo', ''))
+        timestamps = [m.get('timestamp', '') for m in grupo]
+        return self.memoria.consolidar(
+            [m['id'] for m in grupo],
+            f"Resumo de {len(grupo)} memórias de {tipo} sobre '{tema}'",
+            tipo="resumo",
+            prioridade=max(m.get('prioridade', 1) for m in grupo),
+            dados_extras={
+                'origem': 'consolidacao',
+                'tipo_consolidado': tipo,
+                'tema': tema,
+                'consolidadas': len(grupo),
+                'periodo': {'inicio': min(timestamps), 'fim': max(timestamps)}
+            }
+        )
+
+    def status(self) -> Dict[str, Any]:
+        """Retorna as estatísticas de consolidação."""
+        return dict(self.estatisticas)
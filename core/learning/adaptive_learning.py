@@ -8,12 +8,18 @@ adaptação autônoma baseada na análise de resultados.
 
 import random
 import asyncio
-import json
 import os
 from datetime import datetime
+from itertools import islice
 from collections import Counter, defaultdict
 import numpy as np
 from pathlib import Path
+from core.config import APRENDIZADO_CONFIG
+from core.armazenamento import Codec, carregar_arquivo, escritor
+from core.utils import amostrar_fluxo
+
+# Nome sob o qual o aprendizado adaptativo guarda sua posição no feed de mudanças
+CONSUMIDOR_FEED = "aprendizado_adaptativo"
 
 class AprendizadoAdaptativo:
     def __init__(self, persona, alma, gerenciador_aprendizado):
@@ -47,6 +53,11 @@ class AprendizadoAdaptativo:
         # Caminho para armazenar dados de aprendizado
         self.data_path = Path("data/adaptive_learning")
         self.data_path.mkdir(parents=True, exist_ok=True)
+        self.codec_estado = Codec(APRENDIZADO_CONFIG["codec_estado"])
+        
+        # Agregados das memórias mantidos a partir do feed de mudanças
+        self._palavras = Counter()
+        self._agregados = {"processadas": 0, "avaliadas": 0, "soma_qualidade": 0}
     
     async def iniciar_ciclo_adaptativo(self, intervalo=600):
         """Inicia o ciclo de aprendizado adaptativo.
@@ -65,7 +76,7 @@ class AprendizadoAdaptativo:
                 await self.executar_ciclo_adaptacao()
                 
                 # Salva o estado atual do aprendizado
-                self._salvar_estado_aprendizado()
+                await self._salvar_estado_aprendizado_async()
         except asyncio.CancelledError:
             print("Ciclo de aprendizado adaptativo interrompido")
             raise
@@ -111,25 +122,23 @@ class AprendizadoAdaptativo:
         Returns:
             dict: Conjunto de métricas relevantes
         """
-        # Carrega as memórias
-        dados = self.persona._carregar_memorias()
-        if not dados["memorias"]:
+        n_memorias_total = self.persona.contar_memorias()
+        if not n_memorias_total:
             return {}
         
+        # Temas e agregados acompanham apenas o que mudou desde o último ciclo
+        self._sincronizar_memorias()
+        temas = self._palavras
+        n_memorias_processadas = self._agregados["processadas"]
+        n_memorias_avaliadas = self._agregados["avaliadas"]
+        soma_qualidade = self._agregados["soma_qualidade"]
+        
         # Calcula qualidade média
-        memorias_avaliadas = [m for m in dados["memorias"] if "avaliacao" in m]
         qualidade_media = 0
-        if memorias_avaliadas:
-            qualidade_media = sum(m["avaliacao"]["qualidade"] for m in memorias_avaliadas) / len(memorias_avaliadas)
+        if n_memorias_avaliadas:
+            qualidade_media = soma_qualidade / n_memorias_avaliadas
             self.historico_metricas["qualidade_media"].append(qualidade_media)
         
-        # Calcula diversidade de temas
-        temas = Counter()
-        for memoria in dados["memorias"]:
-            conteudo = memoria.get("conteudo", "").lower()
-            palavras = [w for w in conteudo.split() if len(w) > 4 and w not in ["combinando", "conceitos", "sobre"]]
-            temas.update(palavras)
-        
         n_temas_significativos = len([t for t, c in temas.items() if c >= 3])
         self.historico_metricas["diversidade_temas"].append(n_temas_significativos)
         
@@ -143,9 +152,7 @@ class AprendizadoAdaptativo:
             self.historico_metricas["eficiencia_agentes"][agente].append(valor)
         
         # Calcula métricas adicionais
-        n_memorias_total = len(dados["memorias"])
-        n_memorias_processadas = len([m for m in dados["memorias"] if m.get("processada", False)])
-        taxa_processamento = n_memorias_processadas / n_memorias_total if n_memorias_total > 0 else 0
+        taxa_processamento = n_memorias_processadas / n_memorias_total
         
         # Retorna métricas coletadas
         return {
@@ -244,16 +251,8 @@ class AprendizadoAdaptativo:
         print("Executando estratégia para estimular diversidade de temas")
         
         # Estratégia: Criar algumas memórias sobre temas pouco explorados
-        dados = self.persona._carregar_memorias()
-        
         # Identifica temas pouco explorados (palavras únicas que aparecem poucas vezes)
-        todas_palavras = []
-        for memoria in dados["memorias"]:
-            conteudo = memoria.get("conteudo", "").lower()
-            palavras = [w for w in conteudo.split() if len(w) > 4 and w not in ["combinando", "conceitos", "sobre"]]
-            todas_palavras.extend(palavras)
-        
-        contagem = Counter(todas_palavras)
+        contagem = self._contar_palavras()
         
         # Temas raros: aparecem entre 1-2 vezes
         temas_raros = [tema for tema, cont in contagem.items() if 1 <= cont <= 2]
@@ -263,20 +262,18 @@ class AprendizadoAdaptativo:
             tema = random.choice(temas_raros)
             print(f"Estimulando diversidade explorando tema raro: '{tema}'")
             
-            # Busca memórias que mencionam este tema
-            memorias_relacionadas = [
-                m for m in dados["memorias"]
-                if tema.lower() in m.get("conteudo", "").lower()
-            ]
+            # Busca a primeira memória que menciona este tema
+            memoria_base = next(self.persona.iter_memorias(
+                filtro=lambda m: tema in m.get("conteudo", "").lower(),
+                campos=("id", "conteudo")
+            ), None)
             
             # Cria uma nova síntese especial aprofundando este tema
-            if memorias_relacionadas:
-                memoria_base = memorias_relacionadas[0]
+            if memoria_base:
                 conteudo = f"Exploração de conceito raro '{tema}': {memoria_base['conteudo']}"
                 
                 # Cria uma nova memória exploratória
                 nova_memoria = {
-                    "id": len(dados["memorias"]) + 1,
                     "conteudo": conteudo,
                     "criado_em": datetime.now().isoformat(),
                     "versao": 1,
@@ -286,7 +283,63 @@ class AprendizadoAdaptativo:
                 }
                 
                 # Armazena a síntese
-                self.persona.armazenar_memoria(nova_memoria, dados)
+                await self.persona.armazenar_memoria_async(nova_memoria)
+    
+    def _contar_palavras(self):
+        """Conta as palavras-chave das memórias.
+        
+        Returns:
+            Counter: Frequência de cada palavra com mais de 4 letras
+        """
+        self._sincronizar_memorias()
+        return Counter(self._palavras)
+    
+    @staticmethod
+    def _palavras_memoria(memoria):
+        """Palavras-chave do conteúdo da memória (mais de 4 letras)."""
+        conteudo = memoria.get("conteudo", "").lower()
+        return [w for w in conteudo.split() if len(w) > 4 and w not in ["combinando", "conceitos", "sobre"]]
+    
+    def _contabilizar(self, memoria, sinal):
+        """Soma (sinal 1) ou retira (sinal -1) a memória dos agregados."""
+        if sinal > 0:
+            self._palavras.update(self._palavras_memoria(memoria))
+        else:
+            self._palavras.subtract(self._palavras_memoria(memoria))
+        if memoria.get("processada"):
+            self._agregados["processadas"] += sinal
+        if "avaliacao" in memoria:
+            self._agregados["avaliadas"] += sinal
+            self._agregados["soma_qualidade"] += sinal * memoria["avaliacao"]["qualidade"]
+    
+    def _sincronizar_memorias(self):
+        """Atualiza palavras-chave e agregados com as mudanças pendentes do feed.
+        
+        No primeiro uso, ou quando o feed não cobre mais as mudanças desde a
+        última sincronização, os agregados são recalculados por inteiro.
+        """
+        mudancas, seq = self.persona.mudancas.pendentes(CONSUMIDOR_FEED)
+        if mudancas is None:
+            self._palavras = Counter()
+            for memoria in self.persona.iter_memorias(campos=("conteudo",)):
+                self._palavras.update(self._palavras_memoria(memoria))
+            avaliadas = self.persona.filtrar_memorias(tem_campo="avaliacao")
+            self._agregados = {
+                "processadas": sum(
+                    1 for memoria in self.persona.filtrar_memorias(tem_campo="processada") if memoria["processada"]
+                ),
+                "avaliadas": len(avaliadas),
+                "soma_qualidade": sum(memoria["avaliacao"]["qualidade"] for memoria in avaliadas)
+            }
+        else:
+            for mudanca in mudancas:
+                if mudanca["anterior"] is not None:
+                    self._contabilizar(mudanca["anterior"], -1)
+                if mudanca["memoria"] is not None:
+                    self._contabilizar(mudanca["memoria"], 1)
+            for palavra in [p for p, cont in self._palavras.items() if cont <= 0]:
+                del self._palavras[palavra]
+        self.persona.mudancas.confirmar(CONSUMIDOR_FEED, seq)
     
     async def _gerenciar_experimentos(self):
         """Gerencia experimentos de aprendizado, avaliando resultados e aplicando estratégias bem-sucedidas."""
@@ -418,16 +471,8 @@ class AprendizadoAdaptativo:
         
         elif tipo == "estimular_tema_especifico":
             # Experimento: focar em um tema específico por alguns ciclos
-            dados = self.persona._carregar_memorias()
-            
             # Extrai temas de todas as memórias
-            todas_palavras = []
-            for memoria in dados["memorias"]:
-                conteudo = memoria.get("conteudo", "").lower()
-                palavras = [w for w in conteudo.split() if len(w) > 4 and w not in ["combinando", "conceitos", "sobre"]]
-                todas_palavras.extend(palavras)
-            
-            contagem = Counter(todas_palavras)
+            contagem = self._contar_palavras()
             
             # Escolhe um tema com frequência média para explorar
             temas_medios = [tema for tema, cont in contagem.items() if 3 <= cont <= 5]
@@ -448,25 +493,21 @@ class AprendizadoAdaptativo:
                 }
                 
                 # Cria uma memória inicial sobre o tema
-                await self._criar_memoria_tematica(tema, dados)
+                await self._criar_memoria_tematica(tema)
         
         elif tipo == "revisar_memorias_antigas":
             # Experimento: revisar memórias mais antigas para atualizá-las
-            dados = self.persona._carregar_memorias()
-            
-            # Ordena memórias por data de criação
-            memorias_ordenadas = sorted(
-                dados["memorias"], 
-                key=lambda m: m.get("criado_em", "2000-01-01")
-            )
+            # O iterador entrega as memórias em ordem de criação, então as
+            # mais antigas (primeiros 20%) são o início do fluxo; o total vem
+            # do índice, sem percorrer as memórias
+            total = self.persona.contar_memorias()
+            n_antigas = max(1, int(total * 0.2))
             
-            # Pega as memórias mais antigas (primeiros 20%)
-            n_antigas = max(1, int(len(memorias_ordenadas) * 0.2))
-            antigas = memorias_ordenadas[:n_antigas]
+            # Escolhe uma aleatoriamente
+            antigas = amostrar_fluxo(islice(self.persona.iter_memorias(), n_antigas), 1)
             
             if antigas:
-                # Escolhe uma aleatoriamente
-                memoria = random.choice(antigas)
+                memoria = antigas[0]
                 
                 descricao = f"Revisão de memórias antigas (ID #{memoria['id']})"
                 print(f"Iniciando experimento: {descricao}")
@@ -484,23 +525,23 @@ class AprendizadoAdaptativo:
                 # Atualiza a memória
                 await self.alma.atualizar_memoria_especifica(memoria)
     
-    async def _criar_memoria_tematica(self, tema, dados):
+    async def _criar_memoria_tematica(self, tema):
         """Cria uma nova memória focada em um tema específico.
         
         Args:
             tema (str): O tema a explorar
-            dados (dict): Dados de memória
         """
-        # Busca memórias relacionadas ao tema
-        memorias_relacionadas = [
-            m for m in dados["memorias"]
-            if tema.lower() in m.get("conteudo", "").lower()
-        ]
+        # Escolhe 1-2 memórias aleatórias relacionadas ao tema
+        tema_normalizado = tema.lower()
+        escolhidas = amostrar_fluxo(
+            self.persona.iter_memorias(
+                filtro=lambda m: tema_normalizado in m.get("conteudo", "").lower(),
+                campos=("id", "conteudo")
+            ),
+            random.randint(1, 2)
+        )
         
-        if memorias_relacionadas:
-            # Escolhe 1-2 memórias aleatórias relacionadas
-            n_escolher = min(len(memorias_relacionadas), random.randint(1, 2))
-            escolhidas = random.sample(memorias_relacionadas, n_escolher)
+        if escolhidas:
             
             # Gera conteúdo com foco no tema
             conteudo = f"Exploração aprofundada do conceito '{tema}': "
@@ -508,7 +549,6 @@ class AprendizadoAdaptativo:
             
             # Cria nova memória
             nova_memoria = {
-                "id": len(dados["memorias"]) + 1,
                 "conteudo": conteudo,
                 "criado_em": datetime.now().isoformat(),
                 "versao": 1,
@@ -518,7 +558,7 @@ class AprendizadoAdaptativo:
             }
             
             # Armazena a nova memória
-            self.persona.armazenar_memoria(nova_memoria, dados)
+            await self.persona.armazenar_memoria_async(nova_memoria)
     
     async def _aplicar_estrategias_efetivas(self):
         """Aplica estratégias que foram consideradas efetivas em experimentos anteriores."""
@@ -561,7 +601,21 @@ class AprendizadoAdaptativo:
     
     def _salvar_estado_aprendizado(self):
         """Salva o estado atual do aprendizado adaptativo."""
-        estado = {
+        caminho = self.data_path / "estado_aprendizado.json"
+        escritor.executar_sincrono(self.codec_estado.salvar, str(caminho), self._estado_aprendizado())
+        
+        print(f"Estado do aprendizado adaptativo salvo em {caminho}")
+    
+    async def _salvar_estado_aprendizado_async(self):
+        """Salva o estado do aprendizado na thread do escritor, sem bloquear o loop."""
+        caminho = self.data_path / "estado_aprendizado.json"
+        await escritor.executar(self.codec_estado.salvar, str(caminho), self._estado_aprendizado())
+        
+        print(f"Estado do aprendizado adaptativo salvo em {caminho}")
+    
+    def _estado_aprendizado(self):
+        """Monta o documento de estado (cópias rasas, seguras para gravar em outra thread)."""
+        return {
             "timestamp": datetime.now().isoformat(),
             "ciclos_adaptacao": self.ciclos_adaptacao,
             "historico_metricas": {
@@ -569,17 +623,10 @@ class AprendizadoAdaptativo:
                 "diversidade_temas": self.historico_metricas["diversidade_temas"][-10:],
                 "tempos": self.historico_metricas["tempos"][-10:]
             },
-            "experimentos_ativos": self.experimentos_ativos,
+            "experimentos_ativos": dict(self.experimentos_ativos),
             "resultados_experimentos": self.resultados_experimentos[-20:],
-            "estrategias_efetivas": self.estrategias_efetivas
+            "estrategias_efetivas": list(self.estrategias_efetivas)
         }
-        
-        # Salva o arquivo
-        caminho = self.data_path / "estado_aprendizado.json"
-        with open(caminho, "w", encoding="utf-8") as f:
-            json.dump(estado, f, ensure_ascii=False, indent=2)
-        
-        print(f"Estado do aprendizado adaptativo salvo em {caminho}")
     
     def carregar_estado_aprendizado(self):
         """Carrega o estado de aprendizado adaptativo anterior, se existir."""
@@ -587,8 +634,7 @@ class AprendizadoAdaptativo:
         
         if os.path.exists(caminho):
             try:
-                with open(caminho, "r", encoding="utf-8") as f:
-                    estado = json.load(f)
+                estado = carregar_arquivo(caminho)
                 
                 self.ciclos_adaptacao = estado.get("ciclos_adaptacao", 0)
                 
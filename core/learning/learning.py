@@ -9,6 +9,10 @@ import random
 import asyncio
 from datetime import datetime, timedelta
 from collections import Counter
+from core.utils import amostrar_fluxo
+
+# Nome sob o qual o gerenciador guarda sua posição no feed de mudanças
+CONSUMIDOR_FEED = "aprendizado"
 
 class GerenciadorAprendizado:
     def __init__(self, persona, alma):
@@ -49,15 +53,11 @@ class GerenciadorAprendizado:
         # Atualiza estatísticas
         self.ciclos_realizados += 1
         
-        # Carrega as memórias
-        dados = self.persona._carregar_memorias()
-        if not dados["memorias"]:
+        # Coleta estatísticas a partir das mudanças desde o último ciclo
+        if not self._coletar_estatisticas():
             print("Sem memórias suficientes para otimização")
             return False
         
-        # Coleta estatísticas
-        self._coletar_estatisticas(dados["memorias"])
-        
         # Ajusta pesos dos agentes
         ajustes_realizados = self._ajustar_pesos_agentes()
         
@@ -96,47 +96,80 @@ class GerenciadorAprendizado:
             print("Ciclo de aprendizado contínuo interrompido")
             raise
     
-    def _coletar_estatisticas(self, memorias):
+    @staticmethod
+    def _temas_memoria(memoria):
+        """Palavras do conteúdo consideradas temas (mais de 4 letras)."""
+        conteudo = memoria.get("conteudo", "").lower()
+        return [p for p in conteudo.split() if len(p) > 4 and p not in ["combinando", "conceitos"]]
+    
+    def _coletar_estatisticas(self):
         """Coleta estatísticas sobre as memórias e seu processamento.
         
-        Args:
-            memorias (list): Lista de memórias para análise
+        O trabalho é proporcional ao que mudou desde o ciclo anterior: os
+        temas frequentes e as novas avaliações vêm do feed de mudanças da
+        memória, a partir da posição confirmada no último ciclo. Só no
+        primeiro ciclo, ou quando o feed não cobre mais esse intervalo, as
+        memórias são percorridas por inteiro. A eficácia dos agentes vem
+        do índice secundário.
+        
+        Returns:
+            int: Número de memórias existentes
         """
-        # Coleta temas frequentes
-        for memoria in memorias:
-            # Extrai palavras-chave do conteúdo
-            conteudo = memoria.get("conteudo", "").lower()
-            palavras = [p for p in conteudo.split() if len(p) > 4 and p not in ["combinando", "conceitos"]]
-            for palavra in palavras:
-                self.estatisticas["temas_frequentes"][palavra] += 1
-        
-        # Calcula qualidade média das memórias avaliadas
-        memorias_avaliadas = [m for m in memorias if "avaliacao" in m]
-        if memorias_avaliadas:
-            total_qualidade = sum(m["avaliacao"]["qualidade"] for m in memorias_avaliadas)
-            nova_media = total_qualidade / len(memorias_avaliadas)
+        total_memorias = self.persona.contar_memorias()
+        if not total_memorias:
+            return 0
+        
+        temas_frequentes = self.estatisticas["temas_frequentes"]
+        mudancas, seq = self.persona.mudancas.pendentes(CONSUMIDOR_FEED)
+        if mudancas is None:
+            temas_frequentes.clear()
+            for memoria in self.persona.iter_memorias(campos=("conteudo",)):
+                temas_frequentes.update(self._temas_memoria(memoria))
+            avaliacoes = [m["avaliacao"] for m in self.persona.filtrar_memorias(tem_campo="avaliacao")]
+        else:
+            avaliacoes = []
+            for mudanca in mudancas:
+                anterior, memoria = mudanca["anterior"], mudanca["memoria"]
+                if anterior is not None:
+                    temas_frequentes.subtract(self._temas_memoria(anterior))
+                if memoria is not None:
+                    temas_frequentes.update(self._temas_memoria(memoria))
+                    if "avaliacao" in memoria and (anterior is None or anterior.get("avaliacao") != memoria["avaliacao"]):
+                        avaliacoes.append(memoria["avaliacao"])
+            for tema in [t for t, contagem in temas_frequentes.items() if contagem <= 0]:
+                del temas_frequentes[tema]
+        self.persona.mudancas.confirmar(CONSUMIDOR_FEED, seq)
+        
+        num_avaliadas = len(avaliacoes)
+        total_qualidade = sum(avaliacao["qualidade"] for avaliacao in avaliacoes)
+        
+        # Avalia eficácia dos diferentes agentes
+        # (simplificado - na prática, precisaria de métricas mais complexas)
+        self.estatisticas["agentes_efetivos"] = {
+            "reflexao": self.persona.contar_memorias(origem="sintese_interna"),
+            "emocional": self.persona.contar_memorias(tem_campo="contexto_emocional"),
+            "consistencia": self.persona.contar_memorias(tem_campo="consistencia"),
+            "padrao": self.persona.contar_memorias(tem_campo="padroes"),
+            "metacognicao": self.persona.contar_memorias(tem_campo="avaliacao")
+        }
+        
+        # Atualiza a qualidade média com as avaliações novas
+        if num_avaliadas:
+            nova_media = total_qualidade / num_avaliadas
             
             # Atualiza média ponderada
             if self.estatisticas["total_avaliacoes"] > 0:
                 self.estatisticas["qualidade_media"] = (
                     (self.estatisticas["qualidade_media"] * self.estatisticas["total_avaliacoes"] + 
-                     nova_media * len(memorias_avaliadas)) / 
-                    (self.estatisticas["total_avaliacoes"] + len(memorias_avaliadas))
+                     nova_media * num_avaliadas) / 
+                    (self.estatisticas["total_avaliacoes"] + num_avaliadas)
                 )
             else:
                 self.estatisticas["qualidade_media"] = nova_media
             
-            self.estatisticas["total_avaliacoes"] += len(memorias_avaliadas)
+            self.estatisticas["total_avaliacoes"] += num_avaliadas
         
-        # Avalia eficácia dos diferentes agentes
-        # (simplificado - na prática, precisaria de métricas mais complexas)
-        self.estatisticas["agentes_efetivos"] = {
-            "reflexao": sum(1 for m in memorias if m.get("origem") == "sintese_interna"),
-            "emocional": sum(1 for m in memorias if "contexto_emocional" in m),
-            "consistencia": sum(1 for m in memorias if "consistencia" in m),
-            "padrao": sum(1 for m in memorias if "padroes" in m),
-            "metacognicao": sum(1 for m in memorias if "avaliacao" in m)
-        }
+        return total_memorias
     
     def _ajustar_pesos_agentes(self):
         """Ajusta os pesos dos agentes com base na eficácia observada.
@@ -189,20 +222,20 @@ class GerenciadorAprendizado:
         Esta função implementa abordagens específicas para melhorar o aprendizado,
         como revisão de memórias de baixa qualidade.
         """
-        # Carrega memórias
-        dados = self.persona._carregar_memorias()
-        
         # Estratégia 1: Revisar memórias de baixa qualidade
-        memorias_baixa_qualidade = [
-            m for m in dados["memorias"] 
-            if "avaliacao" in m and m["avaliacao"]["qualidade"] < 4
-        ]
-        
-        if memorias_baixa_qualidade:
-            print(f"Aplicando estratégia de revisão para {len(memorias_baixa_qualidade)} memórias de baixa qualidade")
-            # Escolhe uma memória aleatória para revisar
-            memoria = random.choice(memorias_baixa_qualidade)
-            await self.alma.atualizar_memoria_especifica(memoria)
+        # Escolhe uma memória aleatória para revisar (amostragem por reservatório)
+        memoria_revisao = None
+        total_baixa_qualidade = 0
+        for memoria in self.persona.filtrar_memorias(tem_campo="avaliacao"):
+            if memoria["avaliacao"]["qualidade"] >= 4:
+                continue
+            total_baixa_qualidade += 1
+            if random.randrange(total_baixa_qualidade) == 0:
+                memoria_revisao = memoria
+        
+        if memoria_revisao is not None:
+            print(f"Aplicando estratégia de revisão para {total_baixa_qualidade} memórias de baixa qualidade")
+            await self.alma.atualizar_memoria_especifica(memoria_revisao)
         
         # Estratégia 2: Reforçar aprendizado sobre temas frequentes
         areas_foco = self._identificar_areas_foco()
@@ -210,15 +243,18 @@ class GerenciadorAprendizado:
             tema = random.choice(areas_foco)
             print(f"Reforçando aprendizado sobre tema frequente: {tema}")
             
-            # Busca memórias relacionadas ao tema
-            memorias_relacionadas = [
-                m for m in dados["memorias"]
-                if tema.lower() in m.get("conteudo", "").lower()
-            ]
+            # Sorteia até 3 memórias relacionadas ao tema sem montar a lista completa
+            tema_normalizado = tema.lower()
+            memorias_escolhidas = amostrar_fluxo(
+                self.persona.iter_memorias(
+                    filtro=lambda m: tema_normalizado in m.get("conteudo", "").lower(),
+                    campos=("id", "conteudo")
+                ),
+                3
+            )
             
             # Se encontrou memórias suficientes, gera uma síntese especial
-            if len(memorias_relacionadas) >= 2:
-                memorias_escolhidas = random.sample(memorias_relacionadas, min(3, len(memorias_relacionadas)))
+            if len(memorias_escolhidas) >= 2:
                 conteudos = [m["conteudo"] for m in memorias_escolhidas]
                 
                 # Gera uma síntese aprofundada
@@ -226,7 +262,6 @@ class GerenciadorAprendizado:
                 
                 # Cria nova memória com a síntese
                 nova_memoria = {
-                    "id": len(dados["memorias"]) + 1,
                     "conteudo": sintese,
                     "criado_em": datetime.now().isoformat(),
                     "versao": 1,
@@ -236,7 +271,7 @@ class GerenciadorAprendizado:
                 }
                 
                 # Armazena a síntese
-                self.persona.armazenar_memoria(nova_memoria, dados)
+                await self.persona.armazenar_memoria_async(nova_memoria)
     
     def selecionar_agente(self):
         """Seleciona um agente com base nos pesos otimizados.
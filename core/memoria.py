@@ -2,17 +2,59 @@
 Módulo Memória - Implementa o sistema de memória do Alma.
 """
 
+import copy
 import logging
-from typing import Dict, Any, List
+import asyncio
+import heapq
+import random
+import threading
+from itertools import islice
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, List, Optional, Union, Iterator
 from datetime import datetime
-import json
 import os
+from core.config import MEMORIA_CONFIG
+from core.armazenamento import (JournalMemorias, ArmazenamentoSQLite, Codec, carregar_arquivo, escritor,
+                                IndiceSecundario, IndiceInvertido, IndiceTrigramas)
+from core.armazenamento.indice_invertido import termos_consulta
+from core.armazenamento.indice_secundario import condicoes_filtro
+from core.armazenamento.mudancas import FeedMudancas, INSERCAO, ATUALIZACAO, REMOCAO
+from core.utils import hash_conteudo, corresponde_filtro
 
 class Memoria:
-    def __init__(self):
-        """Inicializa o sistema de memória."""
+    def __init__(self, modo_persistencia: str = None):
+        """Inicializa o sistema de memória.
+        
+        As memórias ficam em duas camadas: a de curto prazo, mantida em RAM
+        e persistida pelo journal, guarda as memórias recentes ou acessadas
+        com frequência; a de longo prazo, em SQLite, recebe as demais e só
+        é lida sob demanda (por id, por termo, por intervalo ou amostragem).
+        
+        Args:
+            modo_persistencia (str): "journal" ou "json" (padrão: MEMORIA_CONFIG)
+        """
         self.logger = logging.getLogger(__name__)
+        # Camada de curto prazo: memórias em ordem crescente de timestamp, com
+        # a lista paralela de timestamps usada como índice para buscas binárias
         self.memorias = []
+        self._timestamps = []
+        # Índice de id para memória (busca O(1)) e alocador monotônico de ids
+        self._por_id = {}
+        self._proximo_id = 1
+        # A importação em massa aloca ids na thread do escritor
+        self._trava_ids = threading.Lock()
+        # Índice hash do conteúdo normalizado -> id (deduplicação exata)
+        self._por_hash = {}
+        self._duplicatas_evitadas = 0
+        # Listas de ocorrência por tipo/origem/emoção/tag/campo da camada em RAM
+        # (a camada de longo prazo mantém as suas em uma tabela do SQLite)
+        self._indice_secundario = IndiceSecundario()
+        # Termo -> ids da camada em RAM para buscar_memorias (idem)
+        self._indice_termos = IndiceInvertido()
+        # Trigrama -> ids da camada em RAM para a busca por trecho (idem)
+        self._indice_trigramas = IndiceTrigramas()
+        # Feed de mudanças: cada inserção/atualização/remoção recebe uma sequência
+        self.mudancas = FeedMudancas()
         self.ultima_atualizacao = datetime.now()
         
         # Cria diretório de memória se não existir
@@ -20,44 +62,375 @@ class Memoria:
         if not os.path.exists(self.diretorio_memoria):
             os.makedirs(self.diretorio_memoria)
         
+        # Configura o journal append-only, se habilitado
+        self.modo_persistencia = modo_persistencia or MEMORIA_CONFIG["modo_persistencia"]
+        self.codec = Codec(MEMORIA_CONFIG["codec"])
+        self.journal = None
+        if self.modo_persistencia == "journal":
+            self.journal = JournalMemorias(
+                self.diretorio_memoria,
+                limite_journal=MEMORIA_CONFIG["limite_journal"],
+                proporcao_compactacao=MEMORIA_CONFIG["proporcao_compactacao"],
+                codec=self.codec
+            )
+        
+        # Camada de longo prazo em disco e política de migração entre camadas
+        self.limite_curto_prazo = MEMORIA_CONFIG["limite_curto_prazo"]
+        self.acessos_memoria_frequente = MEMORIA_CONFIG["acessos_memoria_frequente"]
+        self._longo_prazo = ArmazenamentoSQLite(MEMORIA_CONFIG["caminho_longo_prazo"])
+        # Última gravação da camada de longo prazo entregue à thread do escritor
+        self._gravacao_longo_prazo = None
+        self._total_longo_prazo = self.longo_prazo.total()
+        self._mais_recente_longo_prazo = self.longo_prazo.data_mais_recente() or ''
+        self._acessos = {}
+        
+        # Escritas pendentes agrupadas em um único flush (write-behind)
+        self.janela_escrita = MEMORIA_CONFIG["janela_escrita_ms"] / 1000
+        self.max_escritas_pendentes = MEMORIA_CONFIG["max_escritas_pendentes"]
+        self._escritas_pendentes = []
+        self._flush_agendado = None
+        
         # Carrega memórias existentes
         self._carregar_memorias()
+        self._proximo_id = max(self._proximo_id, self.longo_prazo.maior_id() + 1)
+        self._migrar_para_longo_prazo()
+
+    @property
+    def longo_prazo(self) -> ArmazenamentoSQLite:
+        """Camada de longo prazo, pronta para leitura.
+        
+        As gravações no SQLite rodam na thread do escritor (ver
+        _gravar_longo_prazo); antes de uma leitura, espera as que ainda
+        estão na fila, para que a leitura enxergue o que já foi gravado.
+        """
+        gravacao = self._gravacao_longo_prazo
+        if gravacao is not None:
+            self._gravacao_longo_prazo = None
+            gravacao.result()
+        return self._longo_prazo
+
+    def _gravar_longo_prazo(self, funcao, *args):
+        """Entrega uma gravação da camada de longo prazo à thread do escritor.
+        
+        Os registros são copiados antes, pois o loop pode continuar
+        alterando os originais enquanto a thread os serializa. Fora de um
+        event loop a gravação é imediata (respeitando a ordem da fila).
+        """
+        args = copy.deepcopy(args)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            escritor.executar_sincrono(self._executar_gravacao_longo_prazo, funcao, args)
+            return
+        self._gravacao_longo_prazo = escritor.submeter(self._executar_gravacao_longo_prazo, funcao, args)
+
+    def _executar_gravacao_longo_prazo(self, funcao, args):
+        """Executado na thread do escritor: grava na camada de longo prazo."""
+        try:
+            funcao(*args)
+        except Exception as e:
+            self.logger.error(f"Erro ao gravar na camada de longo prazo: {str(e)}")
 
     def _carregar_memorias(self):
-        """Carrega memórias do arquivo."""
+        """Carrega memórias do arquivo (snapshot + journal no modo journal)."""
         try:
+            if self.journal is not None:
+                self._indexar_memorias(self.journal.carregar())
+                self._proximo_id = max(self._proximo_id, self.journal.proximo_id)
+                self.logger.info(f"Memórias carregadas: {len(self.memorias)} "
+                                 f"({self.journal.entradas_journal} entradas de journal)")
+                return
+            
             arquivo_memoria = os.path.join(self.diretorio_memoria, "memorias.json")
             if os.path.exists(arquivo_memoria):
-                with open(arquivo_memoria, 'r', encoding='utf-8') as f:
-                    self.memorias = json.load(f)
+                documento = carregar_arquivo(arquivo_memoria)
+                if isinstance(documento, dict):
+                    self._indexar_memorias(documento.get("memorias", []))
+                    self._proximo_id = max(self._proximo_id, documento.get("proximo_id", 1))
+                else:
+                    self._indexar_memorias(documento)
                 self.logger.info(f"Memórias carregadas: {len(self.memorias)}")
         except Exception as e:
             self.logger.error(f"Erro ao carregar memórias: {str(e)}")
-            self.memorias = []
+            self._indexar_memorias([])
 
-    def _salvar_memorias(self):
-        """Salva memórias no arquivo."""
+    def _indexar_memorias(self, memorias: List[Dict[str, Any]]):
+        """Ordena as memórias por timestamp e reconstrói o índice temporal."""
+        # A ordenação é estável e quase linear, pois o arquivo já está quase em ordem
+        self.memorias = sorted(memorias, key=lambda x: x.get('timestamp', ''))
+        self._timestamps = [m.get('timestamp', '') for m in self.memorias]
+        self._por_id = {m['id']: m for m in self.memorias}
+        self._por_hash = {}
+        for memoria in self.memorias:
+            self._por_hash.setdefault(hash_conteudo(memoria.get('conteudo', '')), memoria['id'])
+        self._indice_secundario = IndiceSecundario(self.memorias)
+        self._indice_termos = IndiceInvertido(self.memorias)
+        self._indice_trigramas = IndiceTrigramas(self.memorias)
+        ids_inteiros = [memoria_id for memoria_id in self._por_id if isinstance(memoria_id, int)]
+        self._proximo_id = max(ids_inteiros, default=0) + 1
+
+    def _inserir_ordenado(self, memoria: Dict[str, Any]):
+        """Insere uma memória mantendo a ordem por timestamp.
+        
+        Inserções chegam normalmente em ordem cronológica e custam O(1);
+        timestamps fora de ordem caem no caminho da busca binária.
+        """
+        self._por_id[memoria['id']] = memoria
+        self._por_hash.setdefault(hash_conteudo(memoria.get('conteudo', '')), memoria['id'])
+        self._indice_secundario.adicionar(memoria)
+        self._indice_termos.adicionar(memoria)
+        self._indice_trigramas.adicionar(memoria)
+        timestamp = memoria.get('timestamp', '')
+        if not self._timestamps or timestamp >= self._timestamps[-1]:
+            self.memorias.append(memoria)
+            self._timestamps.append(timestamp)
+            return
+        
+        posicao = bisect_right(self._timestamps, timestamp)
+        self.memorias.insert(posicao, memoria)
+        self._timestamps.insert(posicao, timestamp)
+
+    def _posicao(self, memoria: Dict[str, Any]) -> int:
+        """Localiza a posição de uma memória na lista ordenada (busca binária)."""
+        posicao = bisect_left(self._timestamps, memoria.get('timestamp', ''))
+        while self.memorias[posicao] is not memoria:
+            posicao += 1
+        return posicao
+
+    def _alocar_id(self) -> int:
+        """Retorna um novo id, nunca reutilizado mesmo após remoções."""
+        with self._trava_ids:
+            memoria_id = self._proximo_id
+            self._proximo_id += 1
+            if self.journal is not None:
+                self.journal.proximo_id = max(self.journal.proximo_id, self._proximo_id)
+        return memoria_id
+
+    def _salvar_memorias(self, memorias: Optional[List[Dict[str, Any]]] = None, proximo_id: Optional[int] = None):
+        """Salva todas as memórias no arquivo (compacta o journal no modo journal).
+        
+        Args:
+            memorias (list, optional): Cópia do estado a gravar (padrão: estado atual)
+            proximo_id (int, optional): Próximo id livre no momento da cópia
+        """
+        memorias = self.memorias if memorias is None else memorias
         try:
+            if self.journal is not None:
+                self.journal.compactar(memorias)
+                return
+            
             arquivo_memoria = os.path.join(self.diretorio_memoria, "memorias.json")
-            with open(arquivo_memoria, 'w', encoding='utf-8') as f:
-                json.dump(self.memorias, f, ensure_ascii=False, indent=2)
-            self.logger.info(f"Memórias salvas: {len(self.memorias)}")
+            self.codec.salvar(arquivo_memoria, {"memorias": memorias, "proximo_id": proximo_id or self._proximo_id})
+            self.logger.info(f"Memórias salvas: {len(memorias)}")
         except Exception as e:
             self.logger.error(f"Erro ao salvar memórias: {str(e)}")
 
-    def adicionar_memoria(self, conteudo: str, tipo: str = "geral", prioridade: int = 1) -> Dict[str, Any]:
-        """Adiciona uma nova memória."""
+    def _persistir_memoria(self, memoria: Dict[str, Any]):
+        """Agenda a persistência de uma memória nova ou atualizada."""
+        self._agendar_escrita({"op": "put", "memoria": memoria})
+
+    def _persistir_remocao(self, memoria_id: Any):
+        """Agenda a persistência da remoção de uma memória."""
+        self._agendar_escrita({"op": "del", "id": memoria_id})
+
+    def _agendar_escrita(self, entrada: Dict[str, Any]):
+        """Acumula uma mutação para o próximo flush.
+        
+        As mutações ocorridas dentro da janela de escrita (ou até atingir
+        max_escritas_pendentes) são gravadas juntas por flush(). Fora de um
+        event loop não há como agendar, então a gravação é imediata.
+        """
+        self._escritas_pendentes.append(entrada)
+        
+        if len(self._escritas_pendentes) >= self.max_escritas_pendentes:
+            self.flush()
+            return
+        
         try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        
+        if self._flush_agendado is None:
+            self._flush_agendado = loop.call_later(self.janela_escrita, self.flush)
+
+    def flush(self):
+        """Grava todas as mutações pendentes de uma só vez.
+        
+        No modo journal as entradas são acrescentadas em uma única escrita
+        (custo O(1) por memória); o snapshot completo só é regravado quando
+        o journal é compactado. No modo json o arquivo é regravado uma vez.
+        
+        Dentro de um event loop a serialização e a escrita são entregues à
+        thread do escritor e este método retorna imediatamente; fora dele,
+        bloqueia até a gravação terminar (respeitando a ordem da fila).
+        """
+        if self._flush_agendado is not None:
+            self._flush_agendado.cancel()
+            self._flush_agendado = None
+        
+        if not self._escritas_pendentes:
+            return
+        
+        # As entradas e o estado são copiados (cópia profunda) aqui no loop: a
+        # thread do escritor serializa os registros enquanto o loop continua
+        # alterando os originais (contadores de acesso e referências, etc.)
+        pendentes = copy.deepcopy(self._escritas_pendentes)
+        self._escritas_pendentes = []
+        
+        # A decisão de regravar o estado completo também é tomada aqui
+        if self.journal is None or self.journal.precisa_compactar(len(self.memorias), len(pendentes)):
+            instantaneo = copy.deepcopy(self.memorias)
+        else:
+            instantaneo = None
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            escritor.executar_sincrono(self._gravar_pendentes, pendentes, instantaneo, self._proximo_id)
+            return
+        escritor.submeter(self._gravar_pendentes, pendentes, instantaneo, self._proximo_id)
+    
+    async def flush_async(self):
+        """Grava as mutações pendentes e aguarda, sem bloquear o loop, até estarem no disco."""
+        self.flush()
+        await escritor.aguardar()
+    
+    def _gravar_pendentes(self, pendentes: List[Dict[str, Any]], instantaneo: Optional[List[Dict[str, Any]]],
+                          proximo_id: int):
+        """Executado na thread do escritor: grava o journal e, se preciso, o snapshot."""
+        if self.journal is None:
+            self._salvar_memorias(instantaneo, proximo_id)
+            return
+        
+        try:
+            self.journal.registrar_entradas(pendentes)
+            if instantaneo is not None:
+                self._salvar_memorias(instantaneo)
+        except Exception as e:
+            self.logger.error(f"Erro ao registrar memórias no journal: {str(e)}")
+
+    def _registrar_acesso(self, memoria_id: Any) -> int:
+        """Conta um acesso à memória e retorna o total de acessos."""
+        acessos = self._acessos.get(memoria_id, 0) + 1
+        self._acessos[memoria_id] = acessos
+        return acessos
+
+    def _remover_da_camada_curto_prazo(self, ids: set):
+        """Retira da RAM as memórias com os ids informados, em uma única passada."""
+        for memoria_id in ids:
+            memoria = self._por_id.pop(memoria_id, None)
+            if memoria is not None:
+                self._desindexar_hash(memoria)
+                self._indice_secundario.remover(memoria)
+                self._indice_termos.remover(memoria)
+                self._indice_trigramas.remover(memoria)
+        self.memorias = [m for m in self.memorias if m['id'] not in ids]
+        self._timestamps = [m.get('timestamp', '') for m in self.memorias]
+
+    def _desindexar_hash(self, memoria: Dict[str, Any]):
+        """Retira a memória do índice de hashes, se for ela a indexada."""
+        hash_texto = hash_conteudo(memoria.get('conteudo', ''))
+        if self._por_hash.get(hash_texto) == memoria['id']:
+            del self._por_hash[hash_texto]
+
+    def _buscar_duplicata(self, conteudo: str) -> Optional[Dict[str, Any]]:
+        """Procura uma memória com o mesmo conteúdo normalizado nas duas camadas."""
+        hash_texto = hash_conteudo(conteudo)
+        memoria_id = self._por_hash.get(hash_texto)
+        if memoria_id is not None:
+            return self._por_id.get(memoria_id)
+        if self._total_longo_prazo:
+            return self.longo_prazo.buscar_por_hash(hash_texto)
+        return None
+
+    def _migrar_para_longo_prazo(self):
+        """Move para o disco as memórias excedentes da camada de curto prazo.
+        
+        Migram primeiro as mais antigas que não são acessadas com frequência.
+        A migração é feita em lotes de 10% da capacidade, de modo que o custo
+        de reconstruir a lista em RAM se dilui entre muitas inserções.
+        """
+        excedente = len(self.memorias) - self.limite_curto_prazo
+        if excedente <= 0:
+            return
+        
+        try:
+            quantidade = excedente + self.limite_curto_prazo // 10
+            frequentes = []
+            migradas = []
+            for memoria in self.memorias:
+                if len(migradas) >= quantidade:
+                    break
+                if self._acessos.get(memoria['id'], 0) >= self.acessos_memoria_frequente:
+                    frequentes.append(memoria)
+                else:
+                    migradas.append(memoria)
+            # Se quase tudo for frequente, as mais antigas migram mesmo assim
+            migradas.extend(frequentes[:max(0, excedente - len(migradas))])
+            
+            # A gravação no disco entra na fila do escritor antes da remoção
+            # do journal: uma queda no meio deixa a memória duplicada, nunca perdida
+            self._gravar_longo_prazo(self._longo_prazo.inserir_lote, migradas)
+            ids = {m['id'] for m in migradas}
+            self._remover_da_camada_curto_prazo(ids)
+            for memoria in migradas:
+                self._acessos.pop(memoria['id'], None)
+                self._persistir_remocao(memoria['id'])
+            
+            self._total_longo_prazo += len(migradas)
+            self._mais_recente_longo_prazo = max(
+                [self._mais_recente_longo_prazo] + [m.get('timestamp', '') for m in migradas]
+            )
+            self.logger.info(f"{len(migradas)} memórias migradas para a camada de longo prazo")
+        except Exception as e:
+            self.logger.error(f"Erro ao migrar memórias para o longo prazo: {str(e)}")
+
+    def _promover_para_curto_prazo(self, memoria: Dict[str, Any]):
+        """Traz de volta para a RAM uma memória de longo prazo acessada com frequência."""
+        self._gravar_longo_prazo(self._longo_prazo.remover, memoria['id'])
+        self._total_longo_prazo -= 1
+        self._inserir_ordenado(memoria)
+        self._persistir_memoria(memoria)
+        self._migrar_para_longo_prazo()
+
+    def adicionar_memoria(self, conteudo: str, tipo: str = "geral", prioridade: int = 1,
+                          dados_extras: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Adiciona uma nova memória.
+        
+        Se já existir uma memória com o mesmo conteúdo normalizado, nenhum
+        registro novo é criado: o contador de referências da existente é
+        incrementado e ela é retornada.
+        
+        Args:
+            conteudo (str): Conteúdo da memória
+            tipo (str): Tipo da memória
+            prioridade (int): Prioridade da memória
+            dados_extras (dict, optional): Campos adicionais (ex.: origem, baseado_em)
+        """
+        try:
+            existente = self._buscar_duplicata(conteudo)
+            if existente is not None:
+                self._duplicatas_evitadas += 1
+                return self.atualizar_memoria(existente, {
+                    'referencias': existente.get('referencias', 1) + 1,
+                    'ultima_referencia': datetime.now().isoformat()
+                })
+            
             memoria = {
-                'id': len(self.memorias) + 1,
+                **(dados_extras or {}),
+                'id': self._alocar_id(),
                 'conteudo': conteudo,
                 'tipo': tipo,
                 'prioridade': prioridade,
                 'timestamp': datetime.now().isoformat()
             }
             
-            self.memorias.append(memoria)
-            self._salvar_memorias()
+            self._inserir_ordenado(memoria)
+            self._persistir_memoria(memoria)
+            self.mudancas.registrar(INSERCAO, memoria['id'], memoria)
+            self._migrar_para_longo_prazo()
             self.ultima_atualizacao = datetime.now()
             
             return memoria
@@ -66,46 +439,642 @@ class Memoria:
             self.logger.error(f"Erro ao adicionar memória: {str(e)}")
             return None
 
-    def buscar_memorias(self, termo: str) -> List[Dict[str, Any]]:
-        """Busca memórias contendo o termo."""
+    def adicionar_memorias(self, memorias, progresso=None, intervalo_progresso: int = 10000) -> Dict[str, int]:
+        """Importa um grande volume de memórias de uma só vez.
+        
+        As memórias importadas vão direto para a camada de longo prazo em uma
+        única transação do SQLite, sem passar pelo journal nem pela lista em
+        RAM; as que forem acessadas com frequência são promovidas depois.
+        Memórias com conteúdo já existente em qualquer camada são ignoradas.
+        Bloqueia até o fim da importação; dentro de um event loop, use
+        adicionar_memorias_async.
+        
+        Args:
+            memorias (iterable): Textos ou dicionários com "conteudo" (e
+                opcionalmente "tipo", "prioridade" e "timestamp")
+            progresso (callable, optional): Recebe o número de itens processados
+            intervalo_progresso (int): Itens entre chamadas de progresso
+            
+        Returns:
+            dict: {"inseridas": n, "duplicadas": n, "invalidas": n}
+        """
+        resumo = {"inseridas": 0, "duplicadas": 0, "invalidas": 0}
         try:
-            termo = termo.lower()
-            return [
-                memoria for memoria in self.memorias
-                if termo in memoria['conteudo'].lower()
-            ]
+            resultado = escritor.executar_sincrono(
+                self._importar_longo_prazo,
+                self._validar_importacao(memorias, resumo, progresso, intervalo_progresso)
+            )
+            self._concluir_importacao(resumo, resultado)
+        except Exception as e:
+            self.logger.error(f"Erro ao importar memórias: {str(e)}")
+        return resumo
+
+    async def adicionar_memorias_async(self, memorias, progresso=None,
+                                       intervalo_progresso: int = 10000) -> Dict[str, int]:
+        """Versão assíncrona de adicionar_memorias.
+        
+        A importação inteira (leitura do iterável inclusive) roda na thread
+        do escritor, depois das gravações já enfileiradas; o event loop
+        segue livre, e o progresso é informado a partir daquela thread.
+        """
+        resumo = {"inseridas": 0, "duplicadas": 0, "invalidas": 0}
+        try:
+            resultado = await escritor.executar(
+                self._importar_longo_prazo,
+                self._validar_importacao(memorias, resumo, progresso, intervalo_progresso)
+            )
+            self._concluir_importacao(resumo, resultado)
+        except Exception as e:
+            self.logger.error(f"Erro ao importar memórias: {str(e)}")
+        return resumo
+
+    def _validar_importacao(self, memorias, resumo: Dict[str, int], progresso, intervalo_progresso: int):
+        """Normaliza os itens de uma importação, contando inválidos e duplicatas da camada em RAM."""
+        agora = datetime.now().isoformat()
+        processadas = 0
+        for item in memorias:
+            processadas += 1
+            if isinstance(item, str):
+                item = {'conteudo': item}
+            if not (isinstance(item, dict) and isinstance(item.get('conteudo'), str) and item['conteudo'].strip()):
+                resumo['invalidas'] += 1
+            elif hash_conteudo(item['conteudo']) in self._por_hash:
+                resumo['duplicadas'] += 1
+            else:
+                yield {
+                    'conteudo': item['conteudo'],
+                    'tipo': item.get('tipo', 'geral'),
+                    'prioridade': item.get('prioridade', 1),
+                    'timestamp': item.get('timestamp') or agora
+                }
+            if progresso and processadas % intervalo_progresso == 0:
+                progresso(processadas)
+        if progresso and processadas % intervalo_progresso:
+            progresso(processadas)
+
+    def _importar_longo_prazo(self, memorias) -> Dict[str, Any]:
+        """Executado na thread do escritor: grava uma importação em uma transação.
+        
+        Os ids vêm do mesmo alocador da camada de curto prazo, um a um e só
+        para as memórias de fato inseridas, então não colidem com os que o
+        loop alocar durante a importação. Se a transação falhar e nenhum
+        outro id tiver sido alocado nesse meio tempo, o contador volta ao
+        valor anterior.
+        """
+        with self._trava_ids:
+            inicio = self._proximo_id
+            inicio_journal = self.journal.proximo_id if self.journal is not None else None
+        alocados = 0
+
+        def alocador():
+            nonlocal alocados
+            alocados += 1
+            return self._alocar_id()
+
+        try:
+            resultado = self._longo_prazo.importar(memorias, alocador=alocador)
+        except Exception:
+            with self._trava_ids:
+                if self._proximo_id - inicio == alocados:
+                    self._proximo_id = inicio
+                    if self.journal is not None:
+                        self.journal.proximo_id = inicio_journal
+            raise
+        resultado['mais_recente'] = self._longo_prazo.data_mais_recente() or ''
+        return resultado
+
+    def _concluir_importacao(self, resumo: Dict[str, int], resultado: Dict[str, Any]):
+        """Atualiza contadores e o feed de mudanças depois de uma importação confirmada."""
+        resumo['inseridas'] = resultado['inseridas']
+        resumo['duplicadas'] += resultado['duplicadas']
+        self._duplicatas_evitadas += resumo['duplicadas']
+        
+        if resumo['inseridas']:
+            self._total_longo_prazo += resumo['inseridas']
+            self._mais_recente_longo_prazo = resultado['mais_recente']
+            # As memórias importadas não são registradas uma a uma: os
+            # consumidores do feed refazem sua varredura completa
+            self.mudancas.invalidar()
+            self.ultima_atualizacao = datetime.now()
+        self.logger.info(f"Importação: {resumo['inseridas']} memórias inseridas, "
+                         f"{resumo['duplicadas']} duplicadas, {resumo['invalidas']} inválidas")
+
+    def buscar_por_id(self, memoria_id: Any) -> Optional[Dict[str, Any]]:
+        """Retorna a memória com o id informado, ou None.
+        
+        A camada de curto prazo responde em O(1); memórias de longo prazo
+        são lidas pela chave primária e promovidas à RAM quando passam a ser
+        acessadas com frequência.
+        """
+        try:
+            memoria = self._por_id.get(memoria_id)
+            if memoria is not None:
+                self._registrar_acesso(memoria_id)
+                return memoria
+            
+            if not isinstance(memoria_id, int):
+                return None
+            memoria = self.longo_prazo.buscar_por_id(memoria_id)
+            if memoria is not None and self._registrar_acesso(memoria_id) >= self.acessos_memoria_frequente:
+                self._promover_para_curto_prazo(memoria)
+            return memoria
+        except Exception as e:
+            self.logger.error(f"Erro ao buscar memória por id: {str(e)}")
+            return None
+
+    def atualizar_memoria(self, memoria: Union[Dict[str, Any], Any], novos_dados: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Atualiza uma memória existente, persistindo apenas o registro alterado.
+        
+        Args:
+            memoria: A memória (dict) ou seu id
+            novos_dados (dict): Campos a atualizar; id e timestamp são preservados
+            
+        Returns:
+            dict: A memória atualizada, ou None se não existir
+        """
+        try:
+            memoria_id = memoria['id'] if isinstance(memoria, dict) else memoria
+            atual = self._por_id.get(memoria_id)
+            if atual is None:
+                # Memórias de longo prazo são atualizadas diretamente no disco
+                atual = self.longo_prazo.buscar_por_id(memoria_id) if isinstance(memoria_id, int) else None
+                if atual is None:
+                    self.logger.warning(f"Memória {memoria_id} não encontrada para atualização")
+                    return None
+                atualizada = {**atual, **novos_dados, 'id': memoria_id, 'timestamp': atual.get('timestamp', '')}
+                self._gravar_longo_prazo(self._longo_prazo.inserir, atualizada)
+                self.mudancas.registrar(ATUALIZACAO, memoria_id, atualizada, atual)
+                self.ultima_atualizacao = datetime.now()
+                return atualizada
+            
+            self._registrar_acesso(memoria_id)
+            atualizada = {**atual, **novos_dados, 'id': memoria_id, 'timestamp': atual.get('timestamp', '')}
+            self.memorias[self._posicao(atual)] = atualizada
+            self._por_id[memoria_id] = atualizada
+            if atualizada.get('conteudo') != atual.get('conteudo'):
+                self._desindexar_hash(atual)
+                self._por_hash.setdefault(hash_conteudo(atualizada.get('conteudo', '')), memoria_id)
+            self._indice_secundario.atualizar(atual, atualizada)
+            self._indice_termos.atualizar(atual, atualizada)
+            self._indice_trigramas.atualizar(atual, atualizada)
+            self._persistir_memoria(atualizada)
+            self.mudancas.registrar(ATUALIZACAO, memoria_id, atualizada, atual)
+            self.ultima_atualizacao = datetime.now()
+            
+            return atualizada
+            
+        except Exception as e:
+            self.logger.error(f"Erro ao atualizar memória: {str(e)}")
+            return None
+
+    def remover_memoria(self, memoria_id: Any) -> bool:
+        """Remove uma memória pelo id.
+        
+        Returns:
+            bool: True se a memória existia e foi removida
+        """
+        try:
+            self._acessos.pop(memoria_id, None)
+            memoria = self._por_id.pop(memoria_id, None)
+            if memoria is None:
+                if not isinstance(memoria_id, int):
+                    return False
+                # O registro anterior acompanha a mudança, para os consumidores do feed
+                anterior = self.longo_prazo.buscar_por_id(memoria_id)
+                if anterior is None:
+                    return False
+                self._gravar_longo_prazo(self._longo_prazo.remover, memoria_id)
+                self._total_longo_prazo -= 1
+                self.mudancas.registrar(REMOCAO, memoria_id, anterior=anterior)
+                self.ultima_atualizacao = datetime.now()
+                return True
+            
+            posicao = self._posicao(memoria)
+            del self.memorias[posicao]
+            del self._timestamps[posicao]
+            self._desindexar_hash(memoria)
+            self._indice_secundario.remover(memoria)
+            self._indice_termos.remover(memoria)
+            self._indice_trigramas.remover(memoria)
+            self._persistir_remocao(memoria_id)
+            self.mudancas.registrar(REMOCAO, memoria_id, anterior=memoria)
+            self.ultima_atualizacao = datetime.now()
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Erro ao remover memória: {str(e)}")
+            return False
+
+    def buscar_memorias(self, termo: str, camada: Optional[str] = None, operador: Optional[str] = None,
+                        ranking: Optional[str] = None, limite: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Busca memórias pelo termo, das mais recentes para as mais antigas.
+        
+        Por padrão o termo é procurado como trecho do conteúdo (substring,
+        inclusive partes de palavras), conferindo só as memórias que contêm
+        todos os seus trigramas. Com um operador, as palavras são
+        comparadas inteiras pelo índice invertido (palavra -> ids). As duas
+        camadas mantêm esses índices: em memória na RAM e em tabelas do
+        SQLite no longo prazo.
+        
+        Com ranking="bm25" concorrem as memórias com alguma das palavras e
+        o resultado vem da mais relevante para a menos relevante; cada
+        camada pontua com as estatísticas do próprio acervo e as melhores
+        de ambas são combinadas.
+        
+        Args:
+            termo (str): Trecho buscado, ou uma ou mais palavras
+            camada (str, optional): "curto_prazo" para buscar só na RAM (custo
+                independente do tamanho do histórico), "longo_prazo" para só o
+                disco, ou None para ambas
+            operador (str, optional): None (trecho), "e" (todas as palavras)
+                ou "ou" (qualquer uma); ignorado no ranking BM25
+            ranking (str, optional): None (mais recentes primeiro) ou "bm25"
+            limite (int, optional): Máximo de memórias (obrigatório no BM25: padrão 5)
+        """
+        try:
+            if ranking not in (None, "bm25"):
+                raise ValueError(f"Ranking de busca inválido: {ranking}")
+            if ranking == "bm25":
+                return self._ranquear_memorias(termos_consulta(termo), camada, limite or 5)
+            
+            resultados = []
+            if camada in (None, "curto_prazo"):
+                if operador is None:
+                    resultados = self._buscar_trecho_curto_prazo(termo.lower(), limite)
+                else:
+                    ids = self._indice_termos.consultar(termos_consulta(termo, operador), operador)
+                    memorias = (self._por_id[i] for i in ids)
+                    if limite is None:
+                        resultados = sorted(memorias, key=lambda m: m.get('timestamp', ''), reverse=True)
+                    else:
+                        resultados = heapq.nlargest(limite, memorias, key=lambda m: m.get('timestamp', ''))
+                for memoria in resultados:
+                    self._registrar_acesso(memoria['id'])
+            # O disco só precisa completar o que faltou para o limite
+            restantes = -1 if limite is None else limite - len(resultados)
+            if camada in (None, "longo_prazo") and self._total_longo_prazo and restantes != 0:
+                if operador is None:
+                    resultados.extend(self.longo_prazo.buscar_termo(termo, restantes, recentes_primeiro=True))
+                else:
+                    resultados.extend(self.longo_prazo.buscar_termos(termos_consulta(termo, operador), operador,
+                                                                     restantes, recentes_primeiro=True))
+            return resultados
         except Exception as e:
             self.logger.error(f"Erro ao buscar memórias: {str(e)}")
             return []
 
+    def _buscar_trecho_curto_prazo(self, termo: str, limite: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Memórias em RAM que contêm o trecho, conferindo só as candidatas dos trigramas.
+        
+        Percorre da mais recente para a mais antiga e para ao atingir o limite.
+        """
+        candidatos = self._indice_trigramas.candidatos(termo)
+        if candidatos is None:
+            memorias = reversed(self.memorias)
+        else:
+            memorias = sorted((self._por_id[i] for i in candidatos), key=lambda m: m.get('timestamp', ''),
+                              reverse=True)
+        encontradas = (memoria for memoria in memorias if termo in memoria['conteudo'].lower())
+        return list(islice(encontradas, limite))
+
+    def _ranquear_memorias(self, termos: List[str], camada: Optional[str], limite: int) -> List[Dict[str, Any]]:
+        """Seleciona as `limite` memórias de maior pontuação BM25 nas camadas pedidas."""
+        candidatos = []
+        if camada in (None, "curto_prazo"):
+            candidatos.extend(
+                (pontuacao, self._por_id[memoria_id])
+                for pontuacao, memoria_id in self._indice_termos.ranquear(termos, limite)
+            )
+        if camada in (None, "longo_prazo") and self._total_longo_prazo:
+            candidatos.extend(self.longo_prazo.ranquear_termos(termos, limite, com_pontuacao=True))
+        melhores = [memoria for _, memoria in heapq.nlargest(limite, candidatos, key=lambda item: item[0])]
+        for memoria in melhores:
+            if memoria['id'] in self._por_id:
+                self._registrar_acesso(memoria['id'])
+        return melhores
+
     def listar_memorias(self, limite: int = 5) -> List[Dict[str, Any]]:
-        """Lista as últimas memórias."""
+        """Lista as últimas memórias (O(limite), sem reordenar).
+        
+        A camada de longo prazo só é consultada quando a RAM não tem
+        memórias suficientes mais recentes que as do disco.
+        """
         try:
-            return sorted(
-                self.memorias,
-                key=lambda x: x['timestamp'],
-                reverse=True
-            )[:limite]
+            if limite <= 0:
+                return []
+            recentes = self.memorias[:-limite - 1:-1]
+            if not self._total_longo_prazo or (
+                    len(recentes) == limite and recentes[-1].get('timestamp', '') >= self._mais_recente_longo_prazo):
+                return recentes
+            
+            antigas = self.longo_prazo.ultimas(limite)[::-1]
+            chave = lambda m: m.get('timestamp', '')
+            return list(heapq.merge(recentes, antigas, key=chave, reverse=True))[:limite]
         except Exception as e:
             self.logger.error(f"Erro ao listar memórias: {str(e)}")
             return []
 
     def listar_todas_memorias(self) -> List[Dict[str, Any]]:
-        """Retorna todas as memórias armazenadas sem limite."""
+        """Retorna todas as memórias armazenadas sem limite, das mais recentes para as mais antigas.
+        
+        Carrega toda a camada de longo prazo; evite em caminhos frequentes.
+        """
         try:
-            return sorted(
-                self.memorias,
-                key=lambda x: x['timestamp'],
-                reverse=True
-            )
+            if not self._total_longo_prazo:
+                return self.memorias[::-1]
+            antigas = sorted(self.longo_prazo.iterar(), key=lambda m: m.get('timestamp', ''))
+            chave = lambda m: m.get('timestamp', '')
+            return list(heapq.merge(self.memorias[::-1], antigas[::-1], key=chave, reverse=True))
         except Exception as e:
             self.logger.error(f"Erro ao listar todas as memórias: {str(e)}")
             return []
 
+    def listar_intervalo(self, inicio: Optional[Union[datetime, str]] = None,
+                         fim: Optional[Union[datetime, str]] = None,
+                         limite: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Lista as memórias criadas entre inicio e fim (inclusive).
+        
+        A localização dos limites é feita por busca binária (O(log n)).
+        
+        Args:
+            inicio: Data/hora inicial (datetime ou ISO); None para sem limite
+            fim: Data/hora final (datetime ou ISO); None para sem limite
+            limite: Máximo de memórias, das mais antigas em diante; None para todas
+            
+        Returns:
+            list: Memórias do intervalo em ordem cronológica
+        """
+        try:
+            inicio, fim, recentes = self._intervalo_curto_prazo(inicio, fim, limite)
+            
+            # A camada de longo prazo só é lida se o intervalo a alcança
+            if not self._total_longo_prazo or (inicio is not None and inicio > self._mais_recente_longo_prazo):
+                return recentes
+            antigas = self.longo_prazo.intervalo(inicio, fim, limite if limite is not None else -1)
+            memorias = list(heapq.merge(antigas, recentes, key=lambda m: m.get('timestamp', '')))
+            return memorias[:limite] if limite is not None else memorias
+        except Exception as e:
+            self.logger.error(f"Erro ao listar intervalo de memórias: {str(e)}")
+            return []
+    
+    async def listar_intervalo_async(self, inicio: Optional[Union[datetime, str]] = None,
+                                     fim: Optional[Union[datetime, str]] = None,
+                                     limite: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Versão assíncrona de listar_intervalo.
+        
+        A consulta à camada de longo prazo ocorre na thread do escritor,
+        depois das gravações já enfileiradas, sem bloquear o event loop.
+        """
+        try:
+            inicio, fim, recentes = self._intervalo_curto_prazo(inicio, fim, limite)
+            if not self._total_longo_prazo or (inicio is not None and inicio > self._mais_recente_longo_prazo):
+                return recentes
+            antigas = await escritor.executar(
+                self._longo_prazo.intervalo, inicio, fim, limite if limite is not None else -1
+            )
+            memorias = list(heapq.merge(antigas, recentes, key=lambda m: m.get('timestamp', '')))
+            return memorias[:limite] if limite is not None else memorias
+        except Exception as e:
+            self.logger.error(f"Erro ao listar intervalo de memórias: {str(e)}")
+            return []
+    
+    def _intervalo_curto_prazo(self, inicio, fim, limite):
+        """Normaliza os limites (ISO) e recorta a camada de curto prazo por busca binária.
+        
+        Returns:
+            tuple: (inicio, fim, memórias de curto prazo do intervalo)
+        """
+        if isinstance(inicio, datetime):
+            inicio = inicio.isoformat()
+        if isinstance(fim, datetime):
+            fim = fim.isoformat()
+        
+        posicao_inicio = bisect_left(self._timestamps, inicio) if inicio is not None else 0
+        posicao_fim = bisect_right(self._timestamps, fim) if fim is not None else len(self._timestamps)
+        if limite is not None:
+            posicao_fim = min(posicao_fim, posicao_inicio + limite)
+        return inicio, fim, self.memorias[posicao_inicio:posicao_fim]
+
+    def iter_memorias(self, filtro=None, desde: Optional[Union[datetime, str]] = None,
+                      campos=None, camada: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Percorre as memórias sem materializar nem copiar a lista.
+        
+        A camada de longo prazo (mais antiga) é lida primeiro, em páginas do
+        SQLite; depois a de curto prazo, a partir da posição de `desde`
+        encontrada por busca binária. Os registros são entregues sem cópia:
+        não devem ser alterados pelo consumidor (use atualizar_memoria).
+        
+        Args:
+            filtro (callable | dict, optional): Função memoria -> bool ou
+                dicionário de campos e valores exigidos
+            desde (datetime | str, optional): Só memórias a partir desta data
+            campos (iterable, optional): Entrega apenas esses campos (projeção)
+            camada (str, optional): "curto_prazo", "longo_prazo" ou None para ambas
+            
+        Yields:
+            dict: Cada memória (ou projeção) que atende aos critérios
+        """
+        if isinstance(desde, datetime):
+            desde = desde.isoformat()
+        
+        fontes = []
+        if camada in (None, "longo_prazo") and self._total_longo_prazo and (
+                desde is None or desde <= self._mais_recente_longo_prazo):
+            fontes.append(self.longo_prazo.iterar(desde))
+        if camada in (None, "curto_prazo"):
+            inicio = bisect_left(self._timestamps, desde) if desde is not None else 0
+            fontes.append(islice(self.memorias, inicio, len(self.memorias)))
+        
+        for fonte in fontes:
+            for memoria in fonte:
+                if filtro is not None and not corresponde_filtro(memoria, filtro):
+                    continue
+                if campos is None:
+                    yield memoria
+                else:
+                    yield {campo: memoria[campo] for campo in campos if campo in memoria}
+
+    def mudancas_desde(self, seq: Optional[int]) -> Optional[List[Dict[str, Any]]]:
+        """Retorna as mudanças (inserções, atualizações e remoções) posteriores a seq.
+
+        Migrações entre as camadas não são mudanças: o registro não se altera.
+
+        Args:
+            seq (int): Última sequência já processada (None se nunca processou)
+
+        Returns:
+            list: Mudanças em ordem, cada uma com seq, operacao, id, memoria e
+                anterior; None se o consumidor precisar refazer a varredura
+        """
+        return self.mudancas.mudancas_desde(seq)
+
+    def assinar_mudancas(self, desde: Optional[int] = None):
+        """Assinatura assíncrona do feed de mudanças (ver FeedMudancas.assinar)."""
+        return self.mudancas.assinar(desde)
+
+    def filtrar(self, tipo: Optional[str] = None, origem: Optional[str] = None, emocao: Optional[str] = None,
+                tag: Optional[str] = None, tem_campo=None, camada: Optional[str] = None,
+                limite: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Retorna as memórias que atendem aos filtros sem varrer as camadas.
+
+        Os filtros são respondidos pelo índice secundário: listas de
+        ocorrência em RAM para a camada de curto prazo e a tabela
+        indice_secundario do SQLite para a de longo prazo. Como em
+        iter_memorias, a camada de longo prazo vem primeiro.
+
+        Args:
+            tipo (str, optional): Valor exigido de "tipo"
+            origem (str, optional): Valor exigido de "origem"
+            emocao (str, optional): Emoção exigida em contexto_emocional
+            tag (str, optional): Tag que a memória deve ter
+            tem_campo (str | iterable, optional): Campo(s) que a memória deve possuir
+            camada (str, optional): "curto_prazo", "longo_prazo" ou None para ambas
+            limite (int, optional): Máximo de memórias
+
+        Returns:
+            list: Memórias encontradas, em ordem cronológica dentro de cada camada
+        """
+        try:
+            resultado = []
+            if camada in (None, "longo_prazo") and self._total_longo_prazo:
+                resultado = self.longo_prazo.filtrar(tipo, origem, emocao, tag, tem_campo,
+                                                     limite=-1 if limite is None else limite)
+            if camada in (None, "curto_prazo") and (limite is None or len(resultado) < limite):
+                ids = self._indice_secundario.consultar(condicoes_filtro(tipo, origem, emocao, tag, tem_campo))
+                if ids is None:
+                    recentes = list(self.memorias)
+                else:
+                    recentes = sorted((self._por_id[i] for i in ids), key=lambda m: m.get('timestamp', ''))
+                resultado.extend(recentes)
+            return resultado[:limite] if limite is not None else resultado
+        except Exception as e:
+            self.logger.error(f"Erro ao filtrar memórias: {str(e)}")
+            return []
+
+    def contar(self, tipo: Optional[str] = None, origem: Optional[str] = None, emocao: Optional[str] = None,
+               tag: Optional[str] = None, tem_campo=None, camada: Optional[str] = None) -> int:
+        """Conta as memórias que atendem aos filtros (mesmos parâmetros de filtrar), só pelo índice."""
+        total = 0
+        if camada in (None, "longo_prazo") and self._total_longo_prazo:
+            total += self.longo_prazo.contar(tipo, origem, emocao, tag, tem_campo)
+        if camada in (None, "curto_prazo"):
+            ids = self._indice_secundario.consultar(condicoes_filtro(tipo, origem, emocao, tag, tem_campo))
+            total += len(self.memorias) if ids is None else len(ids)
+        return total
+
+    def valores_indexados(self, campo: str) -> Dict[str, int]:
+        """Retorna cada valor do campo indexado ("tipo", "origem", "emocao", "tag"
+        ou "campo") com seu número de memórias nas duas camadas."""
+        contagem = dict(self._indice_secundario.valores(campo))
+        if self._total_longo_prazo:
+            for valor, quantidade in self.longo_prazo.valores(campo).items():
+                contagem[valor] = contagem.get(valor, 0) + quantidade
+        return contagem
+
+    def amostrar_memorias(self, quantidade: int) -> List[Dict[str, Any]]:
+        """Retorna uma amostra aleatória da camada de curto prazo.
+        
+        O custo depende apenas do tamanho da camada em RAM, não do histórico
+        total; amostras do longo prazo vêm de buscar_memoria("longo_prazo", n).
+        """
+        try:
+            return random.sample(self.memorias, min(quantidade, len(self.memorias)))
+        except Exception as e:
+            self.logger.error(f"Erro ao amostrar memórias: {str(e)}")
+            return []
+
+    def acessos(self, memoria_id: Any) -> int:
+        """Retorna quantas vezes a memória foi acessada nesta execução."""
+        return self._acessos.get(memoria_id, 0)
+
+    def consolidar(self, ids: List[Any], conteudo: str, tipo: str = "resumo", prioridade: int = 1,
+                   dados_extras: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Substitui um grupo de memórias por uma única memória de resumo.
+        
+        O resumo recebe o timestamp da memória mais recente do grupo, para
+        manter a ordem cronológica, e é gravado antes das remoções.
+        
+        Args:
+            ids (list): Ids das memórias consolidadas
+            conteudo (str): Conteúdo do resumo
+            tipo (str): Tipo do resumo
+            prioridade (int): Prioridade do resumo
+            dados_extras (dict, optional): Campos adicionais do resumo
+            
+        Returns:
+            dict: A memória de resumo, ou None em caso de erro
+        """
+        try:
+            memorias = [m for m in (self._por_id.get(i) or self.longo_prazo.buscar_por_id(i) for i in ids) if m]
+            if not memorias:
+                return None
+            
+            resumo = {
+                **(dados_extras or {}),
+                'id': self._alocar_id(),
+                'conteudo': conteudo,
+                'tipo': tipo,
+                'prioridade': prioridade,
+                'timestamp': max(m.get('timestamp', '') for m in memorias)
+            }
+            self._inserir_ordenado(resumo)
+            self._persistir_memoria(resumo)
+            self.mudancas.registrar(INSERCAO, resumo['id'], resumo)
+            
+            for memoria in memorias:
+                self.remover_memoria(memoria['id'])
+            self._migrar_para_longo_prazo()
+            self.ultima_atualizacao = datetime.now()
+            return resumo
+        except Exception as e:
+            self.logger.error(f"Erro ao consolidar memórias: {str(e)}")
+            return None
+
+    def buscar_memoria(self, camada: str, limite: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Retorna as memórias de uma camada.
+        
+        Args:
+            camada (str): "curto_prazo" (RAM) ou "longo_prazo" (disco)
+            limite (int, optional): No longo prazo, retorna uma amostra aleatória
+                desse tamanho em vez de carregar a camada inteira
+            
+        Returns:
+            list: Memórias da camada (curto prazo das mais recentes para as mais antigas)
+        """
+        try:
+            if camada == "curto_prazo":
+                memorias = self.memorias[::-1]
+                return memorias[:limite] if limite is not None else memorias
+            if camada == "longo_prazo":
+                if limite is not None:
+                    return self.longo_prazo.amostrar(limite)
+                return list(self.longo_prazo.iterar())
+            raise ValueError(f"Camada de memória desconhecida: {camada}")
+        except Exception as e:
+            self.logger.error(f"Erro ao buscar memórias da camada {camada}: {str(e)}")
+            return []
+
+    def contar_memorias(self, camada: Optional[str] = None) -> int:
+        """Retorna o número de memórias armazenadas (em uma camada ou no total)."""
+        if camada == "curto_prazo":
+            return len(self.memorias)
+        if camada == "longo_prazo":
+            return self._total_longo_prazo
+        return len(self.memorias) + self._total_longo_prazo
+
     def status(self) -> Dict[str, Any]:
         """Retorna o status da memória."""
         return {
-            'total_memorias': len(self.memorias),
+            'total_memorias': self.contar_memorias(),
+            'camadas': {
+                'curto_prazo': len(self.memorias),
+                'longo_prazo': self._total_longo_prazo
+            },
             'ultima_atualizacao': self.ultima_atualizacao.isoformat(),
-            'tipos_memoria': list(set(m['tipo'] for m in self.memorias))
+            'tipos_memoria': list(self._indice_secundario.valores('tipo')),
+            'deduplicacao': {
+                'hashes_indexados': len(self._por_hash),
+                'duplicatas_evitadas': self._duplicatas_evitadas
+            }
         } 
\ No newline at end of file
@@ -0,0 +1,212 @@
+"""
+Módulo Cache de Embeddings - Cada texto distinto é codificado uma única vez.
+
+A similaridade semântica codificava os dois textos a cada comparação, de
+modo que o conteúdo de uma memória era recodificado milhares de vezes
+por ciclo. O CacheEmbeddings envolve o modelo sentence-transformers com
+a mesma interface encode(): os textos já vistos saem de um LRU em
+memória ou de uma matriz gravada em disco, e só os inéditos vão ao
+modelo, todos em um único lote.
+
+A chave de cada texto é o hash do nome do modelo com o texto
+normalizado (espaços colapsados); o texto normalizado é também o que o
+modelo recebe, então o cache nunca troca o resultado da codificação.
+
+Em disco ficam, no diretório do cache, a matriz de vetores (linhas de
+float16 ou float32 acrescentadas ao fim de vetores.bin) e as chaves, uma
+por linha em chaves.txt, na mesma ordem. Os dois arquivos só crescem; ao
+abrir, linhas incompletas de uma gravação interrompida são ignoradas.
+"""
+
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# NumPy é opcional: sem ele (e sem sentence-transformers) não há embeddings
+try:
+    import numpy as np
+    NUMPY_DISPONIVEL = True
+except ImportError:
+    NUMPY_DISPONIVEL = False
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+ARQUIVO_VETORES = "vetores.bin"
+ARQUIVO_CHAVES = "chaves.txt"
+ARQUIVO_META = "meta.txt"
+
+
+def normalizar_para_embedding(texto: str) -> str:
+    """Colapsa espaços em branco (o texto normalizado é o que o modelo codifica)."""
+    return " ".join(texto.split())
+
+
+def chave_embedding(nome_modelo: str, texto_normalizado: str) -> str:
+    """Hash do nome do modelo com o texto normalizado, chave do cache."""
+    return hashlib.blake2b(f"{nome_modelo}\0{texto_normalizado}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+class CacheEmbeddings:
+    """Modelo de embeddings com cache LRU em memória e matriz persistida em disco."""
+
+    def __init__(self, modelo, nome_modelo: str, diretorio: Optional[str] = None,
+                 capacidade: int = 10000, precisao: str = "float16"):
+        """
+        Envolve o modelo, carregando o índice do cache em disco se existir.
+
+        Args:
+            modelo: Modelo com encode(lista de textos) -> matriz (sentence-transformers)
+            nome_modelo (str): Nome do modelo, parte da chave de cada texto
+            diretorio (str, optional): Diretório do cache em disco (None para só em memória)
+            capacidade (int): Número de vetores mantidos no LRU em memória
+            precisao (str): "float16" (metade do espaço) ou "float32" para a matriz em disco
+        """
+        if not NUMPY_DISPONIVEL:
+            raise RuntimeError("NumPy não disponível: cache de embeddings desabilitado")
+        if precisao not in ("float16", "float32"):
+            raise ValueError(f"Precisão do cache de embeddings inválida: {precisao}")
+
+        self.modelo = modelo
+        self.nome_modelo = nome_modelo
+        self.diretorio = diretorio
+        self.capacidade = capacidade
+        self.precisao = np.dtype(precisao)
+        self._lru: "OrderedDict[str, Any]" = OrderedDict()
+        self._linhas: Dict[str, int] = {}
+        self._dimensao: Optional[int] = None
+        self._matriz = None
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.codificados = 0
+
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+            self._carregar_indice()
+
+    def __getattr__(self, nome):
+        # Demais atributos (save, get_sentence_embedding_dimension...) vêm do modelo
+        if nome == "modelo":
+            raise AttributeError(nome)
+        return getattr(self.modelo, nome)
+
+    def _caminho(self, arquivo: str) -> str:
+        return os.path.join(self.diretorio, arquivo)
+
+    def _carregar_indice(self):
+        """Lê as chaves gravadas; um cache de outra precisão ou modelo é descartado."""
+        caminho_meta = self._caminho(ARQUIVO_META)
+        if os.path.exists(caminho_meta):
+            with open(caminho_meta, encoding="utf-8") as arquivo:
+                linhas = arquivo.read().split("\n")
+            if linhas[:2] == [self.nome_modelo, self.precisao.name] and len(linhas) > 2 and linhas[2].isdigit():
+                self._dimensao = int(linhas[2])
+        if self._dimensao is None:
+            for arquivo in (ARQUIVO_VETORES, ARQUIVO_CHAVES, ARQUIVO_META):
+                if os.path.exists(self._caminho(arquivo)):
+                    logger.info("Cache de embeddings de outro modelo ou precisão descartado")
+                    os.remove(self._caminho(arquivo))
+            return
+
+        caminho_chaves = self._caminho(ARQUIVO_CHAVES)
+        caminho_vetores = self._caminho(ARQUIVO_VETORES)
+        chaves = []
+        if os.path.exists(caminho_chaves):
+            with open(caminho_chaves, encoding="utf-8") as arquivo:
+                chaves = [linha.rstrip("\n") for linha in arquivo if linha.endswith("\n")]
+        tamanho_linha = self._dimensao * self.precisao.itemsize
+        tamanho_vetores = os.path.getsize(caminho_vetores) if os.path.exists(caminho_vetores) else 0
+        total = min(len(chaves), tamanho_vetores // tamanho_linha)
+
+        # Descarta o que sobrou de uma gravação interrompida
+        if len(chaves) != total or tamanho_vetores != total * tamanho_linha:
+            with open(caminho_chaves, "w", encoding="utf-8") as arquivo:
+                arquivo.writelines(f"{chave}\n" for chave in chaves[:total])
+            with open(caminho_vetores, "ab") as arquivo:
+                arquivo.truncate(total * tamanho_linha)
+
+        self._linhas = {chave: linha for linha, chave in enumerate(chaves[:total])}
+
+    def _ler_disco(self, chaves: List[str]) -> Dict[str, Any]:
+        """Lê da matriz em disco os vetores das chaves gravadas."""
+        linhas = {chave: self._linhas[chave] for chave in chaves if chave in self._linhas}
+        if not linhas:
+            return {}
+        # O mapeamento é reaberto só quando a matriz cresceu desde a última leitura
+        if self._matriz is None or self._matriz.shape[0] < len(self._linhas):
+            self._matriz = np.memmap(self._caminho(ARQUIVO_VETORES), dtype=self.precisao, mode="r",
+                                     shape=(len(self._linhas), self._dimensao))
+        return {chave: np.asarray(self._matriz[linha], dtype=np.float32) for chave, linha in linhas.items()}
+
+    def _gravar_disco(self, chaves: List[str], vetores):
+        """Acrescenta vetores novos ao fim da matriz e suas chaves ao índice."""
+        if self._dimensao is None:
+            self._dimensao = vetores.shape[1]
+            with open(self._caminho(ARQUIVO_META), "w", encoding="utf-8") as arquivo:
+                arquivo.write(f"{self.nome_modelo}\n{self.precisao.name}\n{self._dimensao}")
+        if vetores.shape[1] != self._dimensao:
+            return
+        # Vetores antes das chaves: uma chave nunca aponta para uma linha ausente
+        with open(self._caminho(ARQUIVO_VETORES), "ab") as arquivo:
+            arquivo.write(np.ascontiguousarray(vetores, dtype=self.precisao).tobytes())
+        with open(self._caminho(ARQUIVO_CHAVES), "a", encoding="utf-8") as arquivo:
+            arquivo.writelines(f"{chave}\n" for chave in chaves)
+        for chave in chaves:
+            self._linhas[chave] = len(self._linhas)
+
+    def _lembrar(self, chave: str, vetor):
+        self._lru[chave] = vetor
+        self._lru.move_to_end(chave)
+        while len(self._lru) > self.capacidade:
+            self._lru.popitem(last=False)
+
+    def encode(self, textos, **kwargs):
+        """Codifica os textos, indo ao modelo só com os que não estão no cache.
+
+        Args:
+            textos (str | list): Um texto ou uma lista de textos
+            **kwargs: Repassados ao encode do modelo
+
+        Returns:
+            Vetor (um texto) ou matriz float32 com um embedding por texto, na ordem recebida
+        """
+        unico = isinstance(textos, str)
+        normalizados = [normalizar_para_embedding(t) for t in ([textos] if unico else textos)]
+        chaves = [chave_embedding(self.nome_modelo, texto) for texto in normalizados]
+
+        with self._trava:
+            encontrados = {}
+            for chave in chaves:
+                if chave in self._lru:
+                    self._lru.move_to_end(chave)
+                    encontrados[chave] = self._lru[chave]
+            if self.diretorio:
+                do_disco = self._ler_disco([c for c in chaves if c not in encontrados])
+                for chave, vetor in do_disco.items():
+                    self._lembrar(chave, vetor)
+                encontrados.update(do_disco)
+            self.acertos += sum(1 for chave in chaves if chave in encontrados)
+
+            # Textos inéditos (sem repetição) vão ao modelo em um único lote
+            faltantes = {}
+            for chave, texto in zip(chaves, normalizados):
+                if chave not in encontrados:
+                    faltantes.setdefault(chave, texto)
+            if faltantes:
+                novos = np.asarray(self.modelo.encode(list(faltantes.values()), **kwargs), dtype=np.float32)
+                # Arredonda para a precisão do disco: o vetor é o mesmo venha de onde vier
+                novos = novos.reshape(len(faltantes), -1).astype(self.precisao).astype(np.float32)
+                self.codificados += len(faltantes)
+                for chave, vetor in zip(faltantes, novos):
+                    encontrados[chave] = vetor
+                    self._lembrar(chave, vetor)
+                if self.diretorio:
+                    self._gravar_disco(list(faltantes), novos)
+
+        if not chaves:
+            return np.zeros((0, self._dimensao or 0), dtype=np.float32)
+        matriz = np.stack([encontrados[chave] for chave in chaves])
+        return matriz[0] if unico else matriz
@@ -0,0 +1,239 @@
+"""
+Módulo Índice Vetorial - Busca dos vizinhos mais próximos por embeddings.
+
+A busca semântica comparava a consulta com cada memória, recodificando
+os dois textos a cada comparação. O índice vetorial guarda o embedding
+normalizado de cada memória numa matriz NumPy contígua; a consulta é
+codificada uma única vez e as similaridades de cosseno com todas as
+memórias saem de uma só multiplicação matriz-vetor (busca exata por
+força bruta, dezenas de milissegundos para 100 mil memórias de 512
+dimensões em CPU). Os k melhores são separados com argpartition, sem
+ordenar o resto.
+
+O índice é persistido em um arquivo .npz com o nome do modelo que
+gerou os vetores e o hash do conteúdo de cada memória, para que, ao
+reabrir, só as memórias novas ou alteradas precisem ser codificadas.
+A gravação do arquivo ocorre na thread do escritor (salvar_em_segundo_plano),
+e pedidos feitos enquanto uma gravação aguarda na fila viram uma só.
+"""
+
+import os
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from core.armazenamento.escritor import escritor
+
+# NumPy é opcional: sem ele (e sem sentence-transformers) não há embeddings
+try:
+    import numpy as np
+    NUMPY_DISPONIVEL = True
+except ImportError:
+    NUMPY_DISPONIVEL = False
+
+# Configuração de logging
+logger = logging.getLogger(__name__)
+
+# Linhas reservadas na primeira alocação da matriz (cresce dobrando)
+CAPACIDADE_INICIAL = 1024
+
+
+class IndiceVetorial:
+    """Matriz de embeddings normalizados com busca exata dos k mais similares."""
+
+    def __init__(self, caminho: Optional[str] = None, modelo: Optional[str] = None):
+        """
+        Cria o índice, carregando o arquivo se existir e for do mesmo modelo.
+
+        Args:
+            caminho (str, optional): Arquivo .npz do índice (None para só em memória)
+            modelo (str, optional): Nome do modelo de embeddings; vetores de outro
+                modelo gravados no arquivo são descartados
+        """
+        if not NUMPY_DISPONIVEL:
+            raise RuntimeError("NumPy não disponível: índice vetorial desabilitado")
+
+        self.caminho = caminho
+        self.modelo = modelo
+        self._vetores = None
+        self._ids: List[Any] = []
+        self._hashes: List[str] = []
+        self._posicoes: Dict[Any, int] = {}
+        self.alterado = False
+        # Protege a matriz entre as alterações (event loop) e a cópia gravada (escritor)
+        self._trava = threading.Lock()
+        self._gravacao = None
+
+        if caminho and os.path.exists(caminho):
+            self._carregar()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, memoria_id) -> bool:
+        return memoria_id in self._posicoes
+
+    def _carregar(self):
+        """Lê o arquivo do índice; em caso de erro ou modelo diferente, começa vazio."""
+        try:
+            with np.load(self.caminho, allow_pickle=False) as arquivo:
+                modelo = str(arquivo["modelo"])
+                if self.modelo is not None and modelo != self.modelo:
+                    logger.info(f"Índice vetorial de outro modelo ({modelo}) descartado")
+                    return
+                vetores = arquivo["vetores"].astype(np.float32)
+                ids = arquivo["ids"].tolist()
+                hashes = arquivo["hashes"].tolist()
+        except Exception as e:
+            logger.error(f"Erro ao carregar índice vetorial: {e}")
+            return
+
+        self._vetores = vetores
+        self._ids = ids
+        self._hashes = hashes
+        self._posicoes = {memoria_id: posicao for posicao, memoria_id in enumerate(ids)}
+
+    def salvar(self):
+        """Grava o índice no arquivo (substituição atômica), se houver alterações."""
+        if not self.caminho:
+            return
+        with self._trava:
+            if not self.alterado:
+                return
+            total = len(self._ids)
+            vetores = (self._vetores[:total].copy() if self._vetores is not None
+                       else np.zeros((0, 0), dtype=np.float32))
+            ids, hashes = list(self._ids), list(self._hashes)
+            self.alterado = False
+        try:
+            temporario = self.caminho + ".tmp.npz"
+            np.savez(
+                temporario,
+                modelo=np.array(self.modelo or ""),
+                vetores=vetores,
+                ids=np.array(ids, dtype=np.int64),
+                hashes=np.array(hashes, dtype=str)
+            )
+            os.replace(temporario, self.caminho)
+        except Exception:
+            with self._trava:
+                self.alterado = True
+            raise
+
+    def salvar_em_segundo_plano(self):
+        """Agenda salvar() na thread do escritor, sem bloquear o event loop.
+
+        Se já houver uma gravação na fila, ela gravará também estas
+        alterações: o arquivo é regravado no máximo uma vez por vez que o
+        escritor chega a ele.
+        """
+        if not self.caminho or not self.alterado:
+            return
+        with self._trava:
+            if self._gravacao is None:
+                self._gravacao = escritor.submeter(self._gravar_pendente)
+
+    def _gravar_pendente(self):
+        """Executado na thread do escritor: grava o estado mais recente do índice."""
+        with self._trava:
+            self._gravacao = None
+        try:
+            self.salvar()
+        except Exception as e:
+            logger.error(f"Erro ao salvar índice vetorial: {e}")
+
+    def hash(self, memoria_id) -> Optional[str]:
+        """Retorna o hash do conteúdo indexado para a memória (None se não indexada)."""
+        posicao = self._posicoes.get(memoria_id)
+        return self._hashes[posicao] if posicao is not None else None
+
+    def ids(self) -> List[Any]:
+        """Retorna os ids indexados."""
+        return list(self._ids)
+
+    def adicionar(self, itens: Iterable[Tuple[Any, str]], vetores):
+        """Indexa (ou substitui) memórias com seus embeddings.
+
+        Args:
+            itens (iterable): Pares (id da memória, hash do conteúdo), na ordem dos vetores
+            vetores: Matriz (n, dimensão) com um embedding por item
+        """
+        itens = list(itens)
+        if not itens:
+            return
+        vetores = np.asarray(vetores, dtype=np.float32).reshape(len(itens), -1)
+        normas = np.linalg.norm(vetores, axis=1, keepdims=True)
+        vetores = vetores / np.where(normas == 0, 1, normas)
+        with self._trava:
+            if self._vetores is None or self._vetores.shape[1] != vetores.shape[1]:
+                # Primeiro uso (ou dimensão nova): recomeça com a dimensão destes vetores
+                self._vetores = np.zeros((max(CAPACIDADE_INICIAL, len(itens)), vetores.shape[1]), dtype=np.float32)
+                self._ids, self._hashes, self._posicoes = [], [], {}
+
+            for (memoria_id, hash_memoria), vetor in zip(itens, vetores):
+                posicao = self._posicoes.get(memoria_id)
+                if posicao is None:
+                    posicao = len(self._ids)
+                    if posicao >= self._vetores.shape[0]:
+                        capacidade = max(CAPACIDADE_INICIAL, posicao * 2)
+                        maior = np.zeros((capacidade, self._vetores.shape[1]), dtype=np.float32)
+                        maior[:posicao] = self._vetores[:posicao]
+                        self._vetores = maior
+                    self._posicoes[memoria_id] = posicao
+                    self._ids.append(memoria_id)
+                    self._hashes.append(hash_memoria)
+                else:
+                    self._hashes[posicao] = hash_memoria
+                self._vetores[posicao] = vetor
+            self.alterado = True
+
+    def remover(self, memoria_id):
+        """Retira uma memória do índice, movendo a última linha para o seu lugar."""
+        with self._trava:
+            posicao = self._posicoes.pop(memoria_id, None)
+            if posicao is None:
+                return
+            ultima = len(self._ids) - 1
+            if posicao != ultima:
+                self._vetores[posicao] = self._vetores[ultima]
+                self._ids[posicao] = self._ids[ultima]
+                self._hashes[posicao] = self._hashes[ultima]
+                self._posicoes[self._ids[posicao]] = posicao
+            self._ids.pop()
+            self._hashes.pop()
+            self.alterado = True
+
+    def buscar(self, vetor_consulta, k: int = 5, limiar: Optional[float] = None) -> List[Tuple[Any, float]]:
+        """Retorna as k memórias de maior similaridade de cosseno com a consulta.
+
+        Args:
+            vetor_consulta: Embedding da consulta
+            k (int): Número máximo de resultados
+            limiar (float, optional): Similaridade mínima (exclusiva) para entrar no resultado
+
+        Returns:
+            list: Pares (id, similaridade), da mais similar para a menos
+        """
+        total = len(self._ids)
+        if not total or k <= 0:
+            return []
+        consulta = np.asarray(vetor_consulta, dtype=np.float32).ravel()
+        if consulta.shape[0] != self._vetores.shape[1]:
+            return []
+        norma = np.linalg.norm(consulta)
+        if norma == 0:
+            return []
+
+        similaridades = self._vetores[:total] @ (consulta / norma)
+        if k < total:
+            melhores = np.argpartition(-similaridades, k - 1)[:k]
+        else:
+            melhores = np.arange(total)
+        melhores = melhores[np.argsort(-similaridades[melhores], kind="stable")]
+
+        resultado = []
+        for posicao in melhores:
+            similaridade = float(similaridades[posicao])
+            if limiar is not None and similaridade <= limiar:
+                break
+            resultado.append((self._ids[posicao], similaridade))
+        return resultado
@@ -18,9 +18,11 @@ import asyncio
 from datetime import datetime
 from collections import Counter
 from pathlib import Path
+from core.nlp.cache_embeddings import CacheEmbeddings
 
 # Importações condicionais para evitar erros se as bibliotecas não estiverem instaladas
 try:
+    import numpy as np
     import spacy
     import nltk
     from nltk.corpus import stopwords
@@ -36,20 +38,34 @@ except ImportError:
 # Configuração de logging
 logger = logging.getLogger(__name__)
 
+def _normalizar_linhas(vetores):
+    """Divide cada linha pela sua norma (linhas nulas ficam nulas)."""
+    normas = np.linalg.norm(vetores, axis=1, keepdims=True)
+    return vetores / np.where(normas == 0, 1, normas)
+
 class AnalisadorSemantico:
     """Classe principal para análise semântica avançada."""
     
-    def __init__(self, caminho_modelo="pt_core_news_md", modelos_path="data/nlp_models"):
+    def __init__(self, caminho_modelo="pt_core_news_md", modelos_path="data/nlp_models",
+                 nome_modelo_embeddings="distiluse-base-multilingual-cased-v1",
+                 capacidade_cache_embeddings=10000, precisao_cache_embeddings="float16"):
         """
         Inicializa o analisador semântico.
         
         Args:
             caminho_modelo (str): Modelo spaCy a ser utilizado
             modelos_path (str): Caminho para armazenar modelos baixados
+            nome_modelo_embeddings (str): Modelo sentence-transformers dos embeddings
+                (também identifica os vetores guardados em índices)
+            capacidade_cache_embeddings (int): Embeddings mantidos no LRU em memória
+            precisao_cache_embeddings (str): "float16" ou "float32" na matriz do cache em disco
         """
         self.inicializado = False
         self.modelos_path = Path(modelos_path)
         self.caminho_modelo = caminho_modelo
+        self.nome_modelo_embeddings = nome_modelo_embeddings
+        self.capacidade_cache_embeddings = capacidade_cache_embeddings
+        self.precisao_cache_embeddings = precisao_cache_embeddings
         
         # Estes atributos serão inicializados posteriormente
         self.nlp = None
@@ -101,11 +117,19 @@ class AnalisadorSemantico:
                 logger.info("Modelo de embeddings carregado do cache local.")
             else:
                 logger.info("Inicializando modelo de embeddings...")
-                self.modelo_embeddings = SentenceTransformer('distiluse-base-multilingual-cased-v1')
+                self.modelo_embeddings = SentenceTransformer(self.nome_modelo_embeddings)
                 # Salva o modelo para uso futuro
                 os.makedirs(modelo_embeddings_path, exist_ok=True)
                 self.modelo_embeddings.save(str(modelo_embeddings_path))
             
+            # Cada texto distinto é codificado uma única vez (LRU + matriz em disco)
+            self.modelo_embeddings = CacheEmbeddings(
+                self.modelo_embeddings, self.nome_modelo_embeddings,
+                str(self.modelos_path / "cache_embeddings"),
+                capacidade=self.capacidade_cache_embeddings,
+                precisao=self.precisao_cache_embeddings
+            )
+            
             # Inicializa o vetorizador TF-IDF
             self.vetorizador = TfidfVectorizer(
                 min_df=2, max_df=0.95, 
@@ -146,12 +170,10 @@ class AnalisadorSemantico:
         
         try:
             if metodo == "embeddings":
-                # Uso de embeddings semânticos (mais preciso)
-                embedding1 = self.modelo_embeddings.encode([texto1])[0]
-                embedding2 = self.modelo_embeddings.encode([texto2])[0]
+                # Uso de embeddings semânticos (mais preciso), os dois textos em um lote
+                embeddings = _normalizar_linhas(await self.encode_lote([texto1, texto2]))
                 # Calcula similaridade de cosseno
-                similarity = cosine_similarity([embedding1], [embedding2])[0][0]
-                return float(similarity)
+                return float(embeddings[0] @ embeddings[1])
             
             elif metodo == "tfidf":
                 # Vetorização TF-IDF
@@ -178,6 +200,63 @@ class AnalisadorSemantico:
             from core.utils import calcular_similaridade_texto
             return calcular_similaridade_texto(texto1, texto2)
     
+    async def encode_lote(self, textos):
+        """
+        Calcula os embeddings de vários textos com uma única chamada ao modelo.
+        
+        Args:
+            textos (list): Textos a codificar
+            
+        Returns:
+            numpy.ndarray: Matriz (len(textos), dimensão) de float32, ou None se
+                os recursos de NLP não estiverem disponíveis
+        """
+        if not self.inicializado:
+            await self.inicializar_recursos()
+            if not self.inicializado:
+                return None
+        
+        textos = list(textos)
+        if not textos:
+            return np.zeros((0, 0), dtype=np.float32)
+        embeddings = np.asarray(self.modelo_embeddings.encode(textos), dtype=np.float32)
+        return embeddings.reshape(len(textos), -1)
+    
+    async def similaridades(self, consulta, textos):
+        """
+        Calcula a similaridade de cosseno da consulta com cada texto de uma vez.
+        
+        Os textos (e a consulta) vão ao modelo em um único lote e as
+        similaridades saem de uma só multiplicação matriz-vetor, em vez de
+        uma chamada a calcular_similaridade_semantica por par.
+        
+        Args:
+            consulta (str): Texto de referência
+            textos (list): Textos a comparar com a consulta
+            
+        Returns:
+            list: Uma similaridade por texto, na ordem recebida (0.0 para textos vazios)
+        """
+        textos = list(textos)
+        if not textos:
+            return []
+        if not self.inicializado:
+            await self.inicializar_recursos()
+        if not self.inicializado or not consulta:
+            # Fallback para método simples se NLP não estiver disponível
+            from core.utils import calcular_similaridade_texto
+            return [float(calcular_similaridade_texto(consulta, texto)) for texto in textos]
+        
+        try:
+            embeddings = _normalizar_linhas(await self.encode_lote([consulta] + textos))
+            resultado = (embeddings[1:] @ embeddings[0]).tolist()
+            return [similaridade if texto else 0.0 for similaridade, texto in zip(resultado, textos)]
+        except Exception as e:
+            logger.error(f"Erro ao calcular similaridades semânticas: {e}")
+            # Fallback para método simples em caso de erro
+            from core.utils import calcular_similaridade_texto
+            return [float(calcular_similaridade_texto(consulta, texto)) for texto in textos]
+    
     async def extrair_entidades(self, texto):
         """
         Extrai entidades relevantes de um texto.
@@ -317,7 +396,7 @@ class AnalisadorSemantico:
                 todas_sentencas.extend(sentencas)
             
             # Calcula embeddings para todas as sentenças
-            embeddings = self.modelo_embeddings.encode(todas_sentencas)
+            embeddings = await self.encode_lote(todas_sentencas)
             
             # Agrupa sentencas semelhantes
             grupos = self._agrupar_sentencas(todas_sentencas, embeddings)
@@ -355,20 +434,22 @@ class AnalisadorSemantico:
         grupos = []
         sentencas_processadas = set()
         
-        for i, (sentenca, embedding) in enumerate(zip(sentencas, embeddings)):
+        # Similaridades de todos os pares de uma vez
+        embeddings = _normalizar_linhas(np.asarray(embeddings, dtype=np.float32))
+        similaridades = embeddings @ embeddings.T
+        
+        for i, sentenca in enumerate(sentencas):
             if i in sentencas_processadas:
                 continue
                 
             grupo_atual = [sentenca]
             sentencas_processadas.add(i)
             
-            for j, outro_embedding in enumerate(embeddings):
+            for j in np.flatnonzero(similaridades[i] > limiar):
+                j = int(j)
                 if j != i and j not in sentencas_processadas:
-                    # Calcula similaridade
-                    sim = cosine_similarity([embedding], [outro_embedding])[0][0]
-                    if sim > limiar:
-                        grupo_atual.append(sentencas[j])
-                        sentencas_processadas.add(j)
+                    grupo_atual.append(sentencas[j])
+                    sentencas_processadas.add(j)
             
             grupos.append(grupo_atual)
         
@@ -5,6 +5,7 @@ Módulo Persona - Implementa a personalidade e processamento cognitivo do sistem
 import logging
 from typing import Dict, Any
 from datetime import datetime
+from core.config import MEMORIA_CONFIG
 
 class Persona:
     def __init__(self, memoria):
@@ -70,8 +71,11 @@ class Persona:
     def obter_conhecimento_relevante(self, contexto: str) -> Dict[str, Any]:
         """Obtém conhecimento relevante para um dado contexto."""
         try:
-            # Busca memórias relacionadas ao contexto
-            memorias_relacionadas = self.memoria.buscar_memorias(contexto)
+            # Busca as memórias mais relevantes ao contexto na camada em RAM
+            memorias_relacionadas = self.memoria.buscar_memorias(
+                contexto, camada="curto_prazo", ranking="bm25",
+                limite=MEMORIA_CONFIG["limite_conhecimento_relevante"]
+            )
             
             # Analisa o contexto das memórias
             contexto_analisado = self._analisar_contexto(memorias_relacionadas)
@@ -206,18 +210,20 @@ class Persona:
             self.logger.error(f"Erro ao tirar conclusões: {str(e)}")
             return []
 
-    def buscar_memorias(self, termo: str) -> list:
-        """Busca memórias que contêm o termo especificado.
+    def buscar_memorias(self, termo: str, operador: str = None, ranking: str = None, limite: int = None) -> list:
+        """Busca memórias que contêm o trecho ou as palavras do termo.
         
         Args:
-            termo: Termo a ser buscado nas memórias
+            termo: Trecho, ou uma ou mais palavras, a buscar nas memórias
+            operador: None (trecho), "e" (todas as palavras) ou "ou" (qualquer uma)
+            ranking: None (mais recentes primeiro) ou "bm25" (mais relevantes primeiro)
+            limite: Número máximo de memórias
             
         Returns:
-            Lista de memórias que contêm o termo
+            Lista de memórias encontradas
         """
         try:
-            todas_memorias = self.memoria.listar_todas_memorias()
-            return [m for m in todas_memorias if termo.lower() in m.get('conteudo', '').lower()]
+            return self.memoria.buscar_memorias(termo, operador=operador, ranking=ranking, limite=limite)
         except Exception as e:
             self.logger.error(f"Erro ao buscar memórias: {str(e)}")
             return []
@@ -232,7 +238,101 @@ class Persona:
             Lista de memórias
         """
         try:
-            return self.memoria.listar_todas_memorias()[:n] if n > 0 else self.memoria.listar_todas_memorias()
+            return self.memoria.listar_memorias(n) if n > 0 else self.memoria.listar_todas_memorias()
         except Exception as e:
             self.logger.error(f"Erro ao listar memórias: {str(e)}")
-            return [] 
\ No newline at end of file
+            return []
+
+    async def armazenar_memoria_async(self, memoria: Dict[str, Any]) -> bool:
+        """Armazena uma memória já montada (ex.: sínteses do aprendizado).
+        
+        A gravação em disco já é feita em segundo plano pela memória (janela
+        de escrita e thread do escritor), então a chamada não bloqueia o loop.
+        
+        Args:
+            memoria: A memória, com "conteudo" e campos adicionais
+            
+        Returns:
+            True se a memória foi armazenada
+        """
+        try:
+            extras = {campo: valor for campo, valor in memoria.items()
+                      if campo not in ('id', 'conteudo', 'tipo', 'prioridade')}
+            return self.memoria.adicionar_memoria(
+                memoria['conteudo'],
+                tipo=memoria.get('tipo', 'geral'),
+                prioridade=memoria.get('prioridade', 1),
+                dados_extras=extras
+            ) is not None
+        except Exception as e:
+            self.logger.error(f"Erro ao armazenar memória: {str(e)}")
+            return False
+
+    async def adicionar_memorias_async(self, memorias, progresso=None) -> Dict[str, int]:
+        """Importa um grande volume de memórias sem bloquear o event loop.
+
+        Args:
+            memorias: Textos ou dicionários com "conteudo"
+            progresso: Função chamada com o número de itens processados
+
+        Returns:
+            Contagem de memórias inseridas, duplicadas e inválidas
+        """
+        return await self.memoria.adicionar_memorias_async(memorias, progresso=progresso)
+
+    def iter_memorias(self, filtro=None, desde=None, campos=None):
+        """Percorre as memórias sem carregar o conjunto inteiro.
+        
+        Args:
+            filtro: Função memoria -> bool ou dicionário de campos exigidos
+            desde: Só memórias a partir desta data (datetime ou ISO)
+            campos: Campos a entregar (projeção); None para o registro inteiro
+            
+        Returns:
+            Iterador de memórias
+        """
+        return self.memoria.iter_memorias(filtro=filtro, desde=desde, campos=campos)
+
+    @property
+    def mudancas(self):
+        """Feed de mudanças da memória (sequência, checkpoints e assinatura)."""
+        return self.memoria.mudancas
+
+    def mudancas_desde(self, seq) -> list:
+        """Retorna as mudanças de memória posteriores à sequência informada.
+        
+        Args:
+            seq: Última sequência já processada (None se nunca processou)
+            
+        Returns:
+            Lista de mudanças, ou None se for preciso refazer a varredura completa
+        """
+        return self.memoria.mudancas_desde(seq)
+
+    def filtrar_memorias(self, tipo=None, origem=None, emocao=None, tag=None, tem_campo=None, limite=None) -> list:
+        """Retorna as memórias que atendem aos filtros, pelo índice secundário.
+        
+        Args:
+            tipo: Valor exigido de "tipo"
+            origem: Valor exigido de "origem" (ex.: "sintese_interna")
+            emocao: Emoção exigida em contexto_emocional
+            tag: Tag que a memória deve ter
+            tem_campo: Campo(s) que a memória deve possuir (ex.: "avaliacao")
+            limite: Máximo de memórias
+            
+        Returns:
+            Lista de memórias
+        """
+        return self.memoria.filtrar(tipo=tipo, origem=origem, emocao=emocao, tag=tag,
+                                    tem_campo=tem_campo, limite=limite)
+
+    def contar_memorias(self, tipo=None, origem=None, emocao=None, tag=None, tem_campo=None) -> int:
+        """Conta as memórias que atendem aos filtros sem lê-las.
+        
+        Args:
+            tipo, origem, emocao, tag, tem_campo: Mesmos filtros de filtrar_memorias
+            
+        Returns:
+            Número de memórias
+        """
+        return self.memoria.contar(tipo=tipo, origem=origem, emocao=emocao, tag=tag, tem_campo=tem_campo)
@@ -4,10 +4,33 @@ Utilitários para o Sistema de Memória Contínua.
 Este módulo contém funções auxiliares usadas pelos módulos Persona e Alma.
 """
 
+import hashlib
+import json
 import re
 import time
 import random
 from datetime import datetime
+from itertools import islice
+
+# Palavras muito comuns, ignoradas na comparação de textos (stopwords simples)
+STOPWORDS = {'a', 'e', 'o', 'as', 'os', 'um', 'uma', 'uns', 'umas', 'de', 'da', 'do',
+             'das', 'dos', 'em', 'no', 'na', 'nos', 'nas', 'para', 'por', 'que', 'com'}
+
+def palavras_comparaveis(texto):
+    """Retorna o conjunto de palavras normalizadas do texto, sem stopwords.
+    
+    É o conjunto comparado por calcular_similaridade_texto (e indexado
+    para encontrar textos parecidos sem comparar com todos).
+    
+    Args:
+        texto (str): O texto
+        
+    Returns:
+        set: Palavras do texto
+    """
+    if not texto:
+        return set()
+    return set(normalizar_texto(texto).split()) - STOPWORDS
 
 def calcular_similaridade_texto(texto1, texto2):
     """Calcula a similaridade entre dois textos baseado em palavras compartilhadas.
@@ -22,16 +45,8 @@ def calcular_similaridade_texto(texto1, texto2):
     if not texto1 or not texto2:
         return 0
     
-    # Normaliza e divide em palavras
-    palavras1 = set(normalizar_texto(texto1).split())
-    palavras2 = set(normalizar_texto(texto2).split())
-    
-    # Remove palavras muito comuns (stopwords simples)
-    stopwords = {'a', 'e', 'o', 'as', 'os', 'um', 'uma', 'uns', 'umas', 'de', 'da', 'do', 
-                'das', 'dos', 'em', 'no', 'na', 'nos', 'nas', 'para', 'por', 'que', 'com'}
-    
-    palavras1 = palavras1 - stopwords
-    palavras2 = palavras2 - stopwords
+    palavras1 = palavras_comparaveis(texto1)
+    palavras2 = palavras_comparaveis(texto2)
     
     # Calcula similaridade por interseção/união (coeficiente de Jaccard)
     if not palavras1 or not palavras2:
@@ -65,6 +80,17 @@ def normalizar_texto(texto):
     
     return texto
 
+def hash_conteudo(texto):
+    """Gera o hash do conteúdo normalizado, usado para detectar duplicatas exatas.
+    
+    Args:
+        texto (str): Texto da memória
+        
+    Returns:
+        str: Hash hexadecimal (128 bits) do texto normalizado
+    """
+    return hashlib.blake2b(normalizar_texto(texto).encode('utf-8'), digest_size=16).hexdigest()
+
 def gerar_timestamp():
     """Gera um timestamp formatado.
     
@@ -106,6 +132,87 @@ def escolher_aleatoriamente(lista, n=1):
     n = min(n, len(lista))
     return random.sample(lista, n)
 
+def amostrar_fluxo(iteravel, n=1):
+    """Escolhe n elementos aleatórios de um iterável sem materializá-lo.
+    
+    Usa amostragem por reservatório: a memória usada é O(n),
+    independentemente do tamanho do iterável.
+    
+    Args:
+        iteravel: Qualquer iterável (ex.: um gerador de memórias)
+        n (int): Número de elementos a escolher
+        
+    Returns:
+        list: Lista com até n elementos escolhidos
+    """
+    amostra = []
+    if n <= 0:
+        return amostra
+    
+    for posicao, elemento in enumerate(iteravel):
+        if posicao < n:
+            amostra.append(elemento)
+        else:
+            sorteado = random.randint(0, posicao)
+            if sorteado < n:
+                amostra[sorteado] = elemento
+    return amostra
+
+def corresponde_filtro(memoria, filtro):
+    """Verifica se uma memória atende a um filtro.
+    
+    Args:
+        memoria (dict): A memória avaliada
+        filtro: Função que recebe a memória e retorna bool, ou dicionário
+            de campos e valores que devem ser iguais
+        
+    Returns:
+        bool: True se a memória atende ao filtro (ou se não há filtro)
+    """
+    if filtro is None:
+        return True
+    if callable(filtro):
+        return bool(filtro(memoria))
+    return all(memoria.get(campo) == valor for campo, valor in filtro.items())
+
+def em_lotes(iteravel, tamanho):
+    """Agrupa os elementos de um iterável em listas de tamanho fixo.
+    
+    Args:
+        iteravel: Qualquer iterável (consumido de forma preguiçosa)
+        tamanho (int): Número de elementos por lote
+        
+    Yields:
+        list: Lotes com até `tamanho` elementos
+    """
+    iterador = iter(iteravel)
+    while True:
+        lote = list(islice(iterador, tamanho))
+        if not lote:
+            return
+        yield lote
+
+def ler_jsonl(arquivo):
+    """Lê um arquivo JSONL linha a linha.
+    
+    Linhas em branco são ignoradas; linhas que não são JSON válido são
+    entregues como None, para serem contadas como inválidas na importação.
+    
+    Args:
+        arquivo: Arquivo de texto aberto (ou qualquer iterável de linhas)
+        
+    Yields:
+        Cada objeto lido, ou None para as linhas inválidas
+    """
+    for linha in arquivo:
+        linha = linha.strip()
+        if not linha:
+            continue
+        try:
+            yield json.loads(linha)
+        except json.JSONDecodeError:
+            yield None
+
 def combinar_textos(textos, modo="concatenar"):
     """Combina múltiplos textos em um único texto.
     
@@ -18,6 +18,7 @@ import logging
 import asyncio
 import argparse
 import json
+import time
 from datetime import datetime
 from pathlib import Path
 import sys
@@ -32,13 +33,16 @@ from core.adaptive_learning import AprendizadoAdaptativo
 from persona.memoria import Memoria
 from persona.processador_pensamento import ProcessadorPensamento
 from core.chat_interface import ChatInterface
+from core.utils import ler_jsonl
 
 # Inicialização condicional do módulo de análise semântica
 MODULO_SEMANTICO_DISPONIVEL = False
 try:
-    from core.nlp_enhancement import analisador_semantico
-    MODULO_SEMANTICO_DISPONIVEL = True
+    from core.nlp.nlp_enhancement import analisador_semantico, BIBLIOTECAS_NLP_DISPONIVEIS
+    MODULO_SEMANTICO_DISPONIVEL = BIBLIOTECAS_NLP_DISPONIVEIS
 except ImportError:
+    pass
+if not MODULO_SEMANTICO_DISPONIVEL:
     print("Aviso: Módulo de análise semântica não disponível. Algumas funcionalidades estarão limitadas.")
 
 # Configuração do logging
@@ -77,6 +81,7 @@ async def processar_comandos(comando, persona, alma, gerenciador_aprendizado=Non
 ║  • armazenar [mensagem]  - Armazena uma nova memória                        ║
 ║  • listar [n]           - Lista as últimas n memórias (padrão: 5)          ║
 ║  • buscar [termo]       - Busca memórias contendo o termo                   ║
+║  • importar [arquivo]   - Importa memórias de um arquivo JSONL              ║
 ║                                                                             ║
 ║  ANÁLISE E REFLEXÃO:                                                        ║
 ║  • buscar-semantico [consulta] - Busca memórias semanticamente similares    ║
@@ -109,7 +114,7 @@ async def processar_comandos(comando, persona, alma, gerenciador_aprendizado=Non
     elif partes[0] == "buscar-semantico" and len(partes) > 1:
         consulta = " ".join(partes[1:])
         try:
-            from core.nlp_enhancement import analisador_semantico
+            from core.nlp.nlp_enhancement import analisador_semantico
             if not analisador_semantico.inicializado:
                 await analisador_semantico.inicializar_recursos()
             
@@ -141,7 +146,7 @@ async def processar_comandos(comando, persona, alma, gerenciador_aprendizado=Non
     elif partes[0] == "extrair-entidades" and len(partes) > 1:
         texto = " ".join(partes[1:])
         try:
-            from core.nlp_enhancement import analisador_semantico
+            from core.nlp.nlp_enhancement import analisador_semantico
             if not analisador_semantico.inicializado:
                 await analisador_semantico.inicializar_recursos()
             
@@ -159,7 +164,7 @@ async def processar_comandos(comando, persona, alma, gerenciador_aprendizado=Non
     elif partes[0] == "analisar-sentimento" and len(partes) > 1:
         texto = " ".join(partes[1:])
         try:
-            from core.nlp_enhancement import analisador_semantico
+            from core.nlp.nlp_enhancement import analisador_semantico
             if not analisador_semantico.inicializado:
                 await analisador_semantico.inicializar_recursos()
             
@@ -177,7 +182,7 @@ async def processar_comandos(comando, persona, alma, gerenciador_aprendizado=Non
     elif partes[0] == "palavras-chave" and len(partes) > 1:
         texto = " ".join(partes[1:])
         try:
-            from core.nlp_enhancement import analisador_semantico
+            from core.nlp.nlp_enhancement import analisador_semantico
             if not analisador_semantico.inicializado:
                 await analisador_semantico.inicializar_recursos()
             
@@ -188,9 +193,31 @@ async def processar_comandos(comando, persona, alma, gerenciador_aprendizado=Non
     
     elif partes[0] == "armazenar" and len(partes) > 1:
         conteudo = " ".join(partes[1:])
-        resultado = persona.adicionar_memoria(conteudo)
+        resultado = await persona.adicionar_memoria_async(conteudo)
         return f"Memória armazenada com ID: {resultado}"
     
+    elif partes[0] == "importar" and len(partes) > 1:
+        # O caminho vem do comando original: nomes de arquivo diferenciam maiúsculas
+        caminho = comando.strip().split(maxsplit=1)[1]
+        if not os.path.isfile(caminho):
+            return f"Arquivo não encontrado: {caminho}"
+        
+        inicio = time.perf_counter()
+        
+        def mostrar_progresso(processadas):
+            decorrido = time.perf_counter() - inicio
+            taxa = processadas / decorrido if decorrido > 0 else 0
+            print(f"\rImportando: {processadas:,} linhas processadas ({taxa:,.0f}/s)", end="", flush=True)
+        
+        with open(caminho, "r", encoding="utf-8") as arquivo:
+            resumo = persona.adicionar_memorias(ler_jsonl(arquivo), progresso=mostrar_progresso)
+        print()
+        
+        decorrido = time.perf_counter() - inicio
+        return (f"Importação de '{caminho}' concluída em {decorrido:.1f}s: "
+                f"{resumo['inseridas']} memórias inseridas, {resumo['duplicadas']} duplicadas, "
+                f"{resumo['invalidas']} linhas inválidas.")
+    
     elif partes[0] == "listar":
         n = 5  # padrão
         if len(partes) > 1 and partes[1].isdigit():
@@ -5,34 +5,149 @@ Este módulo implementa o sistema de armazenamento e gerenciamento de memórias,
 incluindo funcionalidades de busca, integração e síntese.
 """
 
-import json
 import os
 import random
 import logging
+import threading
 from datetime import datetime
 import asyncio
 from typing import Dict, Any
+from core.armazenamento import (ArmazenamentoSQLite, ArmazenamentoParticionado, Codec, carregar_arquivo, escritor,
+                                IndiceSecundario, ArmazenamentoEnriquecimentos, IndiceLinhagem,
+                                ArmazenamentoTermos)
+from core.armazenamento.enriquecimentos import CAMPOS_ENRIQUECIMENTO, separar_enriquecimento
+from core.armazenamento.mudancas import FeedMudancas, INSERCAO, ATUALIZACAO, REMOCAO
+from core.armazenamento.indice_secundario import condicoes_filtro
+from core.armazenamento.linhagem import CAMPOS_LINHAGEM
+from core.armazenamento.indice_invertido import termos_consulta
+from core.armazenamento.minhash import IndiceMinHash
+from core.nlp.indice_vetorial import IndiceVetorial, NUMPY_DISPONIVEL
+from itertools import islice
+from core.utils import hash_conteudo, corresponde_filtro
 
 # Importa o módulo de análise semântica avançada
 try:
-    from core.nlp_enhancement import analisador_semantico
-    ANALISE_SEMANTICA_DISPONIVEL = True
+    from core.nlp.nlp_enhancement import analisador_semantico, BIBLIOTECAS_NLP_DISPONIVEIS
+    # O módulo importa mesmo sem spaCy/NLTK/sentence-transformers; sem elas
+    # a análise semântica fica desligada
+    ANALISE_SEMANTICA_DISPONIVEL = BIBLIOTECAS_NLP_DISPONIVEIS
 except ImportError:
     ANALISE_SEMANTICA_DISPONIVEL = False
 
 # Configuração de logging
 logger = logging.getLogger(__name__)
 
+# Nome sob o qual o índice de linhagem guarda sua posição no feed de mudanças
+CONSUMIDOR_LINHAGEM = "linhagem"
+
+# Nome sob o qual o índice de memórias parecidas guarda sua posição no feed
+CONSUMIDOR_SIMILARES = "similares"
+
+# Nome sob o qual o índice vetorial da busca semântica guarda sua posição no feed
+CONSUMIDOR_VETORIAL = "indice_vetorial"
+
+def _palavras_significativas(texto):
+    """Palavras com mais de 3 letras, em minúsculas, comparadas por _buscar_memoria_similar."""
+    return set(w.lower() for w in texto.split() if len(w) > 3)
+
 class Memoria:
-    def __init__(self, memoria_path="core/memoria.json"):
+    def __init__(self, memoria_path="core/memoria.json", backend="json", caminho_legado=None,
+                 granularidade="mes", codec="json", caminho_enriquecimentos=None, caminho_indice_termos=None,
+                 caminho_indice_vetorial=None):
         """
         Inicializa o sistema de memória.
         
         Args:
-            memoria_path (str): Caminho para o arquivo de memórias
+            memoria_path (str): Caminho para o arquivo de memórias (ou diretório
+                das partições, no backend "particionado")
+            backend (str): "json" (arquivo único), "sqlite" (banco indexado) ou
+                "particionado" (um arquivo por dia/mês com manifesto)
+            caminho_legado (str, optional): Arquivo JSON importado quando o
+                armazenamento é criado vazio
+            granularidade (str): "dia" ou "mes" (backend "particionado")
+            codec (str): Codec do arquivo no backend "json" (ex.: "json", "msgpack+zstd")
+            caminho_enriquecimentos (str, optional): Banco SQLite com a análise
+                semântica e as sentenças contraditórias de cada memória (por
+                padrão, ao lado do armazenamento principal)
+            caminho_indice_termos (str, optional): Banco SQLite do índice de
+                termos da busca no backend "json" (por padrão, ao lado do
+                arquivo); os demais backends guardam o índice consigo
+            caminho_indice_vetorial (str, optional): Arquivo .npz com os embeddings
+                da busca semântica (por padrão, ao lado do armazenamento principal)
         """
         self.memoria_path = memoria_path
-        self._inicializar_memoria()
+        self.backend = backend
+        self.armazenamento = None
+        self.codec = Codec(codec)
+        
+        # Cache do documento carregado, validado pela assinatura do arquivo
+        self._cache_documento = None
+        self._assinatura_cache = None
+        
+        # Índice id -> posição na lista do documento (backend JSON)
+        self._indice_ids = {}
+        self._indice_ids_documento = None
+        
+        # Índice hash do conteúdo normalizado -> id (backend JSON)
+        self._indice_hashes = {}
+        self._indice_hashes_documento = None
+        self._duplicatas_evitadas = 0
+        
+        # Listas de ocorrência por tipo/origem/emoção/tag/campo (backend JSON)
+        self._indice_secundario = None
+        self._indice_secundario_documento = None
+        
+        # Gravação assíncrona pendente do documento (backend JSON): pedidos
+        # feitos antes de ela começar são agrupados na mesma gravação
+        self._trava_gravacao = threading.Lock()
+        self._documento_pendente = None
+        self._gravacao_pendente = None
+        
+        # Feed de mudanças: cada inserção/atualização/remoção recebe uma sequência
+        self.mudancas = FeedMudancas()
+        
+        # Pais e filhos de cada memória (versões e sínteses), mantidos pelo feed
+        self._indice_linhagem = None
+        self._indice_linhagem_documento = None
+        
+        # Assinaturas MinHash das palavras de cada memória, mantidas pelo feed
+        self._indice_similares = None
+        self._indice_similares_documento = None
+        
+        # Embeddings das memórias para a busca semântica, criado na primeira busca
+        self._indice_vetorial = None
+        self._indice_vetorial_documento = None
+        if caminho_indice_vetorial is None:
+            if backend == "particionado":
+                caminho_indice_vetorial = os.path.join(memoria_path, "vetores.npz")
+            else:
+                caminho_indice_vetorial = memoria_path + ".vetores.npz"
+        self.caminho_indice_vetorial = caminho_indice_vetorial
+        if backend == "sqlite":
+            self.armazenamento = ArmazenamentoSQLite(memoria_path, caminho_legado)
+        elif backend == "particionado":
+            self.armazenamento = ArmazenamentoParticionado(memoria_path, granularidade, caminho_legado)
+        else:
+            self._inicializar_memoria()
+        
+        # Dados pesados de análise ficam fora do registro principal
+        if caminho_enriquecimentos is None:
+            if backend == "particionado":
+                caminho_enriquecimentos = os.path.join(memoria_path, "enriquecimentos.db")
+            else:
+                caminho_enriquecimentos = memoria_path + ".enriquecimentos.db"
+        self.enriquecimentos = ArmazenamentoEnriquecimentos(caminho_enriquecimentos)
+        if self.enriquecimentos.obter_meta("separados") is None:
+            self._separar_enriquecimentos_existentes()
+        
+        # Termos do conteúdo -> ids para buscar_memorias (backend JSON)
+        self.termos = None
+        if self.armazenamento is None:
+            self.termos = ArmazenamentoTermos(caminho_indice_termos or memoria_path + ".termos.db")
+            if self.termos.obter_meta("indexado") is None:
+                self.termos.limpar()
+                self.termos.indexar(m for m in self._carregar_memorias()["memorias"] if "id" in m)
+                self.termos.definir_meta("indexado", "1")
         self.analise_semantica_ativa = ANALISE_SEMANTICA_DISPONIVEL
         self._analisador_inicializado = False
     
@@ -60,25 +175,88 @@ class Memoria:
                 os.makedirs(diretorio)
             
             # Cria um arquivo de memória vazio com estrutura básica
-            with open(self.memoria_path, 'w', encoding='utf-8') as f:
-                json.dump({
-                    "memorias": [],
-                    "meta": {
-                        "criado_em": datetime.now().isoformat(),
-                        "versao": "1.0"
-                    }
-                }, f, ensure_ascii=False, indent=2)
+            self.codec.salvar(self.memoria_path, {
+                "memorias": [],
+                "meta": {
+                    "criado_em": datetime.now().isoformat(),
+                    "versao": "1.0"
+                }
+            })
             print(f"Arquivo de memória criado em: {self.memoria_path}")
     
+    def _assinatura_armazenamento(self):
+        """Retorna um valor que muda quando o armazenamento é alterado.
+        
+        Returns:
+            tuple: (mtime, tamanho) do arquivo JSON ou a assinatura do banco
+        """
+        if self.armazenamento is not None:
+            return self.armazenamento.assinatura()
+        try:
+            estado = os.stat(self.memoria_path)
+            return (estado.st_mtime_ns, estado.st_size)
+        except OSError:
+            return None
+    
+    def _invalidar_cache(self):
+        """Descarta o documento em cache."""
+        self._cache_documento = None
+        self._assinatura_cache = None
+    
     def _carregar_memorias(self):
         """Carrega as memórias do arquivo JSON.
         
+        O documento fica em cache enquanto o arquivo não mudar (mtime e
+        tamanho) e não houver escritas pela própria memória, de modo que
+        leituras repetidas dentro de um ciclo não acessam o disco. O
+        dicionário retornado é compartilhado: alterações nele devem ser
+        persistidas com _salvar_memorias/armazenar_memoria.
+        
+        Returns:
+            dict: O conteúdo do arquivo de memórias
+        """
+        try:
+            # A assinatura é lida antes do conteúdo: uma escrita concorrente
+            # durante a leitura apenas força um novo carregamento depois
+            assinatura = self._assinatura_armazenamento()
+            if (self._cache_documento is not None and assinatura is not None
+                    and assinatura == self._assinatura_cache):
+                return self._cache_documento
+            
+            if self.armazenamento is not None:
+                dados = self.armazenamento.carregar()
+            else:
+                dados = carregar_arquivo(self.memoria_path)
+            
+            self._cache_documento = dados
+            self._assinatura_cache = assinatura
+            return dados
+        except Exception as e:
+            print(f"Erro ao carregar memórias: {e}")
+            return {"memorias": [], "meta": {"criado_em": datetime.now().isoformat(), "versao": "1.0"}}
+    
+    async def _carregar_memorias_async(self):
+        """Versão assíncrona de _carregar_memorias.
+        
+        Com o cache válido nada é lido; caso contrário, no backend JSON a
+        leitura e a desserialização ocorrem na thread do escritor, depois
+        de qualquer gravação pendente, sem bloquear o event loop.
+        
         Returns:
             dict: O conteúdo do arquivo de memórias
         """
+        assinatura = self._assinatura_armazenamento()
+        if (self._cache_documento is not None and assinatura is not None
+                and assinatura == self._assinatura_cache):
+            return self._cache_documento
+        if self.armazenamento is not None:
+            return self._carregar_memorias()
+        
         try:
-            with open(self.memoria_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            dados = await escritor.executar(carregar_arquivo, self.memoria_path)
+            self._cache_documento = dados
+            self._assinatura_cache = assinatura
+            return dados
         except Exception as e:
             print(f"Erro ao carregar memórias: {e}")
             return {"memorias": [], "meta": {"criado_em": datetime.now().isoformat(), "versao": "1.0"}}
@@ -86,15 +264,66 @@ class Memoria:
     def _salvar_memorias(self, dados):
         """Salva as memórias no arquivo JSON.
         
+        A gravação passa pela fila do escritor (aguardando sua conclusão),
+        para nunca ultrapassar uma gravação assíncrona ainda pendente.
+        
+        Args:
+            dados (dict): Os dados a serem salvos
+        """
+        try:
+            if self.armazenamento is not None:
+                self.armazenamento.salvar(dados)
+            else:
+                escritor.executar_sincrono(self.codec.salvar, self.memoria_path, dados)
+            
+            # O documento salvo passa a ser o conteúdo em cache
+            self._cache_documento = dados
+            self._assinatura_cache = self._assinatura_armazenamento()
+        except Exception as e:
+            self._invalidar_cache()
+            print(f"Erro ao salvar memórias: {e}")
+    
+    async def _salvar_memorias_async(self, dados):
+        """Versão assíncrona de _salvar_memorias.
+        
+        No backend JSON a serialização e a escrita do arquivo ocorrem na
+        thread do escritor; a corrotina só é retomada quando o arquivo
+        estiver gravado. Os backends SQLite e particionado gravam apenas
+        registros isolados e continuam síncronos (a conexão SQLite pertence
+        à thread que a criou).
+        
         Args:
             dados (dict): Os dados a serem salvos
         """
+        if self.armazenamento is not None:
+            self._salvar_memorias(dados)
+            return
+        
+        # Cópia rasa: inserções feitas no loop durante a gravação não
+        # alteram a lista que está sendo serializada
+        instantaneo = {**dados, "memorias": list(dados["memorias"]), "meta": dict(dados.get("meta", {}))}
+        with self._trava_gravacao:
+            self._documento_pendente = instantaneo
+            if self._gravacao_pendente is None:
+                self._gravacao_pendente = escritor.submeter(self._gravar_documento_pendente)
+            gravacao = self._gravacao_pendente
+        
         try:
-            with open(self.memoria_path, 'w', encoding='utf-8') as f:
-                json.dump(dados, f, ensure_ascii=False, indent=2)
+            await asyncio.wrap_future(gravacao)
+            self._cache_documento = dados
+            self._assinatura_cache = self._assinatura_armazenamento()
         except Exception as e:
+            self._invalidar_cache()
             print(f"Erro ao salvar memórias: {e}")
     
+    def _gravar_documento_pendente(self):
+        """Executado na thread do escritor: grava a versão mais recente pedida."""
+        with self._trava_gravacao:
+            documento = self._documento_pendente
+            self._documento_pendente = None
+            self._gravacao_pendente = None
+        self.codec.salvar(self.memoria_path, documento)
+    
     def receber_informacao(self, info):
         """Recebe uma nova informação e inicia o processo de integração.
         
@@ -126,7 +355,7 @@ class Memoria:
             return self.integrar_informacao(info)
         
         try:
-            dados = self._carregar_memorias()
+            dados = await self._carregar_memorias_async()
             
             # Extrai palavras-chave da nova informação
             palavras_chave = await analisador_semantico.extrair_palavras_chave(info)
@@ -137,22 +366,16 @@ class Memoria:
             # Extrai entidades
             entidades = await analisador_semantico.extrair_entidades(info)
             
-            # Busca memórias similares
+            # Busca a memória mais similar pelo índice vetorial
             memoria_mais_similar = None
             maior_similaridade = 0.0
             
-            for memoria in dados["memorias"]:
-                similaridade = await analisador_semantico.calcular_similaridade_semantica(
-                    info, memoria["conteudo"], metodo="embeddings"
-                )
-                
-                if similaridade > 0.7 and similaridade > maior_similaridade:  # Limiar ajustável
-                    maior_similaridade = similaridade
-                    memoria_mais_similar = memoria
+            similares = await self.buscar_similares(info, 1, limiar=0.7)  # Limiar ajustável
+            if similares:
+                memoria_mais_similar, maior_similaridade = similares[0]
             
             # Cria a nova memória com enriquecimento semântico
             nova_memoria = {
-                "id": len(dados["memorias"]) + 1,
                 "conteudo": info,
                 "criado_em": datetime.now().isoformat(),
                 "versao": 1,
@@ -171,10 +394,11 @@ class Memoria:
                 )
                 
                 # Adiciona informações de relação e contradição
-                nova_memoria["relacionado_a"] = memoria_mais_similar["id"]
+                anterior_id, versao = self._proxima_versao(memoria_mais_similar)
+                nova_memoria["relacionado_a"] = anterior_id
                 nova_memoria["similaridade"] = maior_similaridade
                 nova_memoria["contradicao"] = contradicoes["encontrou_contradicao"]
-                nova_memoria["versao"] = memoria_mais_similar["versao"] + 1
+                nova_memoria["versao"] = versao + 1
                 nova_memoria["evolucao"] = "Refinamento semântico de memória anterior"
                 
                 # Se for uma contradição, registra isso
@@ -183,7 +407,7 @@ class Memoria:
                     nova_memoria["sentencas_contraditorias"] = contradicoes.get("sentencas_contraditorias", [])
             
             # Armazena a memória enriquecida
-            self.armazenar_memoria(nova_memoria, dados)
+            await self.armazenar_memoria_async(nova_memoria, dados)
             logger.info(f"Memória integrada com análise semântica avançada (ID: {nova_memoria['id']})")
             return True
             
@@ -208,10 +432,9 @@ class Memoria:
         
         # Continua com o método tradicional
         dados = self._carregar_memorias()
-        memoria_existente = self._buscar_memoria_similar(dados["memorias"], info)
+        memoria_existente = self._buscar_memoria_similar(info)
         
         nova_memoria = {
-            "id": len(dados["memorias"]) + 1,
             "conteudo": info,
             "criado_em": datetime.now().isoformat(),
             "versao": 1,
@@ -221,8 +444,9 @@ class Memoria:
         if memoria_existente:
             # Se encontrou uma memória similar, cria uma versão refinada
             print(f"Memória similar encontrada: '{memoria_existente['conteudo']}'")
-            nova_memoria["relacionado_a"] = memoria_existente["id"]
-            nova_memoria["versao"] = memoria_existente["versao"] + 1
+            anterior_id, versao = self._proxima_versao(memoria_existente)
+            nova_memoria["relacionado_a"] = anterior_id
+            nova_memoria["versao"] = versao + 1
             nova_memoria["evolucao"] = "Refinamento de memória anterior"
         else:
             print("Nova memória independente criada")
@@ -230,36 +454,42 @@ class Memoria:
         self.armazenar_memoria(nova_memoria, dados)
         return True
     
-    def _buscar_memoria_similar(self, memorias, info):
+    def _buscar_memoria_similar(self, info):
         """Busca uma memória similar à informação fornecida.
         
-        Esta é uma implementação simplificada que verifica palavras em comum.
+        Compara os conjuntos de palavras pela similaridade de Jaccard (palavras
+        em comum sobre palavras da união), a mesma medida que o índice
+        MinHash/LSH aproxima, e só com as memórias que ele aponta como
+        candidatas, em vez de com todas. Antes do índice a medida era
+        palavras em comum sobre o maior dos dois conjuntos, mais permissiva:
+        pares com Jaccard abaixo de 0,3 que passavam por ela deixaram de ser
+        considerados similares, e o índice encontra os que restam com ~95%
+        de chance.
         
         Args:
-            memorias (list): Lista de memórias para buscar
             info (str): Informação para comparar
             
         Returns:
             dict: Memória similar ou None se não encontrar
         """
-        if not memorias:
-            return None
-        
         # Extrai palavras significativas (ignorando palavras muito comuns)
-        palavras_info = set(w.lower() for w in info.split() if len(w) > 3)
+        palavras_info = _palavras_significativas(info)
         if not palavras_info:
             return None
         
         melhor_correspondencia = None
         melhor_pontuacao = 0
         
-        for memoria in memorias:
-            palavras_memoria = set(w.lower() for w in memoria["conteudo"].split() if len(w) > 3)
+        for memoria_id in sorted(self._similares().candidatos(palavras_info)):
+            memoria = self.buscar_por_id(memoria_id)
+            if memoria is None:
+                continue
+            palavras_memoria = _palavras_significativas(memoria["conteudo"])
             
-            # Calcular interseção de palavras
+            # Similaridade de Jaccard entre os conjuntos de palavras
             comum = palavras_info.intersection(palavras_memoria)
             if comum:
-                pontuacao = len(comum) / max(len(palavras_info), len(palavras_memoria))
+                pontuacao = len(comum) / len(palavras_info | palavras_memoria)
                 if pontuacao > 0.3 and pontuacao > melhor_pontuacao:  # Limiar de 30% de similaridade
                     melhor_correspondencia = memoria
                     melhor_pontuacao = pontuacao
@@ -269,6 +499,36 @@ class Memoria:
     def armazenar_memoria(self, memoria, dados=None):
         """Armazena uma nova memória no sistema.
         
+        Se já existir uma memória com o mesmo conteúdo normalizado, nenhum
+        registro novo é criado: o contador de referências da existente é
+        incrementado e o dicionário recebido passa a refletir o registro
+        existente (inclusive o id).
+        
+        Args:
+            memoria (dict): A memória a ser armazenada
+            dados (dict, optional): Dados já carregados ou None para carregar
+            
+        Returns:
+            bool: True se a memória foi armazenada com sucesso
+        """
+        existente = self._buscar_duplicata(memoria.get("conteudo", ""), dados)
+        if existente is not None:
+            atualizada = self.atualizar_memoria(existente, self._nova_referencia(existente))
+            self._registrar_duplicata(memoria, atualizada or existente)
+            return True
+        
+        dados = self._incluir_memoria(memoria, dados)
+        if dados is not None:
+            self._salvar_memorias(dados)
+        print(f"Memória armazenada com ID: {memoria['id']}")
+        return True
+    
+    async def armazenar_memoria_async(self, memoria, dados=None):
+        """Versão assíncrona de armazenar_memoria.
+        
+        No backend JSON o arquivo é gravado pela thread do escritor, sem
+        bloquear o event loop; a corrotina termina quando a gravação termina.
+        
         Args:
             memoria (dict): A memória a ser armazenada
             dados (dict, optional): Dados já carregados ou None para carregar
@@ -276,15 +536,498 @@ class Memoria:
         Returns:
             bool: True se a memória foi armazenada com sucesso
         """
+        if dados is None and self.armazenamento is None:
+            dados = await self._carregar_memorias_async()
+        
+        existente = self._buscar_duplicata(memoria.get("conteudo", ""), dados)
+        if existente is not None:
+            atualizada = await self.atualizar_memoria_async(existente, self._nova_referencia(existente))
+            self._registrar_duplicata(memoria, atualizada or existente)
+            return True
+        
+        dados = self._incluir_memoria(memoria, dados)
+        if dados is not None:
+            await self._salvar_memorias_async(dados)
+        print(f"Memória armazenada com ID: {memoria['id']}")
+        return True
+    
+    @staticmethod
+    def _nova_referencia(existente):
+        """Campos atualizados quando uma duplicata de `existente` é armazenada."""
+        return {
+            "referencias": existente.get("referencias", 1) + 1,
+            "ultima_referencia": datetime.now().isoformat()
+        }
+    
+    def _registrar_duplicata(self, memoria, registro):
+        """Faz o dicionário recebido refletir o registro existente."""
+        self._duplicatas_evitadas += 1
+        memoria.clear()
+        memoria.update(registro)
+        print(f"Memória duplicada; referência adicionada à memória ID: {memoria['id']}")
+    
+    def _incluir_memoria(self, memoria, dados):
+        """Atribui o id e inclui a memória nova no armazenamento.
+        
+        O id só é reservado aqui, depois da verificação de duplicatas, para
+        que uma memória descartada como duplicata não consuma um id.
+        Nos backends SQLite e particionado o registro já é gravado aqui; no
+        JSON ele é acrescentado ao documento, que o chamador deve salvar.
+        
+        Returns:
+            dict: O documento a salvar (backend JSON) ou None
+        """
+        if "id" not in memoria:
+            if dados is None and self.armazenamento is None:
+                dados = self._carregar_memorias()
+            # Mantém o id como primeiro campo do registro
+            campos = dict(memoria)
+            memoria.clear()
+            memoria["id"] = self._alocar_id(dados)
+            memoria.update(campos)
+        self._gravar_enriquecimento(memoria)
+        
+        if self.armazenamento is not None:
+            # Grava apenas o registro novo; mantém os dados em mãos coerentes
+            self.armazenamento.inserir(memoria)
+            self._invalidar_cache()
+            if dados is not None:
+                dados["memorias"].append(memoria)
+            self.mudancas.registrar(INSERCAO, memoria["id"], memoria)
+            return None
+        
         if dados is None:
             dados = self._carregar_memorias()
         
         dados["memorias"].append(memoria)
         dados["meta"]["ultima_atualizacao"] = datetime.now().isoformat()
         dados["meta"]["total_memorias"] = len(dados["memorias"])
+        if self._indice_ids_documento is dados:
+            self._indice_ids[memoria["id"]] = len(dados["memorias"]) - 1
+        if self._indice_hashes_documento is dados:
+            self._indice_hashes.setdefault(hash_conteudo(memoria.get("conteudo", "")), memoria["id"])
+        if self._indice_secundario_documento is dados:
+            self._indice_secundario.adicionar(memoria)
+        self.termos.indexar([memoria])
+        self.mudancas.registrar(INSERCAO, memoria["id"], memoria)
+        return dados
+    
+    def _buscar_duplicata(self, conteudo, dados=None):
+        """Procura uma memória com o mesmo conteúdo normalizado.
+        
+        Nos backends SQLite e particionado a busca usa o índice de hashes do
+        armazenamento; no JSON o índice é montado uma vez por documento.
+        
+        Args:
+            conteudo (str): Conteúdo da nova memória
+            dados (dict, optional): Documento carregado (backend JSON)
+            
+        Returns:
+            dict: A memória existente ou None
+        """
+        hash_texto = hash_conteudo(conteudo)
+        if self.armazenamento is not None:
+            return self.armazenamento.buscar_por_hash(hash_texto)
+        
+        if dados is None:
+            dados = self._carregar_memorias()
+        memoria_id = self._indice_hashes_json(dados).get(hash_texto)
+        if memoria_id is None:
+            return None
+        posicao = self._posicao_por_id(dados, memoria_id)
+        return dados["memorias"][posicao] if posicao is not None else None
+    
+    def _indice_hashes_json(self, dados):
+        """Retorna o índice hash -> id do documento, montando-o uma vez por documento."""
+        if self._indice_hashes_documento is not dados:
+            self._indice_hashes = {}
+            for memoria in dados["memorias"]:
+                self._indice_hashes.setdefault(hash_conteudo(memoria.get("conteudo", "")), memoria.get("id"))
+            self._indice_hashes_documento = dados
+        return self._indice_hashes
+    
+    def _gravar_enriquecimento(self, memoria):
+        """Move os campos de enriquecimento da memória (que já tem id) para o armazenamento separado."""
+        carga = separar_enriquecimento(memoria)
+        if carga:
+            self.enriquecimentos.gravar(memoria["id"], carga)
+    
+    def _separar_enriquecimentos_existentes(self):
+        """Migra os enriquecimentos ainda embutidos nas memórias (executado uma vez)."""
+        dados = self._carregar_memorias()
+        cargas = []
+        for memoria in dados["memorias"]:
+            if "id" in memoria and any(campo in memoria for campo in CAMPOS_ENRIQUECIMENTO):
+                cargas.append((memoria["id"], separar_enriquecimento(memoria)))
+        if cargas:
+            self.enriquecimentos.gravar_lote(cargas)
+            self._indice_secundario_documento = None
+            self._salvar_memorias(dados)
+            logger.info(f"Enriquecimentos de {len(cargas)} memórias movidos para {self.enriquecimentos.caminho}")
+        self.enriquecimentos.definir_meta("separados", datetime.now().isoformat())
+    
+    def obter_enriquecimento(self, memoria):
+        """Lê a análise semântica e as sentenças contraditórias de uma memória.
+        
+        Esses dados não fazem parte do registro principal; só são lidos
+        quando pedidos por esta função.
+        
+        Args:
+            memoria (dict | int): A memória ou seu id
+            
+        Returns:
+            dict: Campos de enriquecimento (vazio se a memória não tiver)
+        """
+        memoria_id = memoria["id"] if isinstance(memoria, dict) else memoria
+        return self.enriquecimentos.obter(memoria_id)
+    
+    def memoria_completa(self, memoria_id):
+        """Busca uma memória pelo id já com os campos de enriquecimento.
+        
+        Args:
+            memoria_id (int): Id da memória
+            
+        Returns:
+            dict: Cópia da memória com os enriquecimentos, ou None
+        """
+        memoria = self.buscar_por_id(memoria_id)
+        if memoria is None:
+            return None
+        return {**memoria, **self.enriquecimentos.obter(memoria_id)}
+    
+    def _indice_secundario_json(self, dados):
+        """Retorna o índice secundário do documento, montando-o uma vez por documento."""
+        if self._indice_secundario_documento is not dados:
+            self._indice_secundario = IndiceSecundario(m for m in dados["memorias"] if "id" in m)
+            self._indice_secundario_documento = dados
+        return self._indice_secundario
+    
+    def filtrar(self, tipo=None, origem=None, emocao=None, tag=None, tem_campo=None, limite=None):
+        """Retorna as memórias que atendem aos filtros sem varrer o armazenamento.
+        
+        Os filtros são respondidos pelo índice secundário (listas de
+        ocorrência mantidas a cada inserção, atualização e remoção): tabela
+        própria no SQLite, índice em memória no particionado e no JSON.
+        Todas as condições informadas precisam ser atendidas.
+        
+        Args:
+            tipo (str, optional): Valor exigido de "tipo"
+            origem (str, optional): Valor exigido de "origem" (ex.: "sintese_interna")
+            emocao (str, optional): Emoção exigida em contexto_emocional
+            tag (str, optional): Tag que a memória deve ter
+            tem_campo (str | iterable, optional): Campo(s) que a memória deve possuir
+                (ex.: "avaliacao", "padroes", "contexto_emocional")
+            limite (int, optional): Máximo de memórias, das mais antigas em diante
+            
+        Returns:
+            list: Memórias encontradas, em ordem de criação
+        """
+        if self.armazenamento is not None:
+            return self.armazenamento.filtrar(tipo, origem, emocao, tag, tem_campo,
+                                              limite=-1 if limite is None else limite)
+        
+        dados = self._carregar_memorias()
+        ids = self._indice_secundario_json(dados).consultar(condicoes_filtro(tipo, origem, emocao, tag, tem_campo))
+        if ids is None:
+            return dados["memorias"][:limite]
+        posicoes = sorted(p for p in (self._posicao_por_id(dados, i) for i in ids) if p is not None)
+        return [dados["memorias"][p] for p in posicoes[:limite]]
+    
+    def contar(self, tipo=None, origem=None, emocao=None, tag=None, tem_campo=None):
+        """Conta as memórias que atendem aos filtros (mesmos parâmetros de filtrar).
         
+        Returns:
+            int: Número de memórias, obtido só do índice
+        """
+        if self.armazenamento is not None:
+            return self.armazenamento.contar(tipo, origem, emocao, tag, tem_campo)
+        
+        dados = self._carregar_memorias()
+        ids = self._indice_secundario_json(dados).consultar(condicoes_filtro(tipo, origem, emocao, tag, tem_campo))
+        return len(dados["memorias"]) if ids is None else len(ids)
+    
+    def valores_indexados(self, campo):
+        """Retorna cada valor do campo indexado com seu número de memórias.
+        
+        Args:
+            campo (str): "tipo", "origem", "emocao", "tag" ou "campo" (campos presentes)
+            
+        Returns:
+            dict: valor -> número de memórias
+        """
+        if self.armazenamento is not None:
+            return self.armazenamento.valores(campo)
+        return self._indice_secundario_json(self._carregar_memorias()).valores(campo)
+    
+    def adicionar_memorias(self, memorias, progresso=None, intervalo_progresso=10000):
+        """Importa um grande volume de memórias de uma só vez.
+        
+        Ao contrário de chamar armazenar_memoria por item, o armazenamento é
+        lido e gravado uma única vez: no SQLite tudo ocorre em uma transação,
+        no particionado cada lote é acrescentado com uma escrita por arquivo
+        e no JSON o documento é regravado apenas no final. O iterável é
+        consumido de forma preguiçosa.
+        
+        Cada item pode ser um texto ou um dicionário com "conteudo"; itens
+        sem conteúdo são contados como inválidos. Os ids são sempre
+        atribuídos pela memória, e memórias com conteúdo já existente são
+        ignoradas (contadas como duplicadas).
+        
+        Args:
+            memorias (iterable): Textos ou dicionários de memória
+            progresso (callable, optional): Recebe o número de itens processados
+            intervalo_progresso (int): Itens entre chamadas de progresso
+            
+        Returns:
+            dict: {"inseridas": n, "duplicadas": n, "invalidas": n}
+        """
+        resumo = {"inseridas": 0, "duplicadas": 0, "invalidas": 0}
+        # Enriquecimentos dos itens importados, gravados depois que recebem id
+        cargas = []
+        validas = self._separar_cargas(
+            self._validar_importacao(memorias, resumo, progresso, intervalo_progresso), cargas
+        )
+        
+        if self.armazenamento is not None:
+            resultado = self.armazenamento.importar(validas)
+            self._invalidar_cache()
+            resumo["inseridas"] = resultado["inseridas"]
+            resumo["duplicadas"] = resultado["duplicadas"]
+        else:
+            dados = self._carregar_memorias()
+            indice = self._indice_hashes_json(dados)
+            inseridas = []
+            try:
+                for memoria in validas:
+                    hash_texto = hash_conteudo(memoria["conteudo"])
+                    if hash_texto in indice:
+                        resumo["duplicadas"] += 1
+                        continue
+                    memoria["id"] = self._alocar_id(dados)
+                    indice[hash_texto] = memoria["id"]
+                    dados["memorias"].append(memoria)
+                    if self._indice_secundario_documento is dados:
+                        self._indice_secundario.adicionar(memoria)
+                    inseridas.append(memoria)
+            except Exception:
+                # Descarta o documento alterado pela metade (memórias e
+                # proximo_id): a próxima leitura volta ao arquivo gravado
+                self._invalidar_cache()
+                raise
+            resumo["inseridas"] = len(inseridas)
+            
+            if inseridas:
+                self.termos.indexar(inseridas)
+                dados["meta"]["ultima_atualizacao"] = datetime.now().isoformat()
+                dados["meta"]["total_memorias"] = len(dados["memorias"])
+                self._salvar_memorias(dados)
+        
+        # Duplicatas não recebem id e têm o enriquecimento descartado
+        self.enriquecimentos.gravar_lote((m["id"], carga) for m, carga in cargas if "id" in m)
+        if resumo["inseridas"]:
+            # As memórias importadas não são registradas uma a uma: os
+            # consumidores do feed refazem sua varredura completa
+            self.mudancas.invalidar()
+        self._duplicatas_evitadas += resumo["duplicadas"]
+        print(f"Importação concluída: {resumo['inseridas']} memórias inseridas, "
+              f"{resumo['duplicadas']} duplicadas, {resumo['invalidas']} inválidas")
+        return resumo
+    
+    @staticmethod
+    def _separar_cargas(memorias, cargas):
+        """Retira os enriquecimentos das memórias importadas, guardando-os em cargas."""
+        for memoria in memorias:
+            carga = separar_enriquecimento(memoria)
+            if carga:
+                cargas.append((memoria, carga))
+            yield memoria
+    
+    @staticmethod
+    def _validar_importacao(memorias, resumo, progresso, intervalo_progresso):
+        """Valida e completa os itens importados, reportando o progresso.
+        
+        Yields:
+            dict: Memórias válidas, com campos padrão preenchidos
+        """
+        agora = datetime.now().isoformat()
+        processadas = 0
+        for item in memorias:
+            processadas += 1
+            if isinstance(item, str):
+                item = {"conteudo": item}
+            if isinstance(item, dict) and isinstance(item.get("conteudo"), str) and item["conteudo"].strip():
+                item.pop("id", None)
+                item.setdefault("criado_em", agora)
+                item.setdefault("versao", 1)
+                item.setdefault("origem", "importacao")
+                yield item
+            else:
+                resumo["invalidas"] += 1
+            
+            if progresso and processadas % intervalo_progresso == 0:
+                progresso(processadas)
+        
+        if progresso and processadas % intervalo_progresso:
+            progresso(processadas)
+    
+    def _alocar_id(self, dados=None):
+        """Reserva um novo id, nunca reutilizado mesmo após remoções.
+        
+        Args:
+            dados (dict, optional): Documento carregado (backend JSON)
+            
+        Returns:
+            int: O id reservado
+        """
+        if self.armazenamento is not None:
+            return self.armazenamento.alocar_id()
+        
+        if dados is None:
+            dados = self._carregar_memorias()
+        meta = dados.setdefault("meta", {})
+        if "proximo_id" not in meta:
+            ids = [m["id"] for m in dados["memorias"] if isinstance(m.get("id"), int)]
+            meta["proximo_id"] = max(ids, default=0) + 1
+        memoria_id = meta["proximo_id"]
+        meta["proximo_id"] += 1
+        return memoria_id
+    
+    def _posicao_por_id(self, dados, memoria_id):
+        """Localiza a posição de uma memória no documento pelo índice de ids.
+        
+        O índice é reconstruído apenas quando o documento em cache muda
+        ou quando a posição indexada não confere mais.
+        """
+        memorias = dados["memorias"]
+        if self._indice_ids_documento is dados:
+            posicao = self._indice_ids.get(memoria_id)
+            if posicao is not None and posicao < len(memorias) and memorias[posicao].get("id") == memoria_id:
+                return posicao
+        
+        self._indice_ids = {m.get("id"): posicao for posicao, m in enumerate(memorias)}
+        self._indice_ids_documento = dados
+        return self._indice_ids.get(memoria_id)
+    
+    def buscar_por_id(self, memoria_id):
+        """Busca uma memória pelo id.
+        
+        Args:
+            memoria_id (int): Id da memória
+            
+        Returns:
+            dict: A memória encontrada ou None
+        """
+        if self.armazenamento is not None:
+            return self.armazenamento.buscar_por_id(memoria_id)
+        
+        dados = self._carregar_memorias()
+        posicao = self._posicao_por_id(dados, memoria_id)
+        return dados["memorias"][posicao] if posicao is not None else None
+    
+    def atualizar_memoria(self, memoria, novos_dados):
+        """Atualiza uma memória existente.
+        
+        No backend SQLite apenas a linha da memória é regravada; no backend
+        JSON o arquivo único precisa ser regravado, mas a localização do
+        registro é feita pelo índice de ids.
+        
+        Args:
+            memoria (dict | int): A memória ou seu id
+            novos_dados (dict): Campos a atualizar (o id é preservado)
+            
+        Returns:
+            dict: A memória atualizada ou None se não existir
+        """
+        dados = self._carregar_memorias() if self.armazenamento is None else None
+        atualizada = self._aplicar_atualizacao(memoria, novos_dados, dados)
+        if atualizada is not None and dados is not None:
+            self._salvar_memorias(dados)
+        return atualizada
+    
+    async def atualizar_memoria_async(self, memoria, novos_dados):
+        """Versão assíncrona de atualizar_memoria (gravação na thread do escritor).
+        
+        Args:
+            memoria (dict | int): A memória ou seu id
+            novos_dados (dict): Campos a atualizar (o id é preservado)
+            
+        Returns:
+            dict: A memória atualizada ou None se não existir
+        """
+        dados = await self._carregar_memorias_async() if self.armazenamento is None else None
+        atualizada = self._aplicar_atualizacao(memoria, novos_dados, dados)
+        if atualizada is not None and dados is not None:
+            await self._salvar_memorias_async(dados)
+        return atualizada
+    
+    def _aplicar_atualizacao(self, memoria, novos_dados, dados):
+        """Aplica a atualização no banco ou no documento JSON em mãos.
+        
+        Returns:
+            dict: A memória atualizada ou None se não existir
+        """
+        memoria_id = memoria["id"] if isinstance(memoria, dict) else memoria
+        
+        if self.armazenamento is not None:
+            atual = self.armazenamento.buscar_por_id(memoria_id)
+            if atual is None:
+                return None
+            atualizada = {**atual, **novos_dados, "id": memoria_id}
+            self._gravar_enriquecimento(atualizada)
+            self.armazenamento.inserir(atualizada)
+            self._invalidar_cache()
+            self.mudancas.registrar(ATUALIZACAO, memoria_id, atualizada, atual)
+            return atualizada
+        
+        posicao = self._posicao_por_id(dados, memoria_id)
+        if posicao is None:
+            return None
+        atualizada = {**dados["memorias"][posicao], **novos_dados, "id": memoria_id}
+        self._gravar_enriquecimento(atualizada)
+        if atualizada.get("conteudo") != dados["memorias"][posicao].get("conteudo"):
+            self._indice_hashes_documento = None
+            self.termos.indexar([atualizada], novas=False)
+        if self._indice_secundario_documento is dados:
+            self._indice_secundario.atualizar(dados["memorias"][posicao], atualizada)
+        self.mudancas.registrar(ATUALIZACAO, memoria_id, atualizada, dados["memorias"][posicao])
+        dados["memorias"][posicao] = atualizada
+        dados["meta"]["ultima_atualizacao"] = datetime.now().isoformat()
+        return atualizada
+    
+    def remover_memoria(self, memoria_id):
+        """Remove uma memória pelo id.
+        
+        Args:
+            memoria_id (int): Id da memória
+            
+        Returns:
+            bool: True se a memória existia e foi removida
+        """
+        if self.armazenamento is not None:
+            # O registro anterior acompanha a mudança, para os consumidores do feed
+            anterior = self.armazenamento.buscar_por_id(memoria_id)
+            removida = self.armazenamento.remover(memoria_id)
+            self._invalidar_cache()
+            if removida:
+                self.enriquecimentos.remover(memoria_id)
+                self.mudancas.registrar(REMOCAO, memoria_id, anterior=anterior)
+            return removida
+        
+        dados = self._carregar_memorias()
+        posicao = self._posicao_por_id(dados, memoria_id)
+        if posicao is None:
+            return False
+        if self._indice_secundario_documento is dados:
+            self._indice_secundario.remover(dados["memorias"][posicao])
+        self.mudancas.registrar(REMOCAO, memoria_id, anterior=dados["memorias"][posicao])
+        del dados["memorias"][posicao]
+        self.enriquecimentos.remover(memoria_id)
+        self.termos.remover(memoria_id)
+        self._indice_ids_documento = None
+        self._indice_hashes_documento = None
+        dados["meta"]["ultima_atualizacao"] = datetime.now().isoformat()
+        dados["meta"]["total_memorias"] = len(dados["memorias"])
         self._salvar_memorias(dados)
-        print(f"Memória armazenada com ID: {memoria['id']}")
         return True
     
     async def gerar_sintese_avancada(self):
@@ -298,7 +1041,7 @@ class Memoria:
             return self.gerar_sintese()
         
         try:
-            dados = self._carregar_memorias()
+            dados = await self._carregar_memorias_async()
             if len(dados["memorias"]) < 2:
                 logger.info("Memórias insuficientes para gerar síntese avançada")
                 return None
@@ -307,21 +1050,13 @@ class Memoria:
             # Primeiro seleciona uma memória aleatória como ponto de partida
             memoria_base = random.choice(dados["memorias"])
             
-            # Encontra memórias relacionadas semanticamente
-            memorias_ordenadas = []
-            for memoria in dados["memorias"]:
-                if memoria["id"] != memoria_base["id"]:
-                    similaridade = await analisador_semantico.calcular_similaridade_semantica(
-                        memoria_base["conteudo"], memoria["conteudo"]
-                    )
-                    memorias_ordenadas.append((memoria, similaridade))
-            
-            # Ordena por similaridade e seleciona as mais próximas
-            memorias_ordenadas.sort(key=lambda x: x[1], reverse=True)
-            num_memorias = min(len(memorias_ordenadas), random.randint(1, 2))
+            # Seleciona as memórias semanticamente mais próximas pelo índice vetorial
+            memorias_proximas = await self.buscar_similares(
+                memoria_base["conteudo"], random.randint(1, 2), excluir=memoria_base["id"]
+            )
             
             # Prepara os textos para síntese (inclui a memória base)
-            memorias_escolhidas = [memoria_base] + [m[0] for m in memorias_ordenadas[:num_memorias]]
+            memorias_escolhidas = [memoria_base] + [memoria for memoria, _ in memorias_proximas]
             textos = [memoria["conteudo"] for memoria in memorias_escolhidas]
             
             # Gera uma síntese avançada
@@ -333,7 +1068,6 @@ class Memoria:
             
             # Cria e armazena a nova memória sintética com enriquecimento semântico
             nova_memoria = {
-                "id": len(dados["memorias"]) + 1,
                 "conteudo": sintese,
                 "criado_em": datetime.now().isoformat(),
                 "versao": 1,
@@ -345,7 +1079,7 @@ class Memoria:
                 }
             }
             
-            self.armazenar_memoria(nova_memoria, dados)
+            await self.armazenar_memoria_async(nova_memoria, dados)
             logger.info(f"Síntese avançada gerada (ID: {nova_memoria['id']})")
             return sintese
             
@@ -380,7 +1114,6 @@ class Memoria:
         
         # Cria e armazena a nova memória sintética
         nova_memoria = {
-            "id": len(dados["memorias"]) + 1,
             "conteudo": sintese,
             "criado_em": datetime.now().isoformat(),
             "versao": 1,
@@ -396,6 +1129,10 @@ class Memoria:
     async def buscar_memorias_semanticamente(self, consulta, limite=5):
         """Busca memórias semanticamente similares à consulta.
         
+        A consulta é codificada uma única vez e comparada com os embeddings
+        do índice vetorial (ver _vetorial), que só codifica memórias novas
+        ou alteradas.
+        
         Args:
             consulta (str): Texto de consulta
             limite (int): Número máximo de resultados
@@ -403,32 +1140,113 @@ class Memoria:
         Returns:
             list: Lista de memórias ordenadas por relevância semântica
         """
-        if not self.analise_semantica_ativa:
+        if not self.analise_semantica_ativa or not NUMPY_DISPONIVEL:
             # Fallback para busca simples
             return self.buscar_memorias(consulta, limite)
         
         try:
-            dados = self._carregar_memorias()
-            resultados = []
+            if not analisador_semantico.inicializado:
+                await analisador_semantico.inicializar_recursos()
+                if not analisador_semantico.inicializado:
+                    return self.buscar_memorias(consulta, limite)
             
-            for memoria in dados["memorias"]:
-                similaridade = await analisador_semantico.calcular_similaridade_semantica(
-                    consulta, memoria["conteudo"]
-                )
-                
-                # Adiciona à lista se tiver alguma relevância
-                if similaridade > 0.2:  # Limiar baixo para não filtrar demais
-                    resultados.append((memoria, similaridade))
-            
-            # Ordena por similaridade e limita resultados
-            resultados.sort(key=lambda x: x[1], reverse=True)
-            return [memoria for memoria, _ in resultados[:limite]]
+            # Limiar baixo para não filtrar demais
+            return [memoria for memoria, _ in await self.buscar_similares(consulta, limite, limiar=0.2)]
             
         except Exception as e:
             logger.error(f"Erro na busca semântica: {e}")
             # Fallback para busca simples em caso de erro
             return self.buscar_memorias(consulta, limite)
     
+    async def buscar_similares(self, texto, limite=5, limiar=None, excluir=None):
+        """Retorna as memórias mais similares ao texto, com a similaridade de cada uma.
+        
+        Só o texto é codificado; as memórias vêm do índice vetorial (ver
+        _vetorial), sem recodificar o acervo a cada chamada.
+        
+        Args:
+            texto (str): Texto de referência
+            limite (int): Número máximo de memórias
+            limiar (float, optional): Similaridade mínima (exclusiva)
+            excluir (int, optional): Id de uma memória a deixar de fora (ex.: a do próprio texto)
+            
+        Returns:
+            list: Pares (memória, similaridade), da mais similar para a menos
+            
+        Raises:
+            RuntimeError: Se os embeddings não estiverem disponíveis
+        """
+        if not NUMPY_DISPONIVEL:
+            raise RuntimeError("NumPy não disponível: busca por similaridade desabilitada")
+        vetores = await analisador_semantico.encode_lote([texto])
+        if vetores is None:
+            raise RuntimeError("Embeddings não disponíveis: busca por similaridade desabilitada")
+        
+        indice = await self._vetorial()
+        k = limite + 1 if excluir is not None else limite
+        resultados = []
+        for memoria_id, similaridade in indice.buscar(vetores[0], k, limiar=limiar):
+            if memoria_id == excluir:
+                continue
+            memoria = self.buscar_por_id(memoria_id)
+            if memoria is not None:
+                resultados.append((memoria, similaridade))
+        return resultados[:limite]
+    
+    async def _vetorial(self):
+        """Retorna o índice vetorial com as mudanças pendentes aplicadas.
+        
+        Na primeira busca (ou se o feed não cobrir mais as mudanças, ou o
+        documento JSON for recarregado) o índice gravado em disco é
+        conferido com as memórias pelo hash do conteúdo: vetores de
+        memórias removidas saem e só as novas ou alteradas são
+        codificadas. Depois, acompanha o feed de mudanças. As memórias a
+        codificar vão ao modelo em um único lote.
+        
+        Returns:
+            IndiceVetorial: O índice atualizado
+        """
+        documento = self._carregar_memorias() if self.armazenamento is None else None
+        mudancas, seq = self.mudancas.pendentes(CONSUMIDOR_VETORIAL)
+        if self._indice_vetorial is None:
+            self._indice_vetorial = IndiceVetorial(self.caminho_indice_vetorial,
+                                                   analisador_semantico.nome_modelo_embeddings)
+        indice = self._indice_vetorial
+        
+        # Id -> (hash, conteúdo) das memórias a codificar
+        a_codificar = {}
+        if mudancas is None or documento is not self._indice_vetorial_documento:
+            presentes = set()
+            for memoria in self.iter_memorias(campos=("id", "conteudo")):
+                if "id" not in memoria:
+                    continue
+                presentes.add(memoria["id"])
+                hash_memoria = hash_conteudo(memoria.get("conteudo", ""))
+                if indice.hash(memoria["id"]) != hash_memoria:
+                    a_codificar[memoria["id"]] = (hash_memoria, memoria.get("conteudo", ""))
+            for memoria_id in indice.ids():
+                if memoria_id not in presentes:
+                    indice.remover(memoria_id)
+            self._indice_vetorial_documento = documento
+        else:
+            for mudanca in mudancas:
+                if mudanca["memoria"] is None:
+                    a_codificar.pop(mudanca["id"], None)
+                    indice.remover(mudanca["id"])
+                    continue
+                conteudo = mudanca["memoria"].get("conteudo", "")
+                hash_memoria = hash_conteudo(conteudo)
+                if indice.hash(mudanca["id"]) != hash_memoria:
+                    a_codificar[mudanca["id"]] = (hash_memoria, conteudo)
+        
+        if a_codificar:
+            vetores = await analisador_semantico.encode_lote([c for _, c in a_codificar.values()])
+            indice.adicionar(((memoria_id, h) for memoria_id, (h, _) in a_codificar.items()), vetores)
+        # O arquivo .npz é regravado na thread do escritor, fora da busca
+        indice.salvar_em_segundo_plano()
+        self.mudancas.confirmar(CONSUMIDOR_VETORIAL, seq)
+        return indice
+    
     def adicionar_memoria(self, conteudo):
         """Adiciona uma nova memória diretamente.
         
@@ -438,9 +1256,8 @@ class Memoria:
         Returns:
             int: ID da memória adicionada
         """
-        dados = self._carregar_memorias()
+        dados = self._carregar_memorias() if self.armazenamento is None else None
         nova_memoria = {
-            "id": len(dados["memorias"]) + 1,
             "conteudo": conteudo,
             "criado_em": datetime.now().isoformat(),
             "versao": 1,
@@ -449,6 +1266,25 @@ class Memoria:
         self.armazenar_memoria(nova_memoria, dados)
         return nova_memoria["id"]
     
+    async def adicionar_memoria_async(self, conteudo):
+        """Versão assíncrona de adicionar_memoria (gravação na thread do escritor).
+        
+        Args:
+            conteudo (str): Conteúdo da memória
+            
+        Returns:
+            int: ID da memória adicionada
+        """
+        dados = await self._carregar_memorias_async() if self.armazenamento is None else None
+        nova_memoria = {
+            "conteudo": conteudo,
+            "criado_em": datetime.now().isoformat(),
+            "versao": 1,
+            "origem": "externa"
+        }
+        await self.armazenar_memoria_async(nova_memoria, dados)
+        return nova_memoria["id"]
+    
     def listar_memorias(self, n=5):
         """Lista as últimas n memórias.
         
@@ -458,28 +1294,279 @@ class Memoria:
         Returns:
             list: Lista das últimas n memórias
         """
+        if self.armazenamento is not None:
+            return self.armazenamento.ultimas(n)
+        
         dados = self._carregar_memorias()
         memorias = dados["memorias"]
         
         # Retorna as últimas n memórias (ou todas, se houver menos que n)
         return memorias[-n:] if len(memorias) > n else memorias
     
-    def buscar_memorias(self, termo, limite=5):
-        """Busca memórias contendo o termo especificado.
+    def listar_intervalo(self, inicio=None, fim=None):
+        """Lista as memórias criadas dentro de um intervalo de tempo.
+        
+        No backend particionado apenas as partições que cobrem o intervalo
+        são lidas; no SQLite a consulta usa o índice de criado_em.
+        
+        Args:
+            inicio (datetime | str, optional): Início do intervalo (inclusivo)
+            fim (datetime | str, optional): Fim do intervalo (inclusivo)
+            
+        Returns:
+            list: Memórias do intervalo em ordem cronológica
+        """
+        if isinstance(inicio, datetime):
+            inicio = inicio.isoformat()
+        if isinstance(fim, datetime):
+            fim = fim.isoformat()
+        
+        if self.armazenamento is not None:
+            return self.armazenamento.intervalo(inicio, fim)
+        
+        resultado = []
+        for memoria in self._carregar_memorias()["memorias"]:
+            data = memoria.get("criado_em") or memoria.get("timestamp") or ""
+            if (inicio is None or data >= inicio) and (fim is None or data <= fim):
+                resultado.append(memoria)
+        return resultado
+    
+    def iter_memorias(self, filtro=None, desde=None, campos=None):
+        """Percorre as memórias, em ordem de criação, sem materializar a lista.
+        
+        No backend particionado a leitura é feita uma partição por vez e no
+        SQLite em páginas pela chave primária; no backend JSON o documento
+        já está em cache. Os registros são entregues sem cópia: não devem
+        ser alterados pelo consumidor (use atualizar_memoria).
+        
+        Args:
+            filtro (callable | dict, optional): Função memoria -> bool ou
+                dicionário de campos e valores exigidos
+            desde (datetime | str, optional): Só memórias criadas a partir desta data
+            campos (iterable, optional): Entrega apenas esses campos (projeção)
+            
+        Yields:
+            dict: Cada memória (ou projeção) que atende aos critérios
+        """
+        if isinstance(desde, datetime):
+            desde = desde.isoformat()
+        
+        if self.armazenamento is not None:
+            fonte = self.armazenamento.iterar(desde)
+        else:
+            memorias = self._carregar_memorias()["memorias"]
+            # islice fixa o tamanho: memórias gravadas durante a iteração ficam de fora
+            fonte = islice(memorias, len(memorias))
+            if desde is not None:
+                fonte = (m for m in fonte if (m.get("criado_em") or m.get("timestamp") or "") >= desde)
+        
+        for memoria in fonte:
+            if filtro is not None and not corresponde_filtro(memoria, filtro):
+                continue
+            if campos is None:
+                yield memoria
+            else:
+                yield {campo: memoria[campo] for campo in campos if campo in memoria}
+    
+    def mudancas_desde(self, seq):
+        """Retorna as mudanças (inserções, atualizações e remoções) posteriores a seq.
+        
+        Args:
+            seq (int): Última sequência já processada (None se nunca processou)
+            
+        Returns:
+            list: Mudanças em ordem, cada uma com seq, operacao, id, memoria
+                e anterior; None se o consumidor precisar refazer a varredura
+        """
+        return self.mudancas.mudancas_desde(seq)
+    
+    def assinar_mudancas(self, desde=None):
+        """Assinatura assíncrona do feed (ver FeedMudancas.assinar).
         
         Args:
-            termo (str): Termo para buscar
+            desde (int, optional): Última sequência já vista (padrão: a atual)
+            
+        Returns:
+            Iterador assíncrono de mudanças
+        """
+        return self.mudancas.assinar(desde)
+    
+    def _linhagem(self):
+        """Retorna o índice de linhagem com as mudanças pendentes aplicadas.
+        
+        O índice é montado na primeira consulta com uma passagem pelos
+        campos de linhagem e depois acompanha o feed de mudanças. É
+        remontado se o feed não cobrir mais as mudanças (importação em
+        lote) ou se o documento JSON for recarregado do disco.
+        
+        Returns:
+            IndiceLinhagem: O índice atualizado
+        """
+        documento = self._carregar_memorias() if self.armazenamento is None else None
+        mudancas, seq = self.mudancas.pendentes(CONSUMIDOR_LINHAGEM)
+        if (mudancas is None or self._indice_linhagem is None
+                or documento is not self._indice_linhagem_documento):
+            self._indice_linhagem = IndiceLinhagem(
+                m for m in self.iter_memorias(campos=CAMPOS_LINHAGEM) if "id" in m
+            )
+            self._indice_linhagem_documento = documento
+        else:
+            for mudanca in mudancas:
+                if mudanca["memoria"] is None:
+                    self._indice_linhagem.remover(mudanca["id"])
+                else:
+                    self._indice_linhagem.adicionar(mudanca["memoria"])
+        self.mudancas.confirmar(CONSUMIDOR_LINHAGEM, seq)
+        return self._indice_linhagem
+    
+    def _similares(self):
+        """Retorna o índice MinHash de memórias parecidas com as mudanças pendentes aplicadas.
+        
+        Como o índice de linhagem, é montado na primeira consulta e depois
+        acompanha o feed de mudanças, sendo remontado se o feed não cobrir
+        mais as mudanças ou se o documento JSON for recarregado do disco.
+        
+        Returns:
+            IndiceMinHash: O índice atualizado
+        """
+        documento = self._carregar_memorias() if self.armazenamento is None else None
+        mudancas, seq = self.mudancas.pendentes(CONSUMIDOR_SIMILARES)
+        if (mudancas is None or self._indice_similares is None
+                or documento is not self._indice_similares_documento):
+            self._indice_similares = IndiceMinHash(
+                (m["id"], _palavras_significativas(m.get("conteudo", "")))
+                for m in self.iter_memorias(campos=("id", "conteudo")) if "id" in m
+            )
+            self._indice_similares_documento = documento
+        else:
+            for mudanca in mudancas:
+                if mudanca["memoria"] is None:
+                    self._indice_similares.remover(mudanca["id"])
+                else:
+                    self._indice_similares.adicionar(
+                        mudanca["id"], _palavras_significativas(mudanca["memoria"].get("conteudo", ""))
+                    )
+        self.mudancas.confirmar(CONSUMIDOR_SIMILARES, seq)
+        return self._indice_similares
+    
+    def ancestrais(self, memoria_id):
+        """Retorna os ids das memórias das quais esta deriva.
+        
+        Segue versões anteriores (relacionado_a) e bases de sínteses
+        (baseado_em) transitivamente, visitando só as memórias do resultado.
+        
+        Args:
+            memoria_id (int): ID da memória
+            
+        Returns:
+            list: Ids dos ancestrais, dos mais próximos aos mais distantes
+        """
+        return self._linhagem().ancestrais(memoria_id)
+    
+    def descendentes(self, memoria_id):
+        """Retorna os ids das memórias derivadas desta (refinamentos e sínteses).
+        
+        Args:
+            memoria_id (int): ID da memória
+            
+        Returns:
+            list: Ids dos descendentes, dos mais próximos aos mais distantes
+        """
+        return self._linhagem().descendentes(memoria_id)
+    
+    def versao_atual(self, memoria_id):
+        """Retorna o id da versão mais recente da cadeia de refinamentos da memória.
+        
+        Args:
+            memoria_id (int): ID da memória
+            
+        Returns:
+            int: Id da última versão (o próprio id se não houver refinamento)
+        """
+        return self._linhagem().versao_atual(memoria_id)
+    
+    def _proxima_versao(self, memoria):
+        """Retorna (id, versão) da última versão da cadeia à qual a memória pertence.
+        
+        Um refinamento passa a apontar para a versão mais recente em vez da
+        memória encontrada, mantendo a cadeia linear e a numeração crescente.
+        """
+        linhagem = self._linhagem()
+        atual = linhagem.versao_atual(memoria["id"])
+        if atual == memoria["id"]:
+            return atual, memoria.get("versao", 1)
+        return atual, linhagem.versao(atual)
+    
+    def buscar_memorias(self, termo, limite=5, operador=None, ranking=None):
+        """Busca memórias pelo termo, sem percorrer todas as memórias.
+        
+        Por padrão o termo é procurado como trecho do conteúdo (substring,
+        sem diferenciar maiúsculas, inclusive partes de palavras): o índice
+        de trigramas reduz a busca às memórias que contêm todos os
+        trigramas do termo, e só essas são conferidas.
+        
+        Com um operador, as palavras do termo são comparadas inteiras pelo
+        índice invertido (palavra -> ids), com custo proporcional às listas
+        de ocorrência das palavras buscadas.
+        
+        Com ranking="bm25" concorrem todas as memórias com alguma das
+        palavras, e as `limite` mais relevantes pelo BM25 (frequência das
+        palavras, raridade no acervo e comprimento da memória) são
+        selecionadas com um heap.
+        
+        Args:
+            termo (str): Trecho buscado, ou uma ou mais palavras
             limite (int): Número máximo de resultados
+            operador (str, optional): None (trecho), "e" (todas as palavras)
+                ou "ou" (qualquer uma); ignorado no ranking BM25
+            ranking (str, optional): None (ordem de criação) ou "bm25"
             
         Returns:
-            list: Lista de memórias encontradas
+            list: Lista de memórias encontradas, em ordem de criação ou da
+                mais relevante para a menos relevante
         """
+        if ranking not in (None, "bm25"):
+            raise ValueError(f"Ranking de busca inválido: {ranking}")
+        if ranking is None and operador is None:
+            return self._buscar_trecho(termo, limite)
+        termos = termos_consulta(termo, operador or "e")
+        if ranking == "bm25" and self.armazenamento is not None:
+            return self.armazenamento.ranquear_termos(termos, limite)
+        if self.armazenamento is not None:
+            return self.armazenamento.buscar_termos(termos, operador, limite)
+        
         dados = self._carregar_memorias()
+        if ranking == "bm25":
+            ids = (memoria_id for _, memoria_id in self.termos.ranquear(termos, limite))
+        else:
+            ids = self.termos.consultar(termos, operador)
         resultados = []
+        for memoria_id in ids:
+            posicao = self._posicao_por_id(dados, memoria_id)
+            if posicao is not None:
+                resultados.append(dados["memorias"][posicao])
+                if len(resultados) >= limite:
+                    break
         
-        # Busca simples por substring
+        return resultados
+    
+    def _buscar_trecho(self, termo, limite):
+        """Busca por substring, conferindo só as candidatas do índice de trigramas."""
+        if self.armazenamento is not None:
+            return self.armazenamento.buscar_termo(termo, limite)
+        
+        dados = self._carregar_memorias()
         termo_lower = termo.lower()
-        for memoria in dados["memorias"]:
+        candidatos = self.termos.candidatos_trecho(termo_lower)
+        if candidatos is None:
+            # Trecho curto demais para o índice: compara com todas
+            memorias = dados["memorias"]
+        else:
+            posicoes = (self._posicao_por_id(dados, memoria_id) for memoria_id in candidatos)
+            memorias = (dados["memorias"][p] for p in posicoes if p is not None)
+        
+        resultados = []
+        for memoria in memorias:
             if termo_lower in memoria["conteudo"].lower():
                 resultados.append(memoria)
                 if len(resultados) >= limite:
@@ -490,12 +1577,27 @@ class Memoria:
     def status(self) -> Dict[str, Any]:
         """Retorna o status atual do sistema de memória."""
         try:
+            if self.armazenamento is not None:
+                meta = self.armazenamento.meta()
+                return {
+                    'total_memorias': self.armazenamento.total(),
+                    'ultima_atualizacao': meta.get('ultima_atualizacao', 'Nunca'),
+                    'versao': meta.get('versao', '1.0'),
+                    'backend': self.backend,
+                    'analise_semantica_ativa': self.analise_semantica_ativa,
+                    'deduplicacao': {'duplicatas_evitadas': self._duplicatas_evitadas}
+                }
+            
             dados = self._carregar_memorias()
             return {
                 'total_memorias': len(dados['memorias']),
                 'ultima_atualizacao': dados['meta'].get('ultima_atualizacao', 'Nunca'),
                 'versao': dados['meta'].get('versao', '1.0'),
-                'analise_semantica_ativa': self.analise_semantica_ativa
+                'analise_semantica_ativa': self.analise_semantica_ativa,
+                'deduplicacao': {
+                    'hashes_indexados': len(self._indice_hashes),
+                    'duplicatas_evitadas': self._duplicatas_evitadas
+                }
             }
         except Exception as e:
             logger.error(f"Erro ao obter status da memória: {e}")
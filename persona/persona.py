@@ -5,13 +5,28 @@ Módulo Persona - Implementa a personalidade e comportamento do sistema.
 import logging
 from typing import Dict, Any, List
 from datetime import datetime
+from core.config import PERSONA_CONFIG
 from persona.memoria import Memoria
 from persona.processador_pensamento import ProcessadorPensamento
 
 class Persona:
     def __init__(self):
         """Inicializa a persona do sistema."""
-        self.memoria = Memoria()
+        if PERSONA_CONFIG["backend_memoria"] == "sqlite":
+            self.memoria = Memoria(
+                PERSONA_CONFIG["memoria_db_path"],
+                backend="sqlite",
+                caminho_legado=PERSONA_CONFIG["memoria_path"]
+            )
+        elif PERSONA_CONFIG["backend_memoria"] == "particionado":
+            self.memoria = Memoria(
+                PERSONA_CONFIG["memoria_particoes_path"],
+                backend="particionado",
+                caminho_legado=PERSONA_CONFIG["memoria_path"],
+                granularidade=PERSONA_CONFIG["granularidade_particoes"]
+            )
+        else:
+            self.memoria = Memoria(PERSONA_CONFIG["memoria_path"], codec=PERSONA_CONFIG["codec_memoria"])
         self.processador_pensamento = ProcessadorPensamento(self.memoria)
         self.logger = logging.getLogger(__name__)
         self.ultima_interacao = None
@@ -82,6 +97,82 @@ class Persona:
         """
         return self.memoria.adicionar_memoria(conteudo)
     
+    async def adicionar_memoria_async(self, conteudo: str) -> str:
+        """
+        Adiciona uma nova memória sem bloquear o event loop.
+        
+        Args:
+            conteudo: Conteúdo da memória a ser armazenada
+            
+        Returns:
+            ID da memória armazenada
+        """
+        return await self.memoria.adicionar_memoria_async(conteudo)
+    
+    def adicionar_memorias(self, memorias, progresso=None) -> Dict[str, int]:
+        """
+        Importa várias memórias de uma só vez (gravação em lote).
+        
+        Args:
+            memorias: Iterável de textos ou dicionários com "conteudo"
+            progresso: Função chamada com o número de itens processados
+            
+        Returns:
+            Resumo com as quantidades inseridas, duplicadas e inválidas
+        """
+        return self.memoria.adicionar_memorias(memorias, progresso=progresso)
+    
+    def buscar_por_id(self, memoria_id: int) -> Dict[str, Any]:
+        """
+        Busca uma memória pelo id.
+        
+        Args:
+            memoria_id: Id da memória
+            
+        Returns:
+            A memória encontrada ou None
+        """
+        return self.memoria.buscar_por_id(memoria_id)
+    
+    def obter_enriquecimento(self, memoria) -> Dict[str, Any]:
+        """
+        Lê a análise semântica e as sentenças contraditórias de uma memória,
+        guardadas fora do registro principal.
+        
+        Args:
+            memoria: A memória (dict) ou seu id
+            
+        Returns:
+            Campos de enriquecimento (vazio se não houver)
+        """
+        return self.memoria.obter_enriquecimento(memoria)
+    
+    def atualizar_memoria(self, memoria, novos_dados: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Atualiza uma memória existente.
+        
+        Args:
+            memoria: A memória (dict) ou seu id
+            novos_dados: Campos a atualizar
+            
+        Returns:
+            A memória atualizada ou None se não existir
+        """
+        return self.memoria.atualizar_memoria(memoria, novos_dados)
+    
+    async def atualizar_memoria_async(self, memoria, novos_dados: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Atualiza uma memória existente sem bloquear o event loop.
+        
+        Args:
+            memoria: A memória (dict) ou seu id
+            novos_dados: Campos a atualizar
+            
+        Returns:
+            A memória atualizada ou None se não existir
+        """
+        return await self.memoria.atualizar_memoria_async(memoria, novos_dados)
+    
     def listar_memorias(self, n: int = 5) -> list:
         """
         Lista as últimas n memórias.
@@ -94,27 +185,185 @@ class Persona:
         """
         return self.memoria.listar_memorias(n)
     
-    def buscar_memorias(self, termo: str) -> list:
+    def listar_intervalo(self, inicio=None, fim=None) -> list:
+        """
+        Lista as memórias criadas dentro de um intervalo de tempo.
+        
+        Args:
+            inicio: Início do intervalo (datetime ou ISO), inclusivo
+            fim: Fim do intervalo (datetime ou ISO), inclusivo
+            
+        Returns:
+            Lista de memórias em ordem cronológica
+        """
+        return self.memoria.listar_intervalo(inicio, fim)
+    
+    def iter_memorias(self, filtro=None, desde=None, campos=None):
+        """
+        Percorre as memórias sem carregar o conjunto inteiro.
+        
+        Args:
+            filtro: Função memoria -> bool ou dicionário de campos exigidos
+            desde: Só memórias criadas a partir desta data (datetime ou ISO)
+            campos: Campos a entregar (projeção); None para o registro inteiro
+            
+        Returns:
+            Iterador de memórias
+        """
+        return self.memoria.iter_memorias(filtro=filtro, desde=desde, campos=campos)
+    
+    @property
+    def mudancas(self):
+        """
+        Feed de mudanças da memória (sequência, checkpoints por consumidor
+        e assinatura assíncrona).
+        """
+        return self.memoria.mudancas
+    
+    def mudancas_desde(self, seq) -> list:
+        """
+        Retorna as mudanças de memória posteriores à sequência informada.
+        
+        Args:
+            seq: Última sequência já processada (None se nunca processou)
+            
+        Returns:
+            Lista de mudanças, ou None se for preciso refazer a varredura completa
+        """
+        return self.memoria.mudancas_desde(seq)
+    
+    def ancestrais(self, memoria_id: int) -> list:
+        """
+        Retorna os ids das memórias das quais esta deriva (versões anteriores
+        e bases de sínteses), dos mais próximos aos mais distantes.
+        
+        Args:
+            memoria_id: ID da memória
+            
+        Returns:
+            Lista de ids
+        """
+        return self.memoria.ancestrais(memoria_id)
+    
+    def descendentes(self, memoria_id: int) -> list:
+        """
+        Retorna os ids das memórias derivadas desta (refinamentos e sínteses).
+        
+        Args:
+            memoria_id: ID da memória
+            
+        Returns:
+            Lista de ids
+        """
+        return self.memoria.descendentes(memoria_id)
+    
+    def versao_atual(self, memoria_id: int) -> int:
+        """
+        Retorna o id da versão mais recente da cadeia de refinamentos da memória.
+        
+        Args:
+            memoria_id: ID da memória
+            
+        Returns:
+            Id da última versão
+        """
+        return self.memoria.versao_atual(memoria_id)
+    
+    def filtrar_memorias(self, tipo=None, origem=None, emocao=None, tag=None, tem_campo=None,
+                         limite=None) -> list:
+        """
+        Retorna as memórias que atendem aos filtros, pelo índice secundário.
+        
+        Args:
+            tipo: Valor exigido de "tipo"
+            origem: Valor exigido de "origem" (ex.: "sintese_interna")
+            emocao: Emoção exigida em contexto_emocional
+            tag: Tag que a memória deve ter
+            tem_campo: Campo(s) que a memória deve possuir (ex.: "avaliacao")
+            limite: Máximo de memórias
+            
+        Returns:
+            Lista de memórias em ordem de criação
+        """
+        return self.memoria.filtrar(tipo=tipo, origem=origem, emocao=emocao, tag=tag,
+                                    tem_campo=tem_campo, limite=limite)
+    
+    def contar_memorias(self, tipo=None, origem=None, emocao=None, tag=None, tem_campo=None) -> int:
+        """
+        Conta as memórias que atendem aos filtros sem lê-las.
+        
+        Args:
+            tipo, origem, emocao, tag, tem_campo: Mesmos filtros de filtrar_memorias
+            
+        Returns:
+            Número de memórias
+        """
+        return self.memoria.contar(tipo=tipo, origem=origem, emocao=emocao, tag=tag, tem_campo=tem_campo)
+    
+    def armazenar_memoria(self, memoria: Dict[str, Any]) -> bool:
         """
-        Busca memórias contendo o termo especificado.
+        Armazena uma memória já montada (ex.: sínteses do aprendizado).
         
         Args:
-            termo: Termo a ser buscado
+            memoria: A memória a ser armazenada
+            
+        Returns:
+            True se a memória foi armazenada
+        """
+        return self.memoria.armazenar_memoria(memoria)
+    
+    async def armazenar_memoria_async(self, memoria: Dict[str, Any]) -> bool:
+        """
+        Armazena uma memória já montada sem bloquear o event loop.
+        
+        Args:
+            memoria: A memória a ser armazenada
+            
+        Returns:
+            True se a memória foi armazenada
+        """
+        return await self.memoria.armazenar_memoria_async(memoria)
+    
+    def buscar_memorias(self, termo: str, operador: str = None, ranking: str = None, limite: int = 5) -> list:
+        """
+        Busca memórias contendo o trecho (pelo índice de trigramas) ou as palavras do termo.
+        
+        Args:
+            termo: Trecho, ou uma ou mais palavras, a buscar
+            operador: None (trecho), "e" (todas as palavras) ou "ou" (qualquer uma)
+            ranking: None (ordem de criação) ou "bm25" (mais relevantes primeiro)
+            limite: Número máximo de memórias
             
         Returns:
             Lista de memórias encontradas
         """
-        return self.memoria.buscar_memorias(termo)
+        return self.memoria.buscar_memorias(termo, limite=limite, operador=operador, ranking=ranking)
     
-    def buscar_memorias_semanticamente(self, consulta: str) -> list:
+    async def buscar_memorias_semanticamente(self, consulta: str, limite: int = 5) -> list:
         """
-        Busca memórias semanticamente relacionadas à consulta.
+        Busca memórias semanticamente relacionadas à consulta, pelo índice vetorial.
         
         Args:
             consulta: Texto para busca semântica
+            limite: Número máximo de memórias
             
         Returns:
             Lista de memórias semanticamente relacionadas
         """
-        # Implementação básica - retorna busca textual normal
-        return self.buscar_memorias(consulta) 
\ No newline at end of file
+        return await self.memoria.buscar_memorias_semanticamente(consulta, limite)
+    
+    async def buscar_memorias_similares(self, texto: str, limite: int = 5, limiar: float = None,
+                                        excluir: int = None) -> list:
+        """
+        Busca as memórias mais similares ao texto, pelo índice vetorial.
+        
+        Args:
+            texto: Texto de referência
+            limite: Número máximo de memórias
+            limiar: Similaridade mínima (exclusiva)
+            excluir: Id de uma memória a deixar de fora
+            
+        Returns:
+            Pares (memória, similaridade), da mais similar para a menos
+        """
+        return await self.memoria.buscar_similares(texto, limite, limiar=limiar, excluir=excluir)
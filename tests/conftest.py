@@ -0,0 +1,87 @@
+"""Fixtures compartilhadas dos testes."""
+
+import random
+
+import pytest
+
+from core.config import MEMORIA_CONFIG
+
+# Vocabulário do corpus dos testes de índices de busca (com acentos e prefixos comuns)
+VOCABULARIO_CORPUS = ["memória", "Aprendizado", "ação", "gato", "preto", "reflexão", "sonho", "café",
+                      "noite", "chuva", "livro", "música", "tempo", "cidade", "aprender", "aprendiz"]
+
+
+@pytest.fixture
+def memoria_core(tmp_path, monkeypatch):
+    """core.memoria.Memoria gravando num diretório temporário."""
+    from core.memoria import Memoria
+
+    # A Memoria grava em "memoria/" relativo ao diretório atual
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(MEMORIA_CONFIG, "caminho_longo_prazo", str(tmp_path / "longo_prazo.db"))
+    return Memoria()
+
+
+@pytest.fixture
+def memoria_persona(tmp_path):
+    """persona.memoria.Memoria no backend SQLite, sem a análise semântica."""
+    from persona.memoria import Memoria
+
+    memoria = Memoria(str(tmp_path / "memorias.db"), backend="sqlite")
+    memoria.analise_semantica_ativa = False
+    return memoria
+
+
+@pytest.fixture
+def corpus():
+    """Memórias sorteadas do VOCABULARIO_CORPUS, comparadas com varreduras completas."""
+    gerador = random.Random(42)
+    return [
+        {"id": memoria_id,
+         "conteudo": " ".join(gerador.choice(VOCABULARIO_CORPUS) for _ in range(gerador.randint(1, 12)))}
+        for memoria_id in range(1, 301)
+    ]
+
+
+@pytest.fixture
+def corpus_alterado(corpus):
+    """Remove e reescreve parte do corpus; retorna (removidas, alteradas, estado final)."""
+    gerador = random.Random(7)
+    removidas = [m for m in corpus if m["id"] % 7 == 0]
+    alteradas = [{"id": m["id"], "conteudo": " ".join(gerador.choice(VOCABULARIO_CORPUS) for _ in range(5))}
+                 for m in corpus if m["id"] % 5 == 0 and m["id"] % 7]
+    por_id = {m["id"]: m for m in corpus}
+    for memoria in removidas:
+        del por_id[memoria["id"]]
+    por_id.update((m["id"], m) for m in alteradas)
+    return removidas, alteradas, sorted(por_id.values(), key=lambda m: m["id"])
+
+
+@pytest.fixture
+def banco_corpus(tmp_path, corpus, corpus_alterado):
+    """ArmazenamentoSQLite que recebeu o corpus e depois as remoções e alterações."""
+    from core.armazenamento import ArmazenamentoSQLite
+
+    removidas, alteradas, _ = corpus_alterado
+    banco = ArmazenamentoSQLite(str(tmp_path / "corpus.db"))
+    banco.inserir_lote(corpus)
+    for memoria in removidas:
+        banco.remover(memoria["id"])
+    banco.inserir_lote(alteradas)
+    yield banco
+    banco.fechar()
+
+
+@pytest.fixture
+def indice_termos(corpus, corpus_alterado):
+    """IndiceInvertido em memória que acompanhou as remoções e alterações do corpus."""
+    from core.armazenamento.indice_invertido import IndiceInvertido
+
+    removidas, alteradas, _ = corpus_alterado
+    indice = IndiceInvertido(corpus)
+    por_id = {m["id"]: m for m in corpus}
+    for memoria in removidas:
+        indice.remover(memoria)
+    for memoria in alteradas:
+        indice.atualizar(por_id[memoria["id"]], memoria)
+    return indice
@@ -0,0 +1,74 @@
+"""Testes do ranking BM25 (em memória e no SQLite) contra uma varredura completa."""
+
+import math
+
+import pytest
+
+from core.armazenamento.indice_invertido import IndiceInvertido, BM25_K1, BM25_B, contar_termos, termos_consulta
+
+CONSULTAS = ["gato", "gato preto", "ação café", "aprendizado memória noite", "inexistente", "música música"]
+
+
+def _bm25_bruto(memorias, termos):
+    """Pontuação BM25 de cada memória com algum dos termos, calculada por varredura."""
+    contagens = {m["id"]: contar_termos(m["conteudo"]) for m in memorias}
+    total = len(contagens)
+    medio = sum(sum(c.values()) for c in contagens.values()) / total
+    pontuacoes = {}
+    for termo in termos:
+        n_memorias = sum(1 for c in contagens.values() if termo in c)
+        if not n_memorias:
+            continue
+        idf = math.log(1 + (total - n_memorias + 0.5) / (n_memorias + 0.5))
+        for memoria_id, contagem in contagens.items():
+            frequencia = contagem.get(termo, 0)
+            if frequencia:
+                comprimento = sum(contagem.values())
+                normalizacao = BM25_K1 * (1 - BM25_B + BM25_B * comprimento / medio)
+                pontuacoes[memoria_id] = pontuacoes.get(memoria_id, 0.0) + (
+                    idf * frequencia * (BM25_K1 + 1) / (frequencia + normalizacao)
+                )
+    return pontuacoes
+
+
+def _conferir_ranking(ranking, memorias, termos, limite):
+    """O ranking traz as k maiores pontuações da varredura, com as pontuações corretas."""
+    esperado = _bm25_bruto(memorias, termos)
+    assert len(ranking) == min(limite, len(esperado))
+    for pontuacao, memoria_id in ranking:
+        assert pontuacao == pytest.approx(esperado[memoria_id])
+    assert [p for p, _ in ranking] == pytest.approx(sorted(esperado.values(), reverse=True)[:limite])
+
+
+@pytest.mark.parametrize("consulta", CONSULTAS)
+@pytest.mark.parametrize("limite", [1, 5, 1000])
+def test_bm25_em_memoria_igual_a_varredura(indice_termos, corpus_alterado, consulta, limite):
+    _, _, atuais = corpus_alterado
+    termos = termos_consulta(consulta)
+
+    _conferir_ranking(indice_termos.ranquear(termos, limite), atuais, termos, limite)
+
+
+@pytest.mark.parametrize("consulta", CONSULTAS)
+def test_bm25_sqlite_igual_a_varredura(banco_corpus, corpus_alterado, consulta):
+    _, _, atuais = corpus_alterado
+    termos = termos_consulta(consulta)
+
+    ranking = [(pontuacao, memoria["id"]) for pontuacao, memoria in banco_corpus.ranquear_termos(termos, 10, True)]
+
+    _conferir_ranking(ranking, atuais, termos, 10)
+
+
+def test_bm25_favorece_termo_raro_e_memoria_curta():
+    indice = IndiceInvertido([
+        {"id": 1, "conteudo": "gato"},
+        {"id": 2, "conteudo": "gato preto dorme no sofá da sala"},
+        {"id": 3, "conteudo": "cachorro"},
+        {"id": 4, "conteudo": "gato cachorro"},
+    ])
+
+    assert [memoria_id for _, memoria_id in indice.ranquear(["gato"], 3)] == [1, 4, 2]
+    # "cachorro" aparece em menos memórias que "gato", então pesa mais
+    ranking = [memoria_id for _, memoria_id in indice.ranquear(["gato", "cachorro"], 4)]
+    assert ranking[0] == 4
+    assert ranking.index(3) < ranking.index(1)
@@ -0,0 +1,87 @@
+"""Testes da busca semântica da persona.memoria.Memoria sobre o índice vetorial.
+
+O analisador real depende de spaCy/NLTK/sentence-transformers; aqui ele é
+trocado por um que codifica cada texto pela contagem das suas palavras.
+"""
+
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import persona.memoria
+from core.armazenamento import escritor
+
+VOCABULARIO = ["gato", "cachorro", "dorme", "late", "sofá", "quintal", "chuva", "serra"]
+
+
+class AnalisadorFalso:
+    nome_modelo_embeddings = "modelo-falso"
+    inicializado = True
+
+    def __init__(self):
+        self.lotes = []
+
+    async def encode_lote(self, textos):
+        textos = list(textos)
+        self.lotes.append(textos)
+        return np.array([[t.lower().split().count(p) for p in VOCABULARIO] for t in textos],
+                        dtype=np.float32)
+
+
+@pytest.fixture
+def analisador(monkeypatch, memoria_persona):
+    falso = AnalisadorFalso()
+    monkeypatch.setattr(persona.memoria, "analisador_semantico", falso)
+    memoria_persona.analise_semantica_ativa = True
+    return falso
+
+
+def test_busca_codifica_o_acervo_em_um_lote_e_depois_so_as_novas(memoria_persona, analisador):
+    for texto in ["gato dorme no sofá", "cachorro late no quintal", "chuva na serra"]:
+        memoria_persona.adicionar_memoria(texto)
+
+    [(memoria, similaridade)] = asyncio.run(memoria_persona.buscar_similares("gato dorme", 1))
+    assert memoria["conteudo"] == "gato dorme no sofá"
+    assert similaridade > 0.8
+    # Consulta + acervo inteiro em um único lote
+    assert [len(lote) for lote in analisador.lotes] == [1, 3]
+
+    memoria_persona.adicionar_memoria("cachorro dorme na chuva")
+    resultados = asyncio.run(memoria_persona.buscar_similares("cachorro", 5, limiar=0.3))
+    assert {m["conteudo"] for m, _ in resultados} == {"cachorro late no quintal", "cachorro dorme na chuva"}
+    assert analisador.lotes[-1] == ["cachorro dorme na chuva"]
+
+
+def test_busca_semantica_e_exclusao(memoria_persona, analisador):
+    primeira = memoria_persona.adicionar_memoria("gato dorme no sofá")
+    memoria_persona.adicionar_memoria("gato dorme no quintal")
+
+    semelhantes = asyncio.run(memoria_persona.buscar_similares("gato dorme no sofá", 5, excluir=primeira))
+    assert [m["conteudo"] for m, _ in semelhantes] == ["gato dorme no quintal"]
+    assert [m["id"] for m in asyncio.run(memoria_persona.buscar_memorias_semanticamente("sofá"))] == [primeira]
+
+
+def test_indice_gravado_e_reaproveitado(tmp_path, analisador, memoria_persona):
+    memoria_persona.adicionar_memoria("chuva na serra")
+    asyncio.run(memoria_persona.buscar_similares("chuva", 1))
+    escritor.aguardar_sincrono()
+
+    reaberta = persona.memoria.Memoria(memoria_persona.memoria_path, backend="sqlite")
+    analisador.lotes.clear()
+    [(memoria, _)] = asyncio.run(reaberta.buscar_similares("serra", 1))
+
+    assert memoria["conteudo"] == "chuva na serra"
+    # Só a consulta foi codificada: o vetor da memória veio do arquivo .npz
+    assert analisador.lotes == [["serra"]]
+
+
+def test_sem_bibliotecas_de_nlp_a_busca_semantica_cai_na_textual(memoria_persona):
+    if persona.memoria.ANALISE_SEMANTICA_DISPONIVEL:
+        pytest.skip("bibliotecas de NLP instaladas")
+    memoria_persona.adicionar_memoria("gato dorme no sofá")
+
+    assert persona.memoria.Memoria(memoria_persona.memoria_path, backend="sqlite").analise_semantica_ativa is False
+    [memoria] = asyncio.run(memoria_persona.buscar_memorias_semanticamente("sofá"))
+    assert memoria["conteudo"] == "gato dorme no sofá"
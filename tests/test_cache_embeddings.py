@@ -0,0 +1,88 @@
+"""Testes do CacheEmbeddings: LRU em memória, matriz em disco e reaproveitamento entre execuções."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.nlp.cache_embeddings import ARQUIVO_CHAVES, ARQUIVO_VETORES, CacheEmbeddings
+
+
+class ModeloFalso:
+    """Codifica cada texto pelo comprimento e pela soma dos códigos dos caracteres."""
+
+    def __init__(self):
+        self.lotes = []
+
+    def encode(self, textos):
+        self.lotes.append(list(textos))
+        return np.array([[len(t), sum(map(ord, t)) % 997, 1.0] for t in textos], dtype=np.float32)
+
+
+def test_textos_repetidos_codificados_uma_vez_em_um_lote():
+    modelo = ModeloFalso()
+    cache = CacheEmbeddings(modelo, "falso")
+
+    matriz = cache.encode(["um texto", "outro", "um   texto", "outro"])
+
+    assert modelo.lotes == [["um texto", "outro"]]
+    np.testing.assert_array_equal(matriz[0], matriz[2])
+    np.testing.assert_array_equal(cache.encode("outro"), matriz[1])
+    assert modelo.lotes == [["um texto", "outro"]]
+    assert cache.codificados == 2
+
+
+def test_lru_descarta_o_menos_usado():
+    modelo = ModeloFalso()
+    cache = CacheEmbeddings(modelo, "falso", capacidade=2)
+    cache.encode(["a", "b"])
+    cache.encode("a")
+    cache.encode("c")
+
+    cache.encode(["a", "b"])
+
+    assert modelo.lotes == [["a", "b"], ["c"], ["b"]]
+
+
+def test_matriz_em_disco_reaproveitada_entre_execucoes(tmp_path):
+    modelo = ModeloFalso()
+    primeira = CacheEmbeddings(modelo, "falso", str(tmp_path), capacidade=1)
+    esperado = primeira.encode(["alfa", "beta", "gama"])
+
+    segundo_modelo = ModeloFalso()
+    reaberto = CacheEmbeddings(segundo_modelo, "falso", str(tmp_path))
+    np.testing.assert_array_equal(reaberto.encode(["gama", "alfa", "beta"]), esperado[[2, 0, 1]])
+
+    assert segundo_modelo.lotes == []
+    assert reaberto.acertos == 3
+
+
+def test_mapeamento_reaberto_so_quando_a_matriz_cresce(tmp_path):
+    cache = CacheEmbeddings(ModeloFalso(), "falso", str(tmp_path), capacidade=0)
+    cache.encode(["alfa", "beta"])
+    cache.encode("alfa")
+    mapeamento = cache._matriz
+
+    cache.encode("beta")
+    assert cache._matriz is mapeamento
+
+    cache.encode("gama")
+    cache.encode("gama")
+    assert cache._matriz is not mapeamento
+    assert cache._matriz.shape[0] == 3
+
+
+def test_gravacao_interrompida_e_outro_modelo(tmp_path):
+    CacheEmbeddings(ModeloFalso(), "falso", str(tmp_path)).encode(["alfa", "beta"])
+    # Queda depois de gravar só metade do vetor da terceira linha
+    with open(tmp_path / ARQUIVO_VETORES, "ab") as arquivo:
+        arquivo.write(b"\0" * 3)
+    with open(tmp_path / ARQUIVO_CHAVES, "a", encoding="utf-8") as arquivo:
+        arquivo.write("chave-incompleta")
+
+    modelo = ModeloFalso()
+    CacheEmbeddings(modelo, "falso", str(tmp_path)).encode(["alfa", "beta", "gama"])
+    assert modelo.lotes == [["gama"]]
+
+    outro_modelo = ModeloFalso()
+    CacheEmbeddings(outro_modelo, "outro", str(tmp_path)).encode(["alfa"])
+    assert outro_modelo.lotes == [["alfa"]]
@@ -0,0 +1,82 @@
+"""Testes da importação em massa de memórias (adicionar_memorias)."""
+
+import asyncio
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from core.persona import Persona
+from core.utils import ler_jsonl
+
+
+def _jsonl(*linhas):
+    return io.StringIO("\n".join(json.dumps(l) if isinstance(l, dict) else l for l in linhas))
+
+
+def test_importacao_descarta_invalidas_e_duplicadas(memoria_core):
+    memoria_core.adicionar_memoria("já na memória")
+    arquivo = _jsonl({"conteudo": "nova a"}, "{quebrada", {"conteudo": "já na memória"},
+                     {"conteudo": "nova a"}, {"conteudo": "nova b", "tipo": "nota"}, "")
+
+    resumo = memoria_core.adicionar_memorias(ler_jsonl(arquivo))
+
+    assert resumo == {"inseridas": 2, "duplicadas": 2, "invalidas": 1}
+    assert memoria_core.status()["camadas"]["longo_prazo"] == 2
+    assert memoria_core.buscar_por_id(2)["conteudo"] == "nova a"
+    assert memoria_core.buscar_por_id(3)["tipo"] == "nota"
+
+
+def test_duplicadas_nao_consomem_ids(memoria_core):
+    memoria_core.adicionar_memorias(["a", "a", "b", "b", "b"])
+
+    assert memoria_core.adicionar_memoria("c")["id"] == 3
+
+
+def test_falha_na_importacao_devolve_os_ids(memoria_core):
+    def memorias():
+        yield "a"
+        yield "b"
+        raise RuntimeError("leitura interrompida")
+
+    resumo = memoria_core.adicionar_memorias(memorias())
+
+    assert resumo["inseridas"] == 0
+    assert memoria_core.status()["camadas"]["longo_prazo"] == 0
+    assert memoria_core.adicionar_memoria("c")["id"] == 1
+
+
+def test_importacao_assincrona_convive_com_o_loop(memoria_core):
+    persona = Persona(memoria_core)
+    progresso = []
+
+    async def cenario():
+        importacao = asyncio.create_task(persona.adicionar_memorias_async(
+            (f"importada {i}" for i in range(50)), progresso=progresso.append
+        ))
+        # O loop segue alocando ids enquanto a importação roda na thread do escritor
+        avulsa = memoria_core.adicionar_memoria("avulsa")
+        return await importacao, avulsa
+
+    resumo, _ = asyncio.run(cenario())
+
+    assert resumo == {"inseridas": 50, "duplicadas": 0, "invalidas": 0}
+    assert progresso == [50]
+    ids = {memoria_core.buscar_por_id(i)["conteudo"] for i in range(1, 52)}
+    assert len(ids) == 51 and "avulsa" in ids
+    assert memoria_core.adicionar_memoria("outra")["id"] == 52
+
+
+def test_comando_importar_do_chat(memoria_core, tmp_path):
+    pytest.importorskip("rich")
+    from core.chat_interface import ChatInterface
+
+    arquivo = tmp_path / "Memorias.jsonl"
+    arquivo.write_text(_jsonl({"conteudo": "x"}, {"conteudo": "y"}).getvalue(), encoding="utf-8")
+    chat = ChatInterface(SimpleNamespace(persona=Persona(memoria_core)))
+
+    resultado = asyncio.run(chat.processar_mensagem(f"importar {arquivo}"))
+
+    assert resultado["status"] == "sucesso"
+    assert "2 memórias inseridas" in resultado["resposta"]
@@ -0,0 +1,23 @@
+"""Testes do índice invertido de termos (consulta "e"/"ou") contra uma varredura completa."""
+
+import pytest
+
+from core.armazenamento.indice_invertido import termos_consulta, tokenizar
+
+CONSULTAS = ["gato", "gato preto", "ação café", "aprendizado memória noite", "inexistente", "música música"]
+
+
+@pytest.mark.parametrize("consulta", CONSULTAS)
+@pytest.mark.parametrize("operador", ["e", "ou"])
+def test_consulta_por_termos_igual_a_varredura(indice_termos, banco_corpus, corpus_alterado, consulta, operador):
+    _, _, atuais = corpus_alterado
+    termos = termos_consulta(consulta, operador)
+    combinar = all if operador == "e" else any
+    esperado = {m["id"] for m in atuais if combinar(t in tokenizar(m["conteudo"]) for t in termos)}
+
+    assert indice_termos.consultar(termos, operador) == esperado
+    assert [m["id"] for m in banco_corpus.buscar_termos(termos, operador)] == sorted(esperado)
+
+
+def test_termos_ignoram_caixa_e_pontuacao():
+    assert tokenizar("Ação, AÇÃO e ação!") == {"ação", "e"}
@@ -0,0 +1,72 @@
+"""Testes do índice vetorial: busca dos k mais similares e persistência em .npz."""
+
+import numpy as np
+import pytest
+
+from core.armazenamento import escritor
+from core.nlp.indice_vetorial import IndiceVetorial
+
+
+def _vetores(quantidade, dimensao=16, semente=3):
+    return np.random.default_rng(semente).standard_normal((quantidade, dimensao)).astype(np.float32)
+
+
+def _similaridades_brutas(vetores, consulta):
+    normalizados = vetores / np.linalg.norm(vetores, axis=1, keepdims=True)
+    return normalizados @ (consulta / np.linalg.norm(consulta))
+
+
+@pytest.mark.parametrize("k", [1, 5, 50, 5000])
+def test_buscar_igual_a_varredura(k):
+    vetores = _vetores(2000)
+    indice = IndiceVetorial()
+    indice.adicionar(((memoria_id, f"h{memoria_id}") for memoria_id in range(1, 2001)), vetores)
+    consulta = _vetores(1, semente=9)[0]
+
+    resultado = indice.buscar(consulta, k)
+
+    esperado = _similaridades_brutas(vetores, consulta)
+    ordem = np.argsort(-esperado)[:k]
+    assert [memoria_id for memoria_id, _ in resultado] == [int(p) + 1 for p in ordem]
+    assert [s for _, s in resultado] == pytest.approx(esperado[ordem].tolist(), abs=1e-5)
+
+
+def test_limiar_e_remocao():
+    vetores = _vetores(100)
+    indice = IndiceVetorial()
+    indice.adicionar(((memoria_id, "h") for memoria_id in range(100)), vetores)
+    consulta = vetores[10]
+
+    assert indice.buscar(consulta, 1)[0][0] == 10
+    indice.remover(10)
+    assert 10 not in indice
+    assert all(memoria_id != 10 for memoria_id, _ in indice.buscar(consulta, 100))
+    assert all(s > 0.2 for _, s in indice.buscar(consulta, 100, limiar=0.2))
+    assert len(indice) == 99
+
+
+def test_gravacao_em_segundo_plano(tmp_path):
+    caminho = str(tmp_path / "vetores.npz")
+    vetores = _vetores(10)
+    indice = IndiceVetorial(caminho, "modelo")
+    indice.adicionar(((memoria_id, f"h{memoria_id}") for memoria_id in range(10)), vetores)
+    indice.salvar_em_segundo_plano()
+    indice.remover(3)
+    indice.salvar_em_segundo_plano()
+    escritor.aguardar_sincrono()
+
+    reaberto = IndiceVetorial(caminho, "modelo")
+    assert sorted(reaberto.ids()) == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+    assert reaberto.hash(4) == "h4"
+    assert reaberto.buscar(vetores[4], 1)[0][0] == 4
+    assert not indice.alterado
+
+
+def test_indice_de_outro_modelo_descartado(tmp_path):
+    caminho = str(tmp_path / "vetores.npz")
+    indice = IndiceVetorial(caminho, "modelo-a")
+    indice.adicionar([(1, "h1")], _vetores(1))
+    indice.salvar()
+
+    assert len(IndiceVetorial(caminho, "modelo-a")) == 1
+    assert len(IndiceVetorial(caminho, "modelo-b")) == 0
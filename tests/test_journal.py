@@ -0,0 +1,93 @@
+"""Testes do journal de memórias: reconstrução do estado após uma queda."""
+
+import json
+
+from core.armazenamento.journal import JournalMemorias
+
+
+def _memoria(memoria_id, conteudo):
+    return {"id": memoria_id, "conteudo": conteudo, "tipo": "geral"}
+
+
+def test_replay_sem_snapshot(tmp_path):
+    journal = JournalMemorias(str(tmp_path))
+    journal.registrar(_memoria(1, "primeira"))
+    journal.registrar(_memoria(2, "segunda"))
+    journal.registrar(_memoria(1, "primeira revisada"))
+    journal.registrar_remocao(2)
+    # Queda: o processo termina sem compactar nem fechar o arquivo
+    del journal
+
+    reaberto = JournalMemorias(str(tmp_path))
+    memorias = reaberto.carregar()
+
+    assert memorias == [_memoria(1, "primeira revisada")]
+    assert reaberto.entradas_journal == 4
+    # O id removido nunca volta a ser alocado
+    assert reaberto.proximo_id == 3
+
+
+def test_replay_ignora_linha_parcial(tmp_path):
+    journal = JournalMemorias(str(tmp_path))
+    journal.registrar_entradas([
+        {"op": "put", "memoria": _memoria(1, "um")},
+        {"op": "put", "memoria": _memoria(2, "dois")},
+    ])
+    journal.fechar()
+    # Queda no meio da escrita da terceira entrada
+    parcial = json.dumps({"op": "put", "memoria": _memoria(3, "três")}, ensure_ascii=False)
+    with open(journal.caminho_journal, "a", encoding="utf-8") as f:
+        f.write(parcial[:len(parcial) // 2])
+
+    reaberto = JournalMemorias(str(tmp_path))
+    memorias = reaberto.carregar()
+
+    assert [m["id"] for m in memorias] == [1, 2]
+    assert reaberto.proximo_id == 3
+
+
+def test_replay_sobre_snapshot(tmp_path):
+    journal = JournalMemorias(str(tmp_path))
+    journal.proximo_id = 5
+    journal.compactar([_memoria(1, "um"), _memoria(4, "quatro")])
+    journal.registrar(_memoria(5, "cinco"))
+    journal.registrar_remocao(1)
+    del journal
+
+    reaberto = JournalMemorias(str(tmp_path))
+    memorias = reaberto.carregar()
+
+    assert [m["id"] for m in memorias] == [4, 5]
+    assert reaberto.entradas_journal == 2
+    assert reaberto.proximo_id == 6
+
+
+def test_compactacao_trunca_journal(tmp_path):
+    journal = JournalMemorias(str(tmp_path))
+    for memoria_id in range(1, 4):
+        journal.registrar(_memoria(memoria_id, f"memória {memoria_id}"))
+    journal.compactar(journal.carregar())
+
+    reaberto = JournalMemorias(str(tmp_path))
+    assert [m["id"] for m in reaberto.carregar()] == [1, 2, 3]
+    assert reaberto.entradas_journal == 0
+    assert reaberto.proximo_id == 4
+
+
+def test_memoria_reconstruida_pelo_journal(memoria_core):
+    from core.memoria import Memoria
+
+    primeira = memoria_core.adicionar_memoria("primeira")
+    segunda = memoria_core.adicionar_memoria("segunda")
+    memoria_core.adicionar_memoria("terceira")
+    memoria_core.atualizar_memoria(primeira["id"], {"conteudo": "primeira revisada"})
+    memoria_core.remover_memoria(segunda["id"])
+    memoria_core.flush()
+
+    reaberta = Memoria()
+
+    assert {m["id"]: m["conteudo"] for m in reaberta.listar_todas_memorias()} == {1: "primeira revisada",
+                                                                                  3: "terceira"}
+    assert reaberta.journal.entradas_journal == 5
+    # O id removido nunca volta a ser alocado
+    assert reaberta.adicionar_memoria("quarta")["id"] == 4
@@ -0,0 +1,54 @@
+"""Testes da persona.memoria.Memoria: alocação de ids, busca e atualização por id."""
+
+import json
+
+import pytest
+
+from persona.memoria import Memoria
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def memoria(request, tmp_path):
+    caminho = tmp_path / ("memorias.json" if request.param == "json" else "memorias.db")
+    memoria = Memoria(str(caminho), backend=request.param)
+    memoria.analise_semantica_ativa = False
+    return memoria
+
+
+def test_duplicata_nao_consome_id(memoria):
+    primeiro = memoria.adicionar_memoria("O céu estava limpo")
+
+    assert memoria.adicionar_memoria("o céu estava   limpo") == primeiro
+    assert memoria.adicionar_memoria("Outra lembrança") == primeiro + 1
+
+
+def test_integracao_de_duplicata_nao_consome_id(memoria):
+    memoria.integrar_informacao("O rio corre para o mar")
+    memoria.integrar_informacao("O rio corre para o mar")
+    memoria.integrar_informacao("Amanhã chove na serra")
+
+    ids = sorted(m["id"] for m in memoria.listar_memorias(10))
+    assert ids == [1, 2]
+
+
+def test_id_continua_sendo_o_primeiro_campo(tmp_path):
+    caminho = tmp_path / "memorias.json"
+    memoria = Memoria(str(caminho))
+    memoria.adicionar_memoria("Primeira memória")
+
+    [registro] = json.loads(caminho.read_text(encoding="utf-8"))["memorias"]
+    assert next(iter(registro)) == "id"
+
+
+def test_busca_e_atualizacao_por_id(memoria):
+    memoria.adicionar_memoria("Primeira")
+    segunda = memoria.adicionar_memoria("Segunda")
+
+    atualizada = memoria.atualizar_memoria(segunda, {"conteudo": "Segunda revisada", "id": 99})
+
+    assert atualizada["id"] == segunda
+    assert memoria.buscar_por_id(segunda)["conteudo"] == "Segunda revisada"
+    assert memoria.buscar_por_id(99) is None
+    assert memoria.atualizar_memoria(99, {"conteudo": "x"}) is None
+    assert memoria.remover_memoria(segunda)
+    assert memoria.buscar_por_id(segunda) is None
@@ -0,0 +1,76 @@
+"""Testes do índice MinHash/LSH e da busca de memórias parecidas que o usa."""
+
+import random
+
+import pytest
+
+from core.armazenamento.minhash import IndiceMinHash
+from persona.memoria import _palavras_significativas
+
+VOCABULARIO = [f"palavra{i:03d}" for i in range(400)]
+
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def _par(gerador, comuns, exclusivas):
+    """Dois conjuntos com `comuns` palavras em comum e `exclusivas` só em cada um."""
+    palavras = gerador.sample(VOCABULARIO, comuns + 2 * exclusivas)
+    comum = set(palavras[:comuns])
+    return comum | set(palavras[comuns:comuns + exclusivas]), comum | set(palavras[comuns + exclusivas:])
+
+
+def test_candidatos_incluem_pares_acima_do_limiar():
+    gerador = random.Random(7)
+    encontrados = 0
+    for _ in range(200):
+        # Jaccard 10/30, logo acima do limiar de 0,3
+        base, parecida = _par(gerador, 10, 10)
+        indice = IndiceMinHash([(1, parecida)])
+        encontrados += indice.candidatos(base) == {1}
+
+    # O índice é aproximado: ~95% de chance por par nesse limiar
+    assert encontrados >= 180
+
+
+def test_pares_muito_parecidos_sempre_sao_candidatos():
+    gerador = random.Random(3)
+    for _ in range(50):
+        base, parecida = _par(gerador, 15, 5)
+        assert IndiceMinHash([(1, parecida)]).candidatos(base) == {1}
+
+
+def test_conjuntos_sem_relacao_raramente_sao_candidatos():
+    gerador = random.Random(11)
+    itens = [(i, set(gerador.sample(VOCABULARIO[:200], 15))) for i in range(200)]
+    indice = IndiceMinHash(itens)
+
+    consulta = set(gerador.sample(VOCABULARIO[200:], 15))
+    assert indice.candidatos(consulta) == set()
+
+
+def test_remover_tira_dos_candidatos():
+    indice = IndiceMinHash([(1, {"gato", "preto", "dorme"})])
+    indice.remover(1)
+
+    assert len(indice) == 0
+    assert indice.candidatos({"gato", "preto", "dorme"}) == set()
+
+
+@pytest.mark.parametrize("texto, relacionada", [
+    ("O gato preto dorme muito no sofá da sala", True),
+    # 3 palavras em comum de 6 no maior conjunto; Jaccard 3/8: ainda similar
+    ("gato preto dorme sempre cedo aqui", True),
+    # 2 em comum de 5 passava na medida antiga (0,4), mas o Jaccard é 2/8
+    ("gato preto corre quintal ensolarado", False),
+])
+def test_buscar_memoria_similar_usa_jaccard(memoria_persona, texto, relacionada):
+    memoria_persona.integrar_informacao("gato preto dorme sofá sala")
+
+    existente = memoria_persona._buscar_memoria_similar(texto)
+
+    assert (existente is not None) == relacionada
+    palavras = _palavras_significativas(texto)
+    if existente is not None:
+        assert _jaccard(palavras, _palavras_significativas(existente["conteudo"])) > 0.3
@@ -0,0 +1,94 @@
+"""Testes do feed de mudanças: pendentes, confirmar e invalidar por consumidor."""
+
+from core.armazenamento.mudancas import FeedMudancas, INSERCAO, ATUALIZACAO, REMOCAO
+
+
+def test_consumidor_novo_precisa_ressincronizar():
+    feed = FeedMudancas()
+    feed.registrar(INSERCAO, 1, {"id": 1})
+
+    mudancas, seq = feed.pendentes("consumidor")
+
+    assert mudancas is None
+    assert seq == 1
+
+
+def test_pendentes_desde_a_confirmacao():
+    feed = FeedMudancas()
+    feed.registrar(INSERCAO, 1, {"id": 1})
+    _, seq = feed.pendentes("consumidor")
+    feed.confirmar("consumidor", seq)
+
+    feed.registrar(ATUALIZACAO, 1, {"id": 1, "versao": 2}, anterior={"id": 1})
+    feed.registrar(REMOCAO, 1, None, anterior={"id": 1, "versao": 2})
+    mudancas, seq = feed.pendentes("consumidor")
+
+    assert [(m["operacao"], m["id"]) for m in mudancas] == [(ATUALIZACAO, 1), (REMOCAO, 1)]
+    assert seq == 3
+
+    feed.confirmar("consumidor", seq)
+    assert feed.pendentes("consumidor") == ([], 3)
+
+
+def test_consumidores_independentes():
+    feed = FeedMudancas()
+    feed.confirmar("a", feed.seq)
+    feed.confirmar("b", feed.seq)
+    feed.registrar(INSERCAO, 1, {"id": 1})
+    feed.confirmar("a", feed.pendentes("a")[1])
+    feed.registrar(INSERCAO, 2, {"id": 2})
+
+    assert [m["id"] for m in feed.pendentes("a")[0]] == [2]
+    assert [m["id"] for m in feed.pendentes("b")[0]] == [1, 2]
+
+
+def test_invalidar_obriga_ressincronizacao():
+    feed = FeedMudancas()
+    feed.confirmar("consumidor", feed.seq)
+    feed.registrar(INSERCAO, 1, {"id": 1})
+
+    feed.invalidar()
+    mudancas, seq = feed.pendentes("consumidor")
+    assert mudancas is None
+
+    # Depois da varredura completa, volta a receber só as mudanças seguintes
+    feed.confirmar("consumidor", seq)
+    feed.registrar(INSERCAO, 2, {"id": 2})
+    assert [m["id"] for m in feed.pendentes("consumidor")[0]] == [2]
+
+
+def test_consumidor_atrasado_alem_da_capacidade():
+    feed = FeedMudancas(capacidade=3)
+    feed.confirmar("lento", feed.seq)
+    for memoria_id in range(1, 5):
+        feed.registrar(INSERCAO, memoria_id, {"id": memoria_id})
+    feed.confirmar("em_dia", 1)
+
+    assert feed.pendentes("lento")[0] is None
+    assert [m["id"] for m in feed.pendentes("em_dia")[0]] == [2, 3, 4]
+
+
+def test_memoria_publica_insercoes_atualizacoes_e_remocoes(memoria_persona):
+    inicio = memoria_persona.mudancas.seq
+    primeira = memoria_persona.adicionar_memoria("primeira")
+    segunda = memoria_persona.adicionar_memoria("segunda")
+    memoria_persona.atualizar_memoria(primeira, {"conteudo": "primeira revisada"})
+    memoria_persona.remover_memoria(segunda)
+
+    mudancas = memoria_persona.mudancas_desde(inicio)
+
+    assert [(m["operacao"], m["id"]) for m in mudancas] == [
+        (INSERCAO, primeira), (INSERCAO, segunda), (ATUALIZACAO, primeira), (REMOCAO, segunda)
+    ]
+    assert mudancas[2]["anterior"]["conteudo"] == "primeira"
+    assert mudancas[2]["memoria"]["conteudo"] == "primeira revisada"
+    assert memoria_persona.mudancas_desde(mudancas[-1]["seq"]) == []
+
+
+def test_importacao_em_lote_obriga_ressincronizacao(memoria_core):
+    memoria_core.adicionar_memoria("avulsa")
+    seq = memoria_core.mudancas.seq
+
+    memoria_core.adicionar_memorias(["importada 1", "importada 2"])
+
+    assert memoria_core.mudancas_desde(seq) is None
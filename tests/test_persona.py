@@ -0,0 +1,22 @@
+"""Testes da Persona do núcleo (core.persona) sobre a memória em camadas."""
+
+import asyncio
+
+from core.persona import Persona
+
+
+def test_armazenar_memoria_async_preserva_campos(memoria_core):
+    persona = Persona(memoria_core)
+    nova = {
+        "conteudo": "Aprofundamento sobre 'tempo'",
+        "origem": "aprofundamento_tematico",
+        "baseado_em": [1, 2],
+        "tema_aprofundado": "tempo"
+    }
+
+    assert asyncio.run(persona.armazenar_memoria_async(nova)) is True
+
+    [memoria] = persona.filtrar_memorias(origem="aprofundamento_tematico")
+    assert memoria["conteudo"] == nova["conteudo"]
+    assert memoria["baseado_em"] == [1, 2]
+    assert memoria["tema_aprofundado"] == "tempo"
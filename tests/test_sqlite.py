@@ -0,0 +1,160 @@
+"""Testes do ArmazenamentoSQLite: importação do JSON legado, alocação de ids, consultas indexadas e acesso de várias threads."""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from core.armazenamento import ArmazenamentoSQLite
+
+
+def _documento(*ids):
+    return {"memorias": [{"id": memoria_id, "conteudo": f"memória {memoria_id}"} for memoria_id in ids]}
+
+
+def test_importa_json_legado_quando_vazio(tmp_path):
+    legado = tmp_path / "memorias.json"
+    legado.write_text(json.dumps(_documento(3, 7)), encoding="utf-8")
+
+    banco = ArmazenamentoSQLite(str(tmp_path / "memorias.db"), str(legado))
+
+    assert banco.total() == 2
+    assert banco.buscar_por_id(7)["conteudo"] == "memória 7"
+    # O alocador continua depois do maior id importado
+    assert banco.alocar_id() == 8
+    banco.fechar()
+
+
+def test_nao_reimporta_legado_em_banco_existente(tmp_path):
+    legado = tmp_path / "memorias.json"
+    legado.write_text(json.dumps(_documento(1, 2)), encoding="utf-8")
+    caminho = str(tmp_path / "memorias.db")
+    ArmazenamentoSQLite(caminho, str(legado)).fechar()
+
+    legado.write_text(json.dumps(_documento(1, 2, 3)), encoding="utf-8")
+    banco = ArmazenamentoSQLite(caminho, str(legado))
+
+    assert banco.total() == 2
+    banco.fechar()
+
+
+def test_migra_json_com_extensao_de_banco(tmp_path):
+    caminho = tmp_path / "memorias.db"
+    caminho.write_text(json.dumps([{"id": 1, "conteudo": "antiga"}]), encoding="utf-8")
+
+    banco = ArmazenamentoSQLite(str(caminho))
+
+    assert banco.buscar_por_id(1)["conteudo"] == "antiga"
+    assert (tmp_path / "memorias.db.json.bak").exists()
+    banco.fechar()
+
+
+def test_ids_nao_sao_reutilizados_apos_remocao(tmp_path):
+    caminho = str(tmp_path / "memorias.db")
+    banco = ArmazenamentoSQLite(caminho)
+    for _ in range(3):
+        memoria_id = banco.alocar_id()
+        banco.inserir({"id": memoria_id, "conteudo": f"memória {memoria_id}"})
+    assert banco.remover(3)
+    banco.fechar()
+
+    banco = ArmazenamentoSQLite(caminho)
+    assert banco.alocar_id() == 4
+    banco.fechar()
+
+
+def test_importar_aloca_ids_so_para_as_inseridas(tmp_path):
+    banco = ArmazenamentoSQLite(str(tmp_path / "memorias.db"))
+    banco.inserir({"id": 1, "conteudo": "existente"})
+
+    resultado = banco.importar([
+        {"conteudo": "nova a"}, {"conteudo": "existente"}, {"conteudo": "nova b"}, {"conteudo": "nova a"}
+    ])
+
+    assert resultado == {"inseridas": 2, "duplicadas": 2, "proximo_id": 4}
+    assert [m["conteudo"] for m in banco.intervalo(None, None)] == ["existente", "nova a", "nova b"]
+    assert banco.alocar_id() == 4
+    banco.fechar()
+
+
+def test_importar_usa_alocador_externo_so_para_inseridas(tmp_path):
+    banco = ArmazenamentoSQLite(str(tmp_path / "memorias.db"))
+    ids = iter([10, 11, 12])
+
+    resultado = banco.importar([{"conteudo": "a"}, {"conteudo": "a"}, {"conteudo": "b"}],
+                               alocador=lambda: next(ids))
+
+    assert resultado == {"inseridas": 2, "duplicadas": 1, "proximo_id": 12}
+    assert banco.buscar_por_id(10)["conteudo"] == "a"
+    assert banco.buscar_por_id(11)["conteudo"] == "b"
+    assert next(ids) == 12
+    banco.fechar()
+
+
+def test_importar_com_falha_desfaz_tudo(tmp_path):
+    banco = ArmazenamentoSQLite(str(tmp_path / "memorias.db"))
+    banco.inserir({"id": 1, "conteudo": "existente"})
+
+    def memorias():
+        yield {"conteudo": "a"}
+        yield {"conteudo": "b"}
+        raise RuntimeError("leitura interrompida")
+
+    with pytest.raises(RuntimeError):
+        banco.importar(memorias(), tamanho_lote=1)
+
+    assert banco.total() == 1
+    # O avanço do alocador também é desfeito
+    assert banco.alocar_id() == 2
+    banco.fechar()
+
+
+def test_leitura_de_outra_thread_durante_importacao(tmp_path):
+    banco = ArmazenamentoSQLite(str(tmp_path / "memorias.db"))
+    banco.inserir({"id": 1, "conteudo": "existente"})
+    no_meio, continuar = threading.Event(), threading.Event()
+
+    def memorias():
+        yield {"conteudo": "a"}
+        no_meio.set()
+        continuar.wait(5)
+        yield {"conteudo": "b"}
+
+    with ThreadPoolExecutor(1) as executor:
+        importacao = executor.submit(banco.importar, memorias(), tamanho_lote=1)
+        assert no_meio.wait(5)
+        # A transação aberta na outra thread não bloqueia nem vaza para a leitura
+        assert banco.total() == 1
+        assert banco.buscar_por_id(1)["conteudo"] == "existente"
+        continuar.set()
+        assert importacao.result()["inseridas"] == 2
+    assert banco.total() == 3
+    banco.fechar()
+
+
+def test_alocacao_concorrente_nao_repete_ids(tmp_path):
+    banco = ArmazenamentoSQLite(str(tmp_path / "memorias.db"))
+
+    with ThreadPoolExecutor(4) as executor:
+        ids = list(executor.map(lambda _: banco.alocar_id(), range(200)))
+
+    assert sorted(ids) == list(range(1, 201))
+    banco.fechar()
+
+
+def test_backend_sqlite_da_persona_consulta_pelos_indices(tmp_path):
+    from persona.memoria import Memoria
+
+    caminho = str(tmp_path / "persona.db")
+    memoria = Memoria(caminho, backend="sqlite")
+    for dia, (conteudo, tipo) in enumerate([("chuva fina", "clima"), ("café forte", "rotina"),
+                                            ("chuva grossa", "clima")], start=1):
+        memoria.armazenar_memoria({"conteudo": conteudo, "tipo": tipo, "criado_em": f"2024-01-0{dia}T10:00:00"})
+
+    reaberta = Memoria(caminho, backend="sqlite")
+
+    assert [m["conteudo"] for m in reaberta.filtrar(tipo="clima")] == ["chuva fina", "chuva grossa"]
+    assert [m["conteudo"] for m in reaberta.listar_intervalo("2024-01-02", "2024-01-03T23:59")] == [
+        "café forte", "chuva grossa"]
+    assert [m["id"] for m in reaberta.buscar_memorias("chuva", limite=5)] == [1, 3]
@@ -0,0 +1,47 @@
+"""Testes do índice de trigramas (em memória e no SQLite) contra uma varredura completa."""
+
+import pytest
+
+from core.armazenamento.indice_trigramas import IndiceTrigramas
+
+TRECHOS = ["aprend", "ção", "gato p", "ÓRIA", "to", "a", "xyz", "ia c"]
+
+
+@pytest.mark.parametrize("trecho", TRECHOS)
+def test_trigramas_em_memoria_cobrem_a_varredura(corpus, corpus_alterado, trecho):
+    removidas, alteradas, atuais = corpus_alterado
+    indice = IndiceTrigramas(corpus)
+    por_id = {m["id"]: m for m in corpus}
+    for memoria in removidas:
+        indice.remover(memoria)
+    for memoria in alteradas:
+        indice.atualizar(por_id[memoria["id"]], memoria)
+    esperado = {m["id"] for m in atuais if trecho.lower() in m["conteudo"].lower()}
+
+    candidatos = indice.candidatos(trecho)
+    if len(trecho) < 3:
+        assert candidatos is None
+    else:
+        assert esperado <= candidatos
+        # Memórias removidas não voltam como candidatas
+        assert candidatos <= {m["id"] for m in atuais}
+
+
+@pytest.mark.parametrize("trecho", TRECHOS)
+def test_busca_por_trecho_sqlite_igual_a_varredura(banco_corpus, corpus_alterado, trecho):
+    _, _, atuais = corpus_alterado
+    esperado = [m["id"] for m in atuais if trecho.lower() in m["conteudo"].lower()]
+
+    assert [m["id"] for m in banco_corpus.buscar_termo(trecho)] == esperado
+    assert [m["id"] for m in banco_corpus.buscar_termo(trecho, 5, recentes_primeiro=True)] == esperado[::-1][:5]
+
+
+def test_busca_por_trecho_nas_duas_camadas(memoria_core):
+    memoria_core.adicionar_memorias(["Uma reflexão antiga", "Chuva no telhado"])
+    memoria_core.adicionar_memoria("Reflexões da noite")
+    memoria_core.adicionar_memoria("Café da manhã")
+
+    encontradas = {m["conteudo"] for m in memoria_core.buscar_memorias("REFLEX", limite=10)}
+
+    assert encontradas == {"Uma reflexão antiga", "Reflexões da noite"}
+    assert memoria_core.buscar_memorias("xyz") == []